@@ -1,4 +1,16 @@
-from .case_base_adapter import CaseBaseAdapter
+from .actors.cache import RetrievalCache
+from .actors.progress import MetricsListener, ProgressEvent, ProgressListener
+from .async_system import AsyncCaseBasedSystem
+from .case_base_adapter import CaseBaseAdapter, ColumnarCaseBaseAdapter
 from .system import CaseBasedSystem
 
-__all__ = ["CaseBasedSystem", "CaseBaseAdapter"]
+__all__ = [
+    "AsyncCaseBasedSystem",
+    "CaseBasedSystem",
+    "CaseBaseAdapter",
+    "ColumnarCaseBaseAdapter",
+    "MetricsListener",
+    "ProgressEvent",
+    "ProgressListener",
+    "RetrievalCache",
+]
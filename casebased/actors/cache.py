@@ -0,0 +1,93 @@
+from typing import Any, Hashable, Optional
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class RetrievalCache:
+    """
+    The retrieval cache keeps the results of recent queries, so repeated queries skip scoring the case base.
+    Entries are evicted in least recently used order once max_size entries are cached,
+    and expire ttl seconds after they were stored.
+
+    The retriever puts its version into every key, so changing the case base makes all older entries unreachable
+    without clearing the cache. They're evicted like any other unused entry.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: Optional[float] = None):
+        """
+        Create an empty cache.
+
+        Args:
+            max_size: int :
+                Maximum number of cached results
+            ttl: Optional[float] :
+                Seconds a result stays valid, None keeps results until they're evicted
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Look up a cached result and count the hit or miss.
+
+        Args:
+            key: Hashable : Key of the query
+
+        Returns:
+            The cached result or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None:
+                if time.monotonic() - entry[0] > self.ttl:
+                    del self._entries[key]
+                    entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, result: Any) -> None:
+        """
+        Store the result of a query, evicting the least recently used result if the cache is full.
+
+        Args:
+            key: Hashable : Key of the query
+            result: Any : Result to cache
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic(), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Remove all cached results and reset the statistics.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        Get the share of lookups that found a cached result.
+
+        Returns:
+            float between 0.0 and 1.0
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
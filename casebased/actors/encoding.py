@@ -0,0 +1,103 @@
+from typing import Any, Iterable, Optional
+
+import numpy as np
+import numpy.typing as npt
+
+
+class CategoricalEncoder:
+    """
+    The categorical encoder maps the distinct values of an attribute to int32 codes.
+    Codes are assigned in order of first appearance, so encoding the same case base always yields the same codes,
+    independent of the process or Python's string hash seed.
+    The original values are kept in a side table, so similarity functions always receive the real values.
+    """
+
+    def __init__(self, categories: Optional[Iterable[Any]] = None):
+        """
+        Create an encoder, optionally with an existing table of categories indexed by code.
+
+        Args:
+            categories: Optional[Iterable] :
+                Distinct values, where the position of a value is its code
+        """
+        self._codes: dict[Any, int] = {}
+        self._categories: list[Any] = []
+        self._table: Optional[npt.NDArray[np.object_]] = None
+        for value in categories or []:
+            self.__add(value)
+
+    def __len__(self) -> int:
+        return len(self._categories)
+
+    def encode(self, values: Iterable[Any]) -> npt.NDArray[np.int32]:
+        """
+        Encode values into codes. Unknown values are added to the encoder, missing values (None) get the code -1.
+
+        Args:
+            values: Iterable : Values to encode
+
+        Returns:
+            np.ndarray of int32
+        """
+        codes = self._codes
+        return np.fromiter(
+            (
+                (
+                    -1
+                    if value is None
+                    else codes[value] if value in codes else self.__add(value)
+                )
+                for value in values
+            ),
+            dtype=np.int32,
+        )
+
+    def code(self, value: Any) -> Optional[int]:
+        """
+        Look up the code of a value without adding it.
+
+        Args:
+            value: Any : Value to look up
+
+        Returns:
+            The code or None if the value is unknown
+        """
+        return self._codes.get(value)
+
+    def decode(self, codes: npt.NDArray[np.integer[Any]]) -> npt.NDArray[np.object_]:
+        """
+        Turn codes back into the original values. The code -1 is decoded to None.
+
+        Args:
+            codes: np.ndarray : Codes to decode
+
+        Returns:
+            np.ndarray of objects
+        """
+        padded: npt.NDArray[np.object_] = np.empty(
+            len(self._categories) + 1, dtype=object
+        )
+        padded[:-1] = self.categories
+        decoded: npt.NDArray[np.object_] = padded[codes]
+        return decoded
+
+    @property
+    def categories(self) -> npt.NDArray[np.object_]:
+        """
+        Get the side table of original values, indexed by code.
+
+        Returns:
+            np.ndarray of objects
+        """
+        if self._table is None or len(self._table) != len(self._categories):
+            table = np.empty(len(self._categories), dtype=object)
+            for code, value in enumerate(self._categories):
+                table[code] = value
+            self._table = table
+        return self._table
+
+    def __add(self, value: Any) -> int:
+        code = len(self._categories)
+        self._codes[value] = code
+        self._categories.append(value)
+        return code
@@ -0,0 +1,1030 @@
+from typing import Any, Callable, Iterable, Literal, Mapping, Optional, Union
+
+import json
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+
+from casebased.actors.encoding import CategoricalEncoder
+from casebased.actors.qgram import QGramBounded, QGramIndex
+from casebased.actors.similarity_table import SimilarityTable
+from casebased.actors.sorted_index import SortedIndex
+from casebased.components.similarity_measure import SimilarityFunction, SimilaritySchema
+from casebased.components.similarity_measure.types import calculate_batch
+from casebased.components.vocabulary import Case
+
+
+class BruteForceEngine:
+    """
+    The brute-force engine keeps the case base encoded as one NumPy column per feature attribute.
+    A query is scored against every case of the case base in a single vectorized pass per attribute,
+    and the k most similar cases are selected with a partial sort instead of a full one.
+    """
+
+    def __init__(
+        self,
+        similarity_schema: SimilaritySchema,
+        feature_keys: list[str],
+        max_table_size: int = 1024,
+        table_cache_size: int = 1 << 22,
+        qgram_index: bool = False,
+        sorted_index: bool = False,
+        jobs: Optional[int] = None,
+    ):
+        """
+        Create a new engine for the given similarity schema.
+
+        Args:
+            similarity_schema: SimilaritySchema :
+                Defines the similarity function and weight of every feature attribute
+            feature_keys: list[str] :
+                Feature attributes that are encoded and compared, in a fixed order
+            max_table_size: int :
+                Dictionary-encoded attributes with up to this many distinct values keep a full similarity table
+            table_cache_size: int :
+                Number of similarity values cached per attribute with more distinct values,
+                see SimilarityTable.max_elements
+            qgram_index: bool :
+                Build a q-gram index for string attributes whose similarity function provides a q-gram upper bound,
+                so kneighbors only computes their similarity for cases that can still make the top k
+            sorted_index: bool :
+                Keep numerical attributes sorted, so kneighbors can run the threshold algorithm
+                and stop before visiting cases that can't make the top k
+            jobs: Optional[int] :
+                Number of threads scoring chunks of CHUNK_SIZE cases in parallel, -1 uses all cores.
+                None or 1 scores all cases in the calling thread
+        """
+        self.similarity_schema = similarity_schema
+        self.feature_keys = list(feature_keys)
+        self.max_table_size = max_table_size
+        self.table_cache_size = table_cache_size
+        self.qgram_index = qgram_index
+        self.sorted_index = sorted_index
+        self.jobs = (os.cpu_count() or 1) if jobs == -1 else (jobs or 1)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._columns: dict[str, npt.NDArray[Any]] = {}
+        self._encoders: dict[str, CategoricalEncoder] = {}
+        self._tables: dict[str, SimilarityTable] = {}
+        self._qgram_indexes: dict[str, QGramIndex] = {}
+        self._sorted_indexes: dict[str, SortedIndex] = {}
+        self._size = 0
+        self._capacity = 0
+
+    def fit(self, cases: list[Case]) -> None:
+        """
+        Encode the given cases into one column per feature attribute.
+        Numerical attributes are stored as float64, all other attributes are dictionary-encoded.
+
+        Args:
+            cases: list[Case] :
+                All cases of the case base
+        """
+        self.__encode_cases(cases)
+        self.__build_qgram_indexes()
+        self.__build_sorted_indexes()
+
+    def fit_batches(self, batches: Iterable[list[Case]]) -> None:
+        """
+        Encode the cases of a case base batch by batch, so only the encoded columns and one batch are held in memory.
+        The indexes are built once all batches are encoded.
+
+        Args:
+            batches: Iterable[list[Case]] :
+                All cases of the case base in batches, e.g. from CaseBaseAdapter.iter_case_batches
+        """
+        batches = iter(batches)
+        self.__encode_cases(next(batches, []))
+        for batch in batches:
+            self.__append(batch)
+        self.__build_qgram_indexes()
+        self.__build_sorted_indexes()
+
+    def fit_columns(
+        self,
+        columns: Mapping[str, npt.NDArray[Any]],
+        categories: Optional[Mapping[str, Optional[list[Any]]]] = None,
+    ) -> None:
+        """
+        Use already encoded attribute columns, e.g. the column views of a columnar case base.
+        Float columns and code columns of dictionary-encoded attributes are used without copying.
+
+        Args:
+            columns: Mapping[str, np.ndarray] :
+                One column per feature attribute, all of the same length
+            categories: Optional[Mapping[str, Optional[list]]] :
+                Distinct values of dictionary-encoded attributes, whose columns contain codes
+        """
+        self._columns = {}
+        self._encoders = {}
+        self._tables = {}
+        for key in self.feature_keys:
+            key_categories = (categories or {}).get(key)
+            if key_categories is not None:
+                self._encoders[key] = CategoricalEncoder(key_categories)
+                self._columns[key] = columns[key].astype(np.int32, copy=False)
+            elif columns[key].dtype.kind in "biuf":
+                self._columns[key] = columns[key].astype(np.float64, copy=False)
+            else:
+                self._columns[key] = self.__encode(key, columns[key].tolist())
+        self._size = self._capacity = len(next(iter(self._columns.values()), ()))
+        self.__build_qgram_indexes()
+        self.__build_sorted_indexes()
+
+    def add(self, cases: list[Case]) -> None:
+        """
+        Append cases to the encoded columns without re-encoding the existing ones.
+        Columns grow by doubling their capacity, so appending is amortized O(1) per case.
+        The cases have to be appended to the case base in the same order.
+
+        Args:
+            cases: list[Case] :
+                New cases of the case base
+        """
+        start = self._size
+        self.__append(cases)
+        for key in list(self._sorted_indexes):
+            self.__update_sorted_index(key, self.column(key)[start:])
+
+    def __encode_cases(self, cases: list[Case]) -> None:
+        """
+        Replace the columns with the encoded cases, without building any index.
+        """
+        self._columns = {}
+        self._encoders = {}
+        self._tables = {}
+        for key in self.feature_keys:
+            self._columns[key] = self.__encode(
+                key, [case.get_feature_value_by_key(key) for case in cases]
+            )
+        self._size = self._capacity = len(cases)
+
+    def __append(self, cases: list[Case]) -> None:
+        """
+        Encode cases into the end of the columns, growing them by doubling their capacity.
+        """
+        end = self._size + len(cases)
+        if end > self._capacity:
+            self.__grow(max(end, 2 * self._capacity))
+        for key in self.feature_keys:
+            values = [case.get_feature_value_by_key(key) for case in cases]
+            if key not in self._encoders and encode_column(values).dtype == object:
+                self.__to_categorical(key)
+            self._columns[key][self._size : end] = self.__encode(key, values)
+        self._size = end
+
+    def column(self, key: str) -> npt.NDArray[Any]:
+        """
+        Get the encoded values of a feature attribute for all cases.
+        Dictionary-encoded attributes return their codes, see encoder.
+
+        Args:
+            key: str :
+                Feature attribute name
+
+        Returns:
+            np.ndarray
+        """
+        return self._columns[key][: self._size]
+
+    def encoder(self, key: str) -> Optional[CategoricalEncoder]:
+        """
+        Get the encoder of a dictionary-encoded feature attribute.
+
+        Args:
+            key: str :
+                Feature attribute name
+
+        Returns:
+            CategoricalEncoder or None for numerical attributes
+        """
+        return self._encoders.get(key)
+
+    def query_key(self, case: Case) -> Optional[tuple[Any, ...]]:
+        """
+        Get a canonical, hashable key of the feature values of a query, e.g. to cache its result.
+        Numerical values are converted to float, values of dictionary-encoded attributes to their code.
+
+        Args:
+            case: Case :
+                The query case
+
+        Returns:
+            tuple or None if a value isn't hashable
+        """
+        key: list[Any] = []
+        for name in self.feature_keys:
+            value = case.get_feature_value_by_key(name)
+            encoder = self._encoders.get(name)
+            try:
+                if encoder is None:
+                    key.append(float(value))
+                else:
+                    code = encoder.code(value)
+                    key.append(code if code is not None else (value,))
+            except (TypeError, ValueError):
+                return None
+        return tuple(key)
+
+    def similarities(
+        self, key: str, function: SimilarityFunction, query: Any
+    ) -> npt.NDArray[np.float64]:
+        """
+        Calculate the similarity between a query value and the values of all cases for one attribute.
+        For dictionary-encoded attributes the similarity to every distinct value is looked up in the
+        attribute's similarity table and then gathered for all cases using their codes.
+
+        Args:
+            key: str :
+                Feature attribute name
+            function: SimilarityFunction :
+                Similarity function of the attribute
+            query: Any :
+                Query value or column of query values with shape (queries, 1)
+
+        Returns:
+            np.ndarray of shape (cases,) or (queries, cases)
+        """
+        encoder = self._encoders.get(key)
+        if encoder is None:
+            return calculate_column(function, query, self.column(key))
+        table = self.table(key, function)
+        if np.ndim(query) == 0:
+            return gather(table.row(query), self.column(key))
+        return gather(table.rows(np.ravel(query)), self.column(key))
+
+    def table(self, key: str, function: SimilarityFunction) -> SimilarityTable:
+        """
+        Get the similarity table of a dictionary-encoded attribute for the given function.
+
+        Args:
+            key: str :
+                Feature attribute name
+            function: SimilarityFunction :
+                Similarity function of the attribute
+
+        Returns:
+            SimilarityTable
+        """
+        table = self._tables.get(key)
+        if table is None or table.function is not function:
+            table = SimilarityTable(
+                function,
+                self._encoders[key],
+                max_dense=self.max_table_size,
+                max_elements=self.table_cache_size,
+            )
+            self._tables[key] = table
+        return table
+
+    def __build_qgram_indexes(self) -> None:
+        """
+        Index the distinct values of every dictionary-encoded attribute whose similarity function can be bounded.
+        Functions without a q-gram bound, e.g. a raw Levenshtein distance, get no index, since it could never prune.
+        """
+        self._qgram_indexes = {}
+        if not self.qgram_index:
+            return
+        compiled = self.similarity_schema.compile(self.feature_keys)
+        for key, function in zip(compiled.keys, compiled.functions):
+            if (
+                key in self._encoders
+                and isinstance(function, QGramBounded)
+                and function.qgram_bounded
+            ):
+                index = QGramIndex(function.qgram_size)
+                index.update(self._encoders[key].categories)
+                self._qgram_indexes[key] = index
+
+    def __qgram_bounds(
+        self, key: str, function: SimilarityFunction, query: Any
+    ) -> Optional[npt.NDArray[np.float64]]:
+        """
+        Upper bound of the similarity between the query value and every distinct value of an attribute,
+        or None when the attribute has to be scored exactly.
+        """
+        index = self._qgram_indexes.get(key)
+        if (
+            index is None
+            or not isinstance(query, str)
+            or not isinstance(function, QGramBounded)
+        ):
+            return None
+        if self.table(key, function).lookup(query) is not None:
+            return None
+        index.update(self._encoders[key].categories)
+        return function.qgram_upper_bound(query, index.lengths, index.common(query))
+
+    def __pruned_kneighbors(
+        self, case: Case, k: int, threshold: Optional[float]
+    ) -> tuple[npt.NDArray[np.intp], npt.NDArray[np.float64]]:
+        """
+        Find the k most similar cases while computing string similarities only where necessary.
+        Attributes with a q-gram index contribute an upper bound first. Cases are then evaluated exactly
+        in order of decreasing upper bound until no remaining case can reach the k-th best similarity
+        or the threshold.
+        """
+        compiled = self.similarity_schema.compile(self.feature_keys)
+        exact = np.zeros(self._size, dtype=np.float64)
+        upper = np.zeros(self._size, dtype=np.float64)
+        deferred = []
+        for key, function, weight in zip(
+            compiled.keys, compiled.functions, compiled.weights
+        ):
+            query = case.get_feature_value_by_key(key)
+            bounds = self.__qgram_bounds(key, function, query) if weight >= 0 else None
+            if bounds is None:
+                exact += weight * self.similarities(key, function, query)
+            else:
+                upper += weight * gather(bounds, self.column(key))
+                known = np.full(len(self._encoders[key]), np.nan)
+                deferred.append((key, function, weight, query, known))
+
+        if not deferred or self._size == 0:
+            return top_k(exact, k, threshold)
+        upper += exact
+
+        k = min(k, self._size)
+        evaluated = np.zeros(self._size, dtype=np.bool_)
+        totals = np.full(self._size, -np.inf)
+        eligible = self._size if threshold is None else int(np.sum(upper >= threshold))
+        block = max(4 * k, 256)
+        while True:
+            block = min(block, eligible)
+            candidates = top_k(upper, block, threshold)[0]
+            new = candidates[~evaluated[candidates]]
+            total = exact[new]
+            for key, function, weight, query, known in deferred:
+                codes = self.column(key)[new]
+                needed = np.unique(codes[codes >= 0])
+                needed = needed[np.isnan(known[needed])]
+                if len(needed) > 0:
+                    known[needed] = calculate_batch(
+                        function, query, self._encoders[key].categories[needed]
+                    )
+                total = total + weight * gather(known, codes)
+            totals[new] = total
+            evaluated[new] = True
+
+            indices, similarities = top_k(totals, k, threshold)
+            if block == eligible:
+                return indices, similarities
+            if len(similarities) == k and similarities[-1] >= upper[~evaluated].max():
+                return indices, similarities
+            block *= 2
+
+    def __build_sorted_indexes(self) -> None:
+        """
+        Sort every numerical attribute without missing values.
+        """
+        self._sorted_indexes = {}
+        if not self.sorted_index:
+            return
+        for key in self.feature_keys:
+            column = self.column(key)
+            if key not in self._encoders and not np.isnan(column).any():
+                self._sorted_indexes[key] = SortedIndex(column)
+
+    def __update_sorted_index(self, key: str, values: npt.NDArray[Any]) -> None:
+        """
+        Insert appended values into the sorted index of an attribute,
+        dropping the index once the attribute can't be sorted anymore.
+        """
+        index = self._sorted_indexes.get(key)
+        if index is None:
+            return
+        if key in self._encoders or np.isnan(values).any():
+            del self._sorted_indexes[key]
+        else:
+            index.insert(values)
+
+    def __sorted_kneighbors(
+        self, case: Case, k: int, threshold: Optional[float]
+    ) -> Optional[tuple[npt.NDArray[np.intp], npt.NDArray[np.float64]]]:
+        """
+        Find the k most similar cases with the threshold algorithm, visiting the cases of every numerical
+        attribute in order of increasing distance to the query value. The similarity of the nearest unvisited
+        value bounds the similarity of all unvisited cases on that attribute, dictionary-encoded attributes
+        are bounded by the highest similarity of their table row. The walk stops once the weighted sum of
+        the bounds can't beat the k-th best similarity found so far or falls below the threshold.
+
+        Returns None if the threshold algorithm doesn't apply to the query, i.e. for negative weights,
+        numerical attributes without a monotone similarity function or non-numerical query values.
+        """
+        compiled = self.similarity_schema.compile(self.feature_keys)
+        if self._size == 0 or (compiled.weights < 0).any():
+            return None
+        block_size = max(k, 128)
+        exact: list[
+            tuple[
+                str, SimilarityFunction, float, Any, Optional[npt.NDArray[np.float64]]
+            ]
+        ] = []
+        walks = []
+        fixed_bound = 0.0
+        for key, function, weight in zip(
+            compiled.keys, compiled.functions, compiled.weights
+        ):
+            query = case.get_feature_value_by_key(key)
+            if key in self._encoders:
+                row = self.table(key, function).row(query)
+                exact.append((key, function, weight, query, row))
+                fixed_bound += weight * max(row.max(initial=0.0), 0.0)
+                continue
+            index = self._sorted_indexes.get(key)
+            if (
+                index is None
+                or not getattr(function, "monotone", False)
+                or not isinstance(query, (int, float, np.number))
+                or not np.isfinite(query)
+            ):
+                return None
+            exact.append((key, function, weight, query, None))
+            walks.append((function, weight, query, index.walk(query, block_size)))
+
+        if not walks:
+            return None
+        k = min(k, self._size)
+        scores = np.full(self._size, -np.inf)
+        visited = np.zeros(self._size, dtype=np.bool_)
+        while True:
+            bound = fixed_bound
+            exhausted = False
+            blocks = []
+            for function, weight, query, walk in walks:
+                rows, frontier = next(walk)
+                blocks.append(rows)
+                frontier = frontier[~np.isnan(frontier)]
+                if len(frontier) == 0:
+                    exhausted = True
+                else:
+                    bound += weight * calculate_batch(function, query, frontier).max()
+
+            rows = np.unique(np.concatenate(blocks))
+            rows = rows[~visited[rows]]
+            visited[rows] = True
+            partial = np.zeros(len(rows), dtype=np.float64)
+            for key, function, weight, query, table_row in exact:
+                if table_row is None:
+                    partial += weight * calculate_column(
+                        function, query, self.column(key)[rows]
+                    )
+                else:
+                    partial += weight * gather(table_row, self.column(key)[rows])
+            scores[rows] = partial
+
+            indices, similarities = top_k(scores, k, threshold)
+            if (
+                exhausted
+                or (threshold is not None and bound < threshold)
+                or (len(similarities) == k and similarities[-1] >= bound)
+            ):
+                return indices, similarities
+
+    def __encode(self, key: str, values: list[Any]) -> npt.NDArray[Any]:
+        """
+        Encode attribute values, creating an encoder for non-numerical attributes on first use.
+        """
+        if key not in self._encoders:
+            column = encode_column(values)
+            if column.dtype != object:
+                return column
+            self._encoders[key] = CategoricalEncoder()
+        return self._encoders[key].encode(values)
+
+    def __to_categorical(self, key: str) -> None:
+        """
+        Switch a numerical column to dictionary encoding once it receives non-numerical values.
+        """
+        encoder = CategoricalEncoder()
+        codes = np.empty(self._capacity, dtype=np.int32)
+        codes[: self._size] = encoder.encode(
+            [None if np.isnan(value) else value for value in self.column(key).tolist()]
+        )
+        self._encoders[key] = encoder
+        self._columns[key] = codes
+
+    def __grow(self, capacity: int) -> None:
+        """
+        Move all columns into new, writable buffers of the given capacity.
+        """
+        for key, column in self._columns.items():
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[: self._size] = column[: self._size]
+            self._columns[key] = grown
+        self._capacity = capacity
+
+    def score(self, case: Case) -> npt.NDArray[np.float64]:
+        """
+        Calculate the weighted similarity between the given case and every case of the case base.
+
+        Args:
+            case: Case :
+                The query case
+
+        Returns:
+            np.ndarray with one similarity value per case in the case base
+        """
+        compiled = self.similarity_schema.compile(self.feature_keys)
+        scores = np.zeros(self._size, dtype=np.float64)
+        for key, function, weight in zip(
+            compiled.keys, compiled.functions, compiled.weights
+        ):
+            scores += weight * self.similarities(
+                key, function, case.get_feature_value_by_key(key)
+            )
+        return scores
+
+    def kneighbors(
+        self, case: Case, k: int, threshold: Optional[float] = None
+    ) -> tuple[npt.NDArray[np.intp], npt.NDArray[np.float64]]:
+        """
+        Find the k most similar cases to the given case.
+        With a threshold this becomes a range query for at most k cases with a similarity of at least the threshold,
+        which lets the indexed modes stop as soon as no remaining case can reach it.
+
+        Args:
+            case: Case :
+                The query case
+            k: int :
+                Number of cases to return
+            threshold: Optional[float] :
+                Minimum similarity of the returned cases
+
+        Returns:
+            Tuple of case indices and their similarity values, ordered from most to least similar
+        """
+        if self._sorted_indexes:
+            neighbors = self.__sorted_kneighbors(case, k, threshold)
+            if neighbors is not None:
+                return neighbors
+        if self._qgram_indexes:
+            return self.__pruned_kneighbors(case, k, threshold)
+        if self.__chunked():
+            return self.__chunked_kneighbors([case], k, threshold)[0]
+        return top_k(self.score(case), k, threshold)
+
+    def score_many(self, cases: list[Case]) -> npt.NDArray[np.float64]:
+        """
+        Calculate the weighted similarity between every given case and every case of the case base.
+
+        Args:
+            cases: list[Case] :
+                The query cases
+
+        Returns:
+            np.ndarray of shape (number of queries, number of cases)
+        """
+        compiled = self.similarity_schema.compile(self.feature_keys)
+        scores = np.zeros((len(cases), self._size), dtype=np.float64)
+        for key, function, weight in zip(
+            compiled.keys, compiled.functions, compiled.weights
+        ):
+            queries = encode_column(
+                [case.get_feature_value_by_key(key) for case in cases]
+            )
+            scores += weight * self.similarities(key, function, queries[:, np.newaxis])
+        return scores
+
+    def kneighbors_many(
+        self,
+        cases: list[Case],
+        k: int,
+        threshold: Optional[float] = None,
+        callback: Optional[Callable[[int], None]] = None,
+    ) -> list[tuple[npt.NDArray[np.intp], npt.NDArray[np.float64]]]:
+        """
+        Find the k most similar cases for every given case.
+        Queries are scored in blocks so the similarity matrix never exceeds MAX_BLOCK_ELEMENTS values.
+
+        Args:
+            cases: list[Case] :
+                The query cases
+            k: int :
+                Number of cases to return per query
+            threshold: Optional[float] :
+                Minimum similarity of the returned cases
+            callback: Optional[Callable[[int], None]] :
+                Called with the number of queries of every finished block
+
+        Returns:
+            One tuple of case indices and similarity values per query, ordered from most to least similar
+        """
+        block_size = max(1, MAX_BLOCK_ELEMENTS // max(self._size, 1))
+        results: list[tuple[npt.NDArray[np.intp], npt.NDArray[np.float64]]] = []
+        for start in range(0, len(cases), block_size):
+            block = cases[start : start + block_size]
+            if self.__chunked():
+                results.extend(self.__chunked_kneighbors(block, k, threshold))
+            else:
+                results.extend(top_k_rows(self.score_many(block), k, threshold))
+            if callback is not None:
+                callback(len(block))
+        return results
+
+    def close(self) -> None:
+        """
+        Stop the threads used for scoring chunks.
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __chunked(self) -> bool:
+        return self.jobs > 1 and self._size > CHUNK_SIZE
+
+    def __chunked_kneighbors(
+        self, cases: list[Case], k: int, threshold: Optional[float]
+    ) -> list[tuple[npt.NDArray[np.intp], npt.NDArray[np.float64]]]:
+        """
+        Find the k most similar cases for every given case by scoring chunks of CHUNK_SIZE cases in a thread pool.
+        Each chunk only keeps its own top k, so the similarities of all cases are never held at once.
+        NumPy releases the GIL while scoring, so the chunks run on all cores.
+        Similarity table rows are looked up before scoring, the threads only read shared state.
+        """
+        compiled = self.similarity_schema.compile(self.feature_keys)
+        prepared: list[
+            tuple[
+                str,
+                SimilarityFunction,
+                float,
+                Optional[npt.NDArray[Any]],
+                Optional[npt.NDArray[np.float64]],
+            ]
+        ] = []
+        for key, function, weight in zip(
+            compiled.keys, compiled.functions, compiled.weights
+        ):
+            values = [case.get_feature_value_by_key(key) for case in cases]
+            if key in self._encoders:
+                prepared.append(
+                    (
+                        key,
+                        function,
+                        weight,
+                        None,
+                        self.table(key, function).rows(values),
+                    )
+                )
+            else:
+                prepared.append(
+                    (key, function, weight, encode_column(values)[:, np.newaxis], None)
+                )
+
+        def score_chunk(
+            start: int,
+        ) -> list[tuple[npt.NDArray[np.intp], npt.NDArray[np.float64]]]:
+            end = min(start + CHUNK_SIZE, self._size)
+            scores = np.zeros((len(cases), end - start), dtype=np.float64)
+            for key, function, weight, queries, rows in prepared:
+                column = self.column(key)[start:end]
+                if rows is None:
+                    scores += weight * calculate_column(function, queries, column)
+                else:
+                    scores += weight * gather(rows, column)
+            return [
+                (indices + start, similarities)
+                for indices, similarities in top_k_rows(scores, k, threshold)
+            ]
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.jobs)
+        chunks = list(self._executor.map(score_chunk, range(0, self._size, CHUNK_SIZE)))
+        return [
+            merge_top_k([chunk[query] for chunk in chunks], k)
+            for query in range(len(cases))
+        ]
+
+    def save(
+        self, path: Union[str, Path], metadata: Optional[dict[str, Any]] = None
+    ) -> None:
+        """
+        Write the encoded columns and indexes into a directory, so other processes can load them
+        instead of encoding the case base again. Every array is stored as .npy file next to a manifest.json
+        holding the format version, the feature attributes, their weights and the distinct values of
+        dictionary-encoded attributes. The distinct values have to be JSON-serializable.
+        Every file is written to a temporary file first and then moved into place, so saving into the
+        directory an engine was loaded from never overwrites arrays that are memory-mapped, and the manifest is written last.
+
+        Args:
+            path: Union[str, Path] :
+                Directory to write to, created if it doesn't exist
+            metadata: Optional[dict] :
+                Additional JSON-serializable values stored in the manifest, see read_manifest
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        compiled = self.similarity_schema.compile(self.feature_keys)
+        columns: dict[str, dict[str, Any]] = {}
+        for position, key in enumerate(self.feature_keys):
+            encoder = self._encoders.get(key)
+            columns[key] = {
+                "file": f"column_{position}.npy",
+                "categories": None if encoder is None else encoder.categories.tolist(),
+            }
+            _replace(path / columns[key]["file"], np.save, self.column(key))
+        sorted_indexes: dict[str, dict[str, str]] = {}
+        for position, key in enumerate(self.feature_keys):
+            index = self._sorted_indexes.get(key)
+            if index is not None:
+                sorted_indexes[key] = {
+                    "values": f"sorted_{position}_values.npy",
+                    "order": f"sorted_{position}_order.npy",
+                }
+                _replace(path / sorted_indexes[key]["values"], np.save, index.values)
+                _replace(path / sorted_indexes[key]["order"], np.save, index.order)
+        manifest = {
+            "format_version": FORMAT_VERSION,
+            "size": self._size,
+            "feature_keys": self.feature_keys,
+            "weights": dict(zip(compiled.keys, compiled.weights.tolist())),
+            "max_table_size": self.max_table_size,
+            "table_cache_size": self.table_cache_size,
+            "qgram_index": self.qgram_index,
+            "sorted_index": self.sorted_index,
+            "columns": columns,
+            "sorted_indexes": sorted_indexes,
+            "metadata": metadata or {},
+        }
+        _replace(
+            path / MANIFEST_FILE,
+            lambda file, value: file.write(json.dumps(value).encode("utf-8")),
+            manifest,
+        )
+
+    @classmethod
+    def load(
+        cls,
+        path: Union[str, Path],
+        similarity_schema: SimilaritySchema,
+        mmap_mode: Optional[Literal["r+", "r", "w+", "c"]] = "r",
+        jobs: Optional[int] = None,
+    ) -> "BruteForceEngine":
+        """
+        Load an engine written by save. The columns are memory-mapped by default, so processes loading
+        the same directory share the page cache instead of holding their own copy.
+        Appending cases copies a column into memory the first time it has to grow.
+
+        Args:
+            path: Union[str, Path] :
+                Directory written by save
+            similarity_schema: SimilaritySchema :
+                Similarity schema with the same feature weights as the saved engine
+            mmap_mode: Optional[Literal["r+", "r", "w+", "c"]] :
+                Memory-map mode passed to np.load, None reads the arrays into memory
+            jobs: Optional[int] :
+                Number of threads scoring chunks of CHUNK_SIZE cases in parallel, see BruteForceEngine
+
+        Returns:
+            BruteForceEngine
+        """
+        path = Path(path)
+        manifest = read_manifest(path)
+        engine = cls(
+            similarity_schema=similarity_schema,
+            feature_keys=manifest["feature_keys"],
+            max_table_size=manifest["max_table_size"],
+            table_cache_size=manifest["table_cache_size"],
+            qgram_index=manifest["qgram_index"],
+            sorted_index=manifest["sorted_index"],
+            jobs=jobs,
+        )
+        compiled = similarity_schema.compile(engine.feature_keys)
+        if dict(zip(compiled.keys, compiled.weights.tolist())) != manifest["weights"]:
+            raise ValueError(
+                "The similarity schema has different feature weights than the saved index"
+            )
+        for key, column in manifest["columns"].items():
+            engine._columns[key] = np.load(path / column["file"], mmap_mode=mmap_mode)
+            if column["categories"] is not None:
+                engine._encoders[key] = CategoricalEncoder(column["categories"])
+        for key, index in manifest["sorted_indexes"].items():
+            engine._sorted_indexes[key] = SortedIndex.from_arrays(
+                np.load(path / index["values"], mmap_mode=mmap_mode),
+                np.load(path / index["order"], mmap_mode=mmap_mode),
+            )
+        engine._size = engine._capacity = manifest["size"]
+        engine.__build_qgram_indexes()
+        return engine
+
+    def __len__(self) -> int:
+        return self._size
+
+
+FORMAT_VERSION = 1
+"""
+Version of the on-disk format written by BruteForceEngine.save. Loading any other version fails.
+"""
+
+MANIFEST_FILE = "manifest.json"
+
+
+def _replace(path: Path, write: Callable[[Any, Any], Any], value: Any) -> None:
+    """
+    Write a file atomically: write(file, value) fills a temporary file in the same directory,
+    which then replaces the file at path. Readers that still map the old file keep seeing the old contents.
+    """
+    descriptor, temporary = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as file:
+            write(file, value)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def read_manifest(path: Union[str, Path]) -> dict[str, Any]:
+    """
+    Read the manifest of a directory written by BruteForceEngine.save.
+
+    Args:
+        path: Union[str, Path] :
+            Directory written by save
+
+    Returns:
+        The manifest as dictionary, with additional values of the caller under "metadata"
+    """
+    with open(Path(path) / MANIFEST_FILE, encoding="utf-8") as file:
+        manifest: dict[str, Any] = json.load(file)
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported index format version {manifest.get('format_version')}, "
+            f"expected {FORMAT_VERSION}"
+        )
+    return manifest
+
+
+MAX_BLOCK_ELEMENTS = 1 << 22
+"""
+Upper bound for the number of similarity values held in memory while scoring a batch of queries.
+"""
+
+CHUNK_SIZE = 1 << 16
+"""
+Number of cases scored together by one thread. Bounds the intermediate similarity arrays of every thread
+to a few float64 arrays of this length, independent of the size of the case base.
+"""
+
+
+def encode_column(values: list[Any]) -> npt.NDArray[Any]:
+    """
+    Encode the values of one attribute as a NumPy column.
+    Numerical and boolean values are stored as float64 with NaN for missing values (None),
+    all other values are kept as objects.
+
+    Args:
+        values: list :
+            Attribute values of all cases in case base order
+
+    Returns:
+        np.ndarray
+    """
+    column = np.asarray(values)
+    if column.dtype.kind in "biuf":
+        return column.astype(np.float64)
+    if column.dtype == object:
+        present = np.asarray([value for value in values if value is not None])
+        if present.dtype.kind in "biuf":
+            return np.array(
+                [np.nan if value is None else value for value in values],
+                dtype=np.float64,
+            )
+    return np.asarray(values, dtype=object)
+
+
+def calculate_column(
+    function: SimilarityFunction, query: Any, column: npt.NDArray[Any]
+) -> npt.NDArray[np.float64]:
+    """
+    Calculate the similarity between query values and the values of a numerical column.
+    A missing value (NaN) in the column or the query contributes a similarity of 0.0,
+    like a missing value of a dictionary-encoded attribute, so case similarities are never NaN.
+
+    Args:
+        function: SimilarityFunction :
+            Similarity function of the attribute
+        query: Any :
+            Query value or column of query values with shape (queries, 1)
+        column: np.ndarray :
+            Values of all cases
+
+    Returns:
+        np.ndarray of shape (cases,) or (queries, cases)
+    """
+    similarities = calculate_batch(function, query, column)
+    return np.where(np.isnan(similarities), 0.0, similarities)
+
+
+def gather(
+    similarities: npt.NDArray[np.float64], codes: npt.NDArray[np.integer[Any]]
+) -> npt.NDArray[np.float64]:
+    """
+    Expand similarities per distinct value to similarities per case.
+    Cases with a missing value (code -1) get a similarity of 0.0.
+
+    Args:
+        similarities: np.ndarray :
+            Similarity per distinct value, shape (values,) or (queries, values)
+        codes: np.ndarray :
+            Code of every case
+
+    Returns:
+        np.ndarray of shape (cases,) or (queries, cases)
+    """
+    padded = np.zeros(similarities.shape[:-1] + (similarities.shape[-1] + 1,))
+    padded[..., :-1] = similarities
+    return padded[..., codes]
+
+
+def top_k(
+    scores: npt.NDArray[np.float64], k: int, threshold: Optional[float] = None
+) -> tuple[npt.NDArray[np.intp], npt.NDArray[np.float64]]:
+    """
+    Select the k highest scores using a partial sort.
+
+    Args:
+        scores: np.ndarray :
+            Similarity value per case
+        k: int :
+            Number of entries to select
+        threshold: Optional[float] :
+            Only select scores of at least this value
+
+    Returns:
+        Tuple of indices and scores, ordered from highest to lowest score
+    """
+    if threshold is not None:
+        candidates = np.flatnonzero(scores >= threshold)
+        indices, values = top_k(scores[candidates], k)
+        return candidates[indices], values
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.float64)
+    if k < len(scores):
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    order = candidates[np.argsort(-scores[candidates], kind="stable")]
+    return order, scores[order]
+
+
+def top_k_rows(
+    scores: npt.NDArray[np.float64], k: int, threshold: Optional[float] = None
+) -> list[tuple[npt.NDArray[np.intp], npt.NDArray[np.float64]]]:
+    """
+    Select the k highest scores of every row of a similarity matrix using a partial sort.
+
+    Args:
+        scores: np.ndarray :
+            Similarity matrix of shape (number of queries, number of cases)
+        k: int :
+            Number of entries to select per row
+        threshold: Optional[float] :
+            Only select scores of at least this value
+
+    Returns:
+        One tuple of indices and scores per row, ordered from highest to lowest score
+    """
+    rows, size = scores.shape
+    k = min(k, size)
+    if k <= 0:
+        return [top_k(scores[row], 0) for row in range(rows)]
+    if k < size:
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.broadcast_to(np.arange(size), (rows, size))
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+    order = np.argsort(-candidate_scores, axis=1, kind="stable")
+    indices = np.take_along_axis(candidates, order, axis=1)
+    values = np.take_along_axis(candidate_scores, order, axis=1)
+    if threshold is None:
+        return [(indices[row], values[row]) for row in range(rows)]
+    counts = (values >= threshold).sum(axis=1)
+    return [
+        (indices[row, : counts[row]], values[row, : counts[row]]) for row in range(rows)
+    ]
+
+
+def merge_top_k(
+    results: list[tuple[npt.NDArray[np.intp], npt.NDArray[np.float64]]], k: int
+) -> tuple[npt.NDArray[np.intp], npt.NDArray[np.float64]]:
+    """
+    Merge the top k of several chunks or shards into the overall top k.
+
+    Args:
+        results: list[tuple[np.ndarray, np.ndarray]] :
+            Case indices and similarity values of every chunk
+        k: int :
+            Number of entries to select
+
+    Returns:
+        Tuple of case indices and similarity values, ordered from most to least similar
+    """
+    indices = np.concatenate([indices for indices, _ in results])
+    similarities = np.concatenate([similarities for _, similarities in results])
+    order, similarities = top_k(similarities, k)
+    return indices[order], similarities
@@ -0,0 +1,73 @@
+from typing import Optional, Protocol
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class ProgressEvent:
+    """
+    Progress of a train or retrieve call, reported once per processed batch.
+    """
+
+    stage: str
+    """
+    Either "train" or "retrieve".
+    """
+    batch: int
+    """
+    Number of items processed in this batch: cases while training, query cases while retrieving.
+    """
+    completed: int
+    """
+    Number of items processed so far in this call, including this batch.
+    """
+    total: Optional[int]
+    """
+    Number of items the call processes in total. While training on a case base that is read in batches,
+    the total is only known with the last batch and None before.
+    """
+    cases: int
+    """
+    Number of cases in the trained retriever, i.e. how many cases every query is compared with.
+    """
+    elapsed: float
+    """
+    Seconds since the start of the call.
+    """
+
+
+class ProgressListener(Protocol):
+    """
+    Receives progress events of the retriever. Without a listener no events are created at all.
+    """
+
+    def on_progress(self, event: ProgressEvent) -> None: ...
+
+
+class MetricsListener:
+    """
+    Progress listener that sums up how much work the retriever did, e.g. to export it as metrics.
+    """
+
+    def __init__(self):
+        self.trained_cases = 0
+        self.train_seconds = 0.0
+        self.queries = 0
+        self.compared_cases = 0
+        self.retrieve_seconds = 0.0
+
+    def on_progress(self, event: ProgressEvent) -> None:
+        """
+        Add the work of a batch. The duration of a call is added with its last batch.
+
+        Args:
+            event: ProgressEvent : Event reported by the retriever
+        """
+        finished = event.total is not None and event.completed == event.total
+        if event.stage == "train":
+            self.trained_cases += event.batch
+            self.train_seconds += event.elapsed if finished else 0.0
+        else:
+            self.queries += event.batch
+            self.compared_cases += event.batch * event.cases
+            self.retrieve_seconds += event.elapsed if finished else 0.0
@@ -0,0 +1,131 @@
+from typing import Any, Optional, Protocol, Sequence, Union, runtime_checkable
+
+from collections import Counter
+
+import numpy as np
+import numpy.typing as npt
+
+
+def qgrams(value: str, q: int) -> Counter[str]:
+    """
+    Count the q-grams (substrings of length q) of a string.
+
+    Args:
+        value: str : The string to split
+        q: int : Length of the grams
+
+    Returns:
+        Counter of q-gram -> number of occurrences
+    """
+    return Counter(value[i : i + q] for i in range(len(value) - q + 1))
+
+
+@runtime_checkable
+class QGramBounded(Protocol):
+    """
+    Similarity functions that can bound their similarity by the number of q-grams two strings share
+    implement this protocol, e.g. JaroWinkler or a normalized Levenshtein.
+    """
+
+    qgram_size: int
+    """
+    Length of the q-grams the bound is based on.
+    """
+    qgram_bounded: bool
+    """
+    Whether qgram_upper_bound returns a bound. Functions without one don't get a q-gram index.
+    """
+
+    def qgram_upper_bound(
+        self, x: str, lengths: npt.NDArray[np.int64], common: npt.NDArray[np.int64]
+    ) -> Optional[npt.NDArray[np.float64]]:
+        """
+        Upper bound of the similarity between x and strings of the given lengths
+        that share the given number of q-grams with x.
+        """
+        ...
+
+
+class QGramIndex:
+    """
+    The q-gram index is an inverted index from q-grams to the distinct values of a dictionary-encoded attribute.
+    For a query string it counts the q-grams every value shares with the query (as multisets),
+    which similarity functions turn into an upper bound of their similarity without comparing the strings.
+    """
+
+    def __init__(self, q: int):
+        """
+        Create an empty q-gram index.
+
+        Args:
+            q: int : Length of the grams
+        """
+        self.q = q
+        self._postings: dict[str, tuple[list[int], list[int]]] = {}
+        self._arrays: dict[str, tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]] = (
+            {}
+        )
+        self._lengths: list[int] = []
+        self._length_array: Optional[npt.NDArray[np.int64]] = None
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def update(self, categories: Union[Sequence[Any], npt.NDArray[Any]]) -> None:
+        """
+        Index all values that were added to the categories since the last update.
+        Values are identified by their position, i.e. their code.
+
+        Args:
+            categories: Union[Sequence, np.ndarray] : Distinct values of the attribute indexed by code
+        """
+        for code in range(len(self._lengths), len(categories)):
+            value = categories[code]
+            value = value if isinstance(value, str) else ""
+            self._lengths.append(len(value))
+            self._length_array = None
+            for gram, count in qgrams(value, self.q).items():
+                codes, counts = self._postings.setdefault(gram, ([], []))
+                codes.append(code)
+                counts.append(count)
+                self._arrays.pop(gram, None)
+
+    def common(self, query: str) -> npt.NDArray[np.int64]:
+        """
+        Count the q-grams every indexed value shares with the query, respecting multiplicity.
+
+        Args:
+            query: str : Query string
+
+        Returns:
+            np.ndarray of int64 indexed by code
+        """
+        common = np.zeros(len(self._lengths), dtype=np.int64)
+        for gram, query_count in qgrams(query, self.q).items():
+            posting = self.__posting(gram)
+            if posting is not None:
+                codes, counts = posting
+                common[codes] += np.minimum(counts, query_count)
+        return common
+
+    @property
+    def lengths(self) -> npt.NDArray[np.int64]:
+        """
+        Get the length of every indexed value.
+
+        Returns:
+            np.ndarray of int64 indexed by code
+        """
+        if self._length_array is None:
+            self._length_array = np.asarray(self._lengths, dtype=np.int64)
+        return self._length_array
+
+    def __posting(
+        self, gram: str
+    ) -> Optional[tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]]:
+        posting = self._arrays.get(gram)
+        if posting is None and gram in self._postings:
+            codes, counts = self._postings[gram]
+            posting = (np.asarray(codes, dtype=np.int64), np.asarray(counts))
+            self._arrays[gram] = posting
+        return posting
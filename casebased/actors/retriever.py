@@ -1,25 +1,32 @@
-from typing import Optional
-
-from dataclasses import dataclass
-
-import numpy as np
-from sklearn.neighbors import KNeighborsClassifier
-
-from casebased import CaseBaseAdapter
+from typing import Any, Iterator, Optional, Union
+
+from dataclasses import dataclass, field
+from itertools import count
+from pathlib import Path
+from time import perf_counter
+
+from casebased.actors.cache import RetrievalCache
+from casebased.actors.engine import BruteForceEngine, read_manifest
+from casebased.actors.progress import ProgressEvent, ProgressListener
+from casebased.actors.sharding import ShardedEngine
+from casebased.case_base_adapter import (
+    CaseBaseAdapter,
+    ColumnarCaseBaseAdapter,
+    get_cases_by_ids,
+    iter_case_batches,
+)
 from casebased.components.similarity_measure import SimilaritySchema
 from casebased.components.vocabulary import Case
 
+TRAIN_BATCH_SIZE = 10_000
+"""
+Number of cases read from the case base at once while training.
+"""
 
-class Counter:
-    def __init__(self, total_elements: int):
-        self.count = 0
-        self.total_elements = total_elements
-
-    def increment(self):
-        self.count += 1
-
-    def get_count(self):
-        return self.count, self.total_elements
+_versions = count(1)
+"""
+Source of retriever versions, shared by all retrievers so a version never repeats within a process.
+"""
 
 
 @dataclass()
@@ -41,6 +48,43 @@ class Retriever:
     """
     How many cases should be returned.
     """
+    threshold: Optional[float] = None
+    """
+    Minimum similarity of the retrieved cases. Retrieval returns at most k cases with a similarity
+    of at least the threshold, or the k most similar cases if no threshold is set.
+    """
+    listener: Optional[ProgressListener] = None
+    """
+    Receives a progress event for every batch of cases trained and queries retrieved.
+    """
+    qgram_index: bool = False
+    """
+    Build q-gram indexes for string attributes during training, so retrieval only compares the strings
+    of cases that can still be among the k most similar ones. Only attributes whose similarity function
+    has a q-gram upper bound are indexed, e.g. JaroWinkler or a normalized Levenshtein, the others are scored exactly.
+    """
+    sorted_index: bool = False
+    """
+    Keep numerical attributes sorted during training and retrieve with the threshold algorithm,
+    which only visits the cases closest to the query on each attribute. Applies when all weights are
+    non-negative and every numerical attribute uses a monotone similarity function, e.g. Linear or Exponential,
+    otherwise retrieval falls back to scoring every case.
+    """
+
+    processes: Optional[int] = None
+    """
+    Split the case base into one shard per process and score the shards in a process pool,
+    sharing the encoded case base through shared memory. Call close to stop the processes.
+    """
+
+    cache: Optional[RetrievalCache] = None
+    """
+    Cache for the results of repeated queries. Cached results are invalidated whenever the version changes.
+    """
+    version: int = field(default=0, init=False)
+    """
+    Changes whenever the retriever is trained, a case is added or invalidate is called.
+    """
 
     def get_least_similar(self, cases: list[tuple[Case, float]]) -> Optional[Case]:
         """
@@ -65,91 +109,129 @@ class Retriever:
 
         return least_similar
 
-    def train(self, feature_attribute_keys: list[str], jobs: Optional[int] = None):
-        """
-        Train the retriever component.
-        """
-        cases: list[Case] = self.case_base.get_all_cases()
-
-        X = np.array([self.__case_to_ndarray(c, feature_attribute_keys) for c in cases])
-
-        # For labels, we can use dummy indices (since we only need distances)
-        y = np.arange(len(cases))
-
-        def custom_distance_metric(
-            a: np.ndarray, b: np.ndarray, progress_counter: Counter
-        ) -> float:
-            """
-            Convert arrays back to Cases and calculate distance as 1.0 - similarity.
-            """
-            progress_counter.increment()
-            count, total = progress_counter.get_count()
-            if count % 1000 == 0:
-                print(f"Progress: {count}/{total} ({round(count/total * 100, 2)}%)")
-            case_a = self.__ndarray_to_case(a, feature_attribute_keys)
-            case_b = self.__ndarray_to_case(b, feature_attribute_keys)
-            similarity = self.similarity_schema.calculate(case_a, case_b)
-            # sklearn requires a distance metric, so we convert similarity to distance
-            distance = 1.0 - similarity
-            return distance
-
-        progress_counter = Counter(len(X) * 6)
-
-        knn = KNeighborsClassifier(
-            n_neighbors=self.k,
-            metric=custom_distance_metric,
-            metric_params={
-                "progress_counter": progress_counter,
-            },
-            n_jobs=jobs,
-        )
-
-        knn.fit(X, y)
+    def train(
+        self, feature_attribute_keys: list[str], jobs: Optional[int] = None
+    ) -> None:
+        """
+        Train the retriever component by encoding all cases of the case base into the retrieval engine.
 
-        self._knn = knn
+        Args:
+            feature_attribute_keys: list[str] :
+                Feature attributes used to compare cases
+            jobs: Optional[int] :
+                Number of threads scoring chunks of the case base in parallel, -1 uses all cores
+        """
+        start = perf_counter()
+        engine = BruteForceEngine(
+            similarity_schema=self.similarity_schema,
+            feature_keys=feature_attribute_keys,
+            qgram_index=self.qgram_index,
+            sorted_index=self.sorted_index,
+            jobs=jobs,
+        )
+        if isinstance(self.case_base, ColumnarCaseBaseAdapter):
+            engine.fit_columns(
+                {key: self.case_base.column(key) for key in feature_attribute_keys},
+                {key: self.case_base.categories(key) for key in feature_attribute_keys},
+            )
+        else:
+            engine.fit_batches(self.__training_batches(start))
+
+        self.close()
+        self._engine: Union[BruteForceEngine, ShardedEngine] = engine
+        self.invalidate()
+        if self.processes is not None and self.processes > 1:
+            self._engine = ShardedEngine(engine, self.processes)
+        if self.listener is not None and isinstance(
+            self.case_base, ColumnarCaseBaseAdapter
+        ):
+            self.__report("train", len(engine), len(engine), len(engine), start)
+
+    def save(self, path: Union[str, Path]) -> None:
+        """
+        Save the trained retriever into a directory, so other processes can load it instead of training again.
+        The similarity functions aren't saved, they're taken from the similarity schema when loading.
 
-    def __case_to_ndarray(self, case: Case, feature_order: list[str]) -> np.ndarray:
+        Args:
+            path: Directory to write the encoded case base and indexes to.
         """
-        Convert a Case object into an ndarray representation.
+        self._engine.save(path, metadata={"k": self.k, "threshold": self.threshold})
+
+    @classmethod
+    def load(
+        cls,
+        path: Union[str, Path],
+        similarity_schema: SimilaritySchema,
+        case_base: CaseBaseAdapter,
+        listener: Optional[ProgressListener] = None,
+        processes: Optional[int] = None,
+        cache: Optional[RetrievalCache] = None,
+        jobs: Optional[int] = None,
+    ) -> "Retriever":
+        """
+        Load a retriever saved with save. Its arrays are memory-mapped read-only,
+        so every process loading the same directory shares one copy in the page cache.
+        The loaded retriever gets a new version, like a trained one.
 
         Args:
-            case: The Case object to convert.
-            feature_order: List of feature keys in a specific order.
+            path: Directory written by save.
+            similarity_schema: The similarity schema the retriever was trained with.
+            case_base: The case base the retriever was trained on, used to look up the retrieved cases.
+            listener: Receives progress events of the loaded retriever, see Retriever.listener.
+            processes: Number of processes scoring shards of the case base, see Retriever.processes.
+            cache: Cache for the results of repeated queries, see Retriever.cache.
+            jobs: Number of threads scoring chunks of the case base in parallel, see train.
 
         Returns:
-            A numpy array representing the case.
+            The trained retriever.
         """
-        feature_values = []
-
-        for key in feature_order:
-            value = case.feature_attributes.get(key, 0)  # Default to 0 if missing
-
-            # Convert categorical values to numerical encoding
-            if isinstance(value, str):
-                value = hash(value) % 1000  # Simple hashing for consistency
-
-            feature_values.append(value)
+        manifest = read_manifest(path)
+        engine = BruteForceEngine.load(path, similarity_schema, jobs=jobs)
+        retriever = cls(
+            similarity_schema=similarity_schema,
+            case_base=case_base,
+            k=manifest["metadata"]["k"],
+            threshold=manifest["metadata"]["threshold"],
+            listener=listener,
+            qgram_index=engine.qgram_index,
+            sorted_index=engine.sorted_index,
+            processes=processes,
+            cache=cache,
+        )
+        retriever._engine = engine
+        retriever.invalidate()
+        if processes is not None and processes > 1:
+            retriever._engine = ShardedEngine(engine, processes)
+        return retriever
 
-        return np.array(feature_values, dtype=np.float32)
+    def close(self) -> None:
+        """
+        Stop the scoring threads or the worker processes of a sharded retriever and release its shared memory.
+        """
+        if hasattr(self, "_engine"):
+            self._engine.close()
 
-    def __ndarray_to_case(self, array: np.ndarray, feature_order: list[str]) -> Case:
+    def add_case(self, case: Case) -> None:
         """
-        Convert an ndarray representation back into a Case object.
+        Add a case that was appended to the case base to the trained retrieval engine,
+        so it can be retrieved without training the retriever again.
 
         Args:
-            array: The numpy array to convert.
-            feature_order: List of feature keys in the same order used for encoding.
-
-        Returns:
-            A Case object reconstructed from the array.
+            case: The case that was added to the end of the case base.
         """
-        feature_attributes = {key: array[i] for i, key in enumerate(feature_order)}
+        self._engine.add([case])
+        self.invalidate()
 
-        return Case(feature_attributes=feature_attributes, target_attributes={})
+    def invalidate(self) -> None:
+        """
+        Change the version, so the cache doesn't return results from before, e.g. after a case's utility changed.
+        """
+        self.version = next(_versions)
 
     def retrieve(self, case: Case) -> list[tuple[Case, float]]:
         """
         Simply retrieve the k most similar cases to the provided case.
+        Cases below the threshold are left out, so fewer than k cases can be returned.
 
         Args:
             case: The case for which to retrieve the k most similar cases.
@@ -158,17 +240,117 @@ class Retriever:
             A list of tuples where each tuple contains one of the k most similar Cases
             and the similarity value.
         """
-        cases: list[Case] = self.case_base.get_all_cases()
-
-        knn_instance = self._knn
+        key = self.__cache_key(case)
+        if key is not None and self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return list(cached)
+
+        start = perf_counter()
+        indices, similarities = self._engine.kneighbors(case, self.k, self.threshold)
+        if self.listener is not None:
+            self.__report("retrieve", 1, 1, 1, start)
+
+        cases = get_cases_by_ids(self.case_base, indices.tolist())
+        retrieved_cases: list[tuple[Case, float]] = []
+        for retrieved, sim in zip(cases, similarities):
+            retrieved_cases.append((retrieved, float(sim)))
 
-        query_array = self.__case_to_ndarray(case, case.feature_attributes.keys())
+        if key is not None and self.cache is not None:
+            self.cache.put(key, list(retrieved_cases))
+        return retrieved_cases
 
-        distances, indices = knn_instance.kneighbors([query_array], n_neighbors=self.k)
+    def retrieve_many(self, cases: list[Case]) -> list[list[tuple[Case, float]]]:
+        """
+        Retrieve the k most similar cases for a whole batch of cases at once.
+        All queries are scored together, which avoids the per-call overhead of retrieve.
+        Queries with a cached result are left out of scoring.
 
-        retrieved_cases: list[tuple[Case, float]] = []
-        for dist, idx in zip(distances[0], indices[0]):
-            sim = 1.0 - dist
-            retrieved_cases.append((cases[idx], sim))
+        Args:
+            cases: The cases for which to retrieve the k most similar cases.
 
-        return retrieved_cases
+        Returns:
+            One list per given case, where each list contains tuples of one of the k most similar Cases
+            and the similarity value.
+        """
+        cache = self.cache
+        keys = [self.__cache_key(case) for case in cases]
+        results: list[Optional[list[tuple[Case, float]]]] = [
+            None if key is None or cache is None else cache.get(key) for key in keys
+        ]
+        missing = [index for index, result in enumerate(results) if result is None]
+        if len(missing) == 0:
+            return [list(result) for result in results if result is not None]
+
+        callback = None
+        if self.listener is not None:
+            start = perf_counter()
+            completed = 0
+
+            def callback(batch: int) -> None:
+                nonlocal completed
+                completed += batch
+                self.__report("retrieve", batch, completed, len(missing), start)
+
+        neighbors = self._engine.kneighbors_many(
+            [cases[index] for index in missing], self.k, self.threshold, callback
+        )
+        ids = sorted({idx for indices, _ in neighbors for idx in indices.tolist()})
+        retrieved = dict(zip(ids, get_cases_by_ids(self.case_base, ids)))
+        for index, (indices, similarities) in zip(missing, neighbors):
+            retrieved_cases = [
+                (retrieved[idx], float(sim))
+                for idx, sim in zip(indices.tolist(), similarities)
+            ]
+            results[index] = retrieved_cases
+            key = keys[index]
+            if key is not None and cache is not None:
+                cache.put(key, list(retrieved_cases))
+        return [list(result) for result in results if result is not None]
+
+    def __training_batches(self, start: float) -> Iterator[list[Case]]:
+        """
+        Read the case base in batches, reporting every batch once the engine encoded it.
+        """
+        completed = 0
+        previous: list[Case] = []
+        for batch in iter_case_batches(self.case_base, TRAIN_BATCH_SIZE):
+            if previous and self.listener is not None:
+                self.__report("train", len(previous), completed, None, start, completed)
+            yield batch
+            completed += len(batch)
+            previous = batch
+        if previous and self.listener is not None:
+            self.__report(
+                "train", len(previous), completed, completed, start, completed
+            )
+
+    def __cache_key(self, case: Case) -> Optional[tuple[Any, ...]]:
+        if self.cache is None:
+            return None
+        query = self._engine.query_key(case)
+        if query is None:
+            return None
+        return query, self.k, self.threshold, self.version
+
+    def __report(
+        self,
+        stage: str,
+        batch: int,
+        completed: int,
+        total: Optional[int],
+        start: float,
+        cases: Optional[int] = None,
+    ) -> None:
+        if self.listener is None:
+            return
+        self.listener.on_progress(
+            ProgressEvent(
+                stage=stage,
+                batch=batch,
+                completed=completed,
+                total=total,
+                cases=len(self._engine) if cases is None else cases,
+                elapsed=perf_counter() - start,
+            )
+        )
@@ -0,0 +1,255 @@
+from typing import Any, Callable, Optional, Union
+
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+
+from casebased.actors.engine import BruteForceEngine, merge_top_k
+from casebased.components.similarity_measure import SimilaritySchema
+from casebased.components.vocabulary import Case
+
+_shared_columns: dict[str, npt.NDArray[Any]] = {}
+_shared_memory: list[SharedMemory] = []
+_worker_options: dict[str, Any] = {}
+_shard_engines: dict[tuple[int, int], BruteForceEngine] = {}
+
+
+class ShardedEngine:
+    """
+    The sharded engine spreads the scoring of a trained engine across a pool of processes.
+    The encoded columns are copied once into shared memory, every worker process attaches to them without copying
+    and scores contiguous shards of the case base. Each shard returns its own top k, which are merged into the overall top k.
+
+    Cases added after sharding are kept in a separate tail engine in this process and merged the same way.
+    """
+
+    def __init__(self, engine: BruteForceEngine, processes: int):
+        """
+        Share the columns of a fitted engine with a new process pool.
+
+        Args:
+            engine: BruteForceEngine :
+                Fitted engine holding all cases of the case base
+            processes: int :
+                Number of worker processes, the case base is split into one shard per process
+        """
+        self.engine = engine
+        self.processes = processes
+        self._sharded_size = len(engine)
+        bounds = np.linspace(0, self._sharded_size, processes + 1).astype(int)
+        self._shards = [
+            (int(start), int(end))
+            for start, end in zip(bounds, bounds[1:])
+            if end > start
+        ]
+
+        self._memory: list[SharedMemory] = []
+        columns = {}
+        categories = {}
+        for key in engine.feature_keys:
+            column = engine.column(key)
+            memory = SharedMemory(create=True, size=max(column.nbytes, 1))
+            np.ndarray(column.shape, column.dtype, buffer=memory.buf)[:] = column
+            self._memory.append(memory)
+            columns[key] = (memory.name, column.dtype.str, len(column))
+            encoder = engine.encoder(key)
+            categories[key] = None if encoder is None else encoder.categories.tolist()
+
+        self._tail = self.__new_engine()
+        self._tail.fit([])
+        self._executor = ProcessPoolExecutor(
+            max_workers=processes,
+            initializer=_attach,
+            initargs=(
+                columns,
+                categories,
+                {
+                    "similarity_schema": engine.similarity_schema,
+                    "feature_keys": engine.feature_keys,
+                    "max_table_size": engine.max_table_size,
+                    "table_cache_size": engine.table_cache_size,
+                    "qgram_index": engine.qgram_index,
+                    "sorted_index": engine.sorted_index,
+                },
+            ),
+        )
+        self._finalizer = weakref.finalize(self, _release, self._executor, self._memory)
+
+    @property
+    def similarity_schema(self) -> SimilaritySchema:
+        return self.engine.similarity_schema
+
+    @property
+    def qgram_index(self) -> bool:
+        return self.engine.qgram_index
+
+    @property
+    def sorted_index(self) -> bool:
+        return self.engine.sorted_index
+
+    def query_key(self, case: Case) -> Optional[tuple[Any, ...]]:
+        """
+        Get a canonical, hashable key of the feature values of a query, see BruteForceEngine.query_key.
+        """
+        return self.engine.query_key(case)
+
+    def add(self, cases: list[Case]) -> None:
+        """
+        Append cases to the engine and to the tail, which is scored in this process.
+
+        Args:
+            cases: list[Case] :
+                New cases of the case base
+        """
+        self.engine.add(cases)
+        self._tail.add(cases)
+
+    def kneighbors(
+        self, case: Case, k: int, threshold: Optional[float] = None
+    ) -> tuple[npt.NDArray[np.intp], npt.NDArray[np.float64]]:
+        """
+        Find the k most similar cases to the given case, scoring all shards in parallel.
+
+        Args:
+            case: Case :
+                The query case
+            k: int :
+                Number of cases to return
+            threshold: Optional[float] :
+                Minimum similarity of the returned cases
+
+        Returns:
+            Tuple of case indices and their similarity values, ordered from most to least similar
+        """
+        return self.kneighbors_many([case], k, threshold)[0]
+
+    def kneighbors_many(
+        self,
+        cases: list[Case],
+        k: int,
+        threshold: Optional[float] = None,
+        callback: Optional[Callable[[int], None]] = None,
+    ) -> list[tuple[npt.NDArray[np.intp], npt.NDArray[np.float64]]]:
+        """
+        Find the k most similar cases for every given case, scoring all shards in parallel.
+
+        Args:
+            cases: list[Case] :
+                The query cases
+            k: int :
+                Number of cases to return per query
+            threshold: Optional[float] :
+                Minimum similarity of the returned cases
+            callback: Optional[Callable[[int], None]] :
+                Called with the number of queries once all shards are scored
+
+        Returns:
+            One tuple of case indices and similarity values per query, ordered from most to least similar
+        """
+        futures = [
+            self._executor.submit(_kneighbors_shard, shard, cases, k, threshold)
+            for shard in self._shards
+        ]
+        results = [future.result() for future in futures]
+        if len(self._tail) > 0:
+            results.append(
+                [
+                    (indices + self._sharded_size, similarities)
+                    for indices, similarities in self.__tail_kneighbors(
+                        cases, k, threshold
+                    )
+                ]
+            )
+        merged = [
+            merge_top_k([shard[query] for shard in results], k)
+            for query in range(len(cases))
+        ]
+        if callback is not None:
+            callback(len(cases))
+        return merged
+
+    def save(
+        self, path: Union[str, Path], metadata: Optional[dict[str, Any]] = None
+    ) -> None:
+        """
+        Save the engine including the cases added after sharding, see BruteForceEngine.save.
+        """
+        self.engine.save(path, metadata)
+
+    def close(self) -> None:
+        """
+        Shut down the worker processes and release the shared memory.
+        """
+        self._finalizer()
+
+    def __len__(self) -> int:
+        return len(self.engine)
+
+    def __tail_kneighbors(
+        self, cases: list[Case], k: int, threshold: Optional[float]
+    ) -> list[tuple[npt.NDArray[np.intp], npt.NDArray[np.float64]]]:
+        if len(cases) == 1:
+            return [self._tail.kneighbors(cases[0], k, threshold)]
+        return self._tail.kneighbors_many(cases, k, threshold)
+
+    def __new_engine(self) -> BruteForceEngine:
+        return BruteForceEngine(
+            similarity_schema=self.engine.similarity_schema,
+            feature_keys=self.engine.feature_keys,
+            max_table_size=self.engine.max_table_size,
+            table_cache_size=self.engine.table_cache_size,
+            qgram_index=self.engine.qgram_index,
+            sorted_index=self.engine.sorted_index,
+        )
+
+
+def _attach(
+    columns: dict[str, tuple[str, str, int]],
+    categories: dict[str, Optional[list[Any]]],
+    options: dict[str, Any],
+) -> None:
+    """
+    Attach a worker process to the shared columns.
+    """
+    for key, (name, dtype, size) in columns.items():
+        memory = SharedMemory(name=name)
+        _shared_memory.append(memory)
+        _shared_columns[key] = np.ndarray((size,), np.dtype(dtype), buffer=memory.buf)
+    _worker_options.update(options, categories=categories)
+
+
+def _kneighbors_shard(
+    shard: tuple[int, int], cases: list[Case], k: int, threshold: Optional[float]
+) -> list[tuple[npt.NDArray[np.intp], npt.NDArray[np.float64]]]:
+    """
+    Find the k most similar cases of one shard in a worker process.
+    The engine of a shard is built from zero-copy slices of the shared columns on first use.
+    """
+    engine = _shard_engines.get(shard)
+    if engine is None:
+        options = dict(_worker_options)
+        categories = options.pop("categories")
+        engine = BruteForceEngine(**options)
+        start, end = shard
+        engine.fit_columns(
+            {key: column[start:end] for key, column in _shared_columns.items()},
+            categories,
+        )
+        _shard_engines[shard] = engine
+
+    if len(cases) == 1:
+        results = [engine.kneighbors(cases[0], k, threshold)]
+    else:
+        results = engine.kneighbors_many(cases, k, threshold)
+    return [(indices + shard[0], similarities) for indices, similarities in results]
+
+
+def _release(executor: ProcessPoolExecutor, memory: list[SharedMemory]) -> None:
+    executor.shutdown(wait=True)
+    for block in memory:
+        block.close()
+        block.unlink()
@@ -0,0 +1,137 @@
+from typing import Any, Iterable, Optional
+
+from collections import OrderedDict
+
+import numpy as np
+import numpy.typing as npt
+
+from casebased.actors.encoding import CategoricalEncoder
+from casebased.components.similarity_measure import SimilarityFunction
+from casebased.components.similarity_measure.types import calculate_batch
+
+
+class SimilarityTable:
+    """
+    The similarity table caches the similarity between query values and all distinct values of a dictionary-encoded attribute.
+    Each cached row holds the similarity of one query value to every category, so scoring the attribute
+    for all cases becomes a single gather by code instead of calling the similarity function again.
+
+    For attributes with at most max_dense distinct values every row stays cached, which amounts to a full value x value matrix.
+    Attributes with higher cardinality keep the most recently used rows, bounded by memory rather than by row count:
+    at most max_elements similarity values are cached, i.e. max_elements // categories rows but always at least one.
+    """
+
+    def __init__(
+        self,
+        function: SimilarityFunction,
+        encoder: CategoricalEncoder,
+        max_dense: int = 1024,
+        max_elements: int = 1 << 22,
+    ):
+        """
+        Create a similarity table for one attribute.
+
+        Args:
+            function: SimilarityFunction :
+                Similarity function of the attribute
+            encoder: CategoricalEncoder :
+                Encoder holding the distinct values of the attribute
+            max_dense: int :
+                Up to this number of distinct values all rows are kept
+            max_elements: int :
+                Number of similarity values kept for attributes with more distinct values,
+                the default of 4M values holds 32 MB of float64
+        """
+        self.function = function
+        self.encoder = encoder
+        self.max_dense = max_dense
+        self.max_elements = max_elements
+        self._rows: OrderedDict[Any, npt.NDArray[np.float64]] = OrderedDict()
+
+    def row(self, value: Any) -> npt.NDArray[np.float64]:
+        """
+        Get the similarity between a query value and every category, indexed by code.
+        Rows of earlier calls are extended when new categories were added to the encoder since.
+
+        Args:
+            value: Any : Query value
+
+        Returns:
+            np.ndarray of float64
+        """
+        categories = self.encoder.categories
+        try:
+            cached = self._rows.get(value)
+        except TypeError:
+            return calculate_batch(self.function, value, categories)
+
+        if cached is None:
+            cached = calculate_batch(self.function, value, categories)
+        elif len(cached) < len(categories):
+            cached = np.concatenate(
+                [
+                    cached,
+                    calculate_batch(self.function, value, categories[len(cached) :]),
+                ]
+            )
+        else:
+            self._rows.move_to_end(value)
+            return cached
+
+        self._rows[value] = cached
+        while len(self._rows) > max(self.max_rows, self.capacity):
+            self._rows.popitem(last=False)
+        return cached
+
+    def lookup(self, value: Any) -> Optional[npt.NDArray[np.float64]]:
+        """
+        Get the row of a query value only if it is already cached and covers all categories.
+
+        Args:
+            value: Any : Query value
+
+        Returns:
+            np.ndarray of float64 or None
+        """
+        try:
+            cached = self._rows.get(value)
+        except TypeError:
+            return None
+        if cached is None or len(cached) < len(self.encoder):
+            return None
+        return cached
+
+    def rows(self, values: Iterable[Any]) -> npt.NDArray[np.float64]:
+        """
+        Get the rows of several query values.
+
+        Args:
+            values: Iterable : Query values
+
+        Returns:
+            np.ndarray of shape (queries, categories)
+        """
+        rows = [self.row(value) for value in values]
+        if len(rows) == 0:
+            return np.zeros((0, len(self.encoder)), dtype=np.float64)
+        return np.stack(rows)
+
+    @property
+    def max_rows(self) -> int:
+        """
+        Get the number of rows of a high-cardinality attribute that fit into max_elements, at least one.
+
+        Returns:
+            int
+        """
+        return max(self.max_elements // max(len(self.encoder), 1), 1)
+
+    @property
+    def capacity(self) -> int:
+        """
+        Get the number of rows that are never evicted, which is the number of categories for dense tables.
+
+        Returns:
+            int
+        """
+        return len(self.encoder) if len(self.encoder) <= self.max_dense else 0
@@ -0,0 +1,87 @@
+from typing import Any, Iterator
+
+import numpy as np
+import numpy.typing as npt
+
+
+class SortedIndex:
+    """
+    The sorted index keeps the values of a numerical attribute in ascending order together with the case index of every value.
+    Walking outward from a query value visits the cases in order of increasing distance on this attribute,
+    which lets the retriever bound the similarity of all cases it hasn't visited yet.
+    """
+
+    def __init__(self, values: npt.NDArray[Any]):
+        """
+        Sort the values of a numerical attribute.
+
+        Args:
+            values: np.ndarray : Value of every case in case base order
+        """
+        self.order = np.argsort(values, kind="stable")
+        self.values = np.asarray(values, dtype=np.float64)[self.order]
+
+    @classmethod
+    def from_arrays(
+        cls, values: npt.NDArray[np.float64], order: npt.NDArray[np.intp]
+    ) -> "SortedIndex":
+        """
+        Restore a sorted index from its arrays without sorting again, e.g. from memory-mapped files.
+
+        Args:
+            values: np.ndarray : Values in ascending order
+            order: np.ndarray : Case index of every sorted value
+
+        Returns:
+            SortedIndex
+        """
+        index = cls.__new__(cls)
+        index.values = values
+        index.order = order
+        return index
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def insert(self, values: npt.NDArray[Any]) -> None:
+        """
+        Insert the values of cases that were appended to the case base, keeping the index sorted
+        without sorting the existing values again.
+
+        Args:
+            values: np.ndarray : Value of every new case in case base order
+        """
+        order = np.argsort(values, kind="stable")
+        values = np.asarray(values, dtype=np.float64)[order]
+        positions = np.searchsorted(self.values, values, side="right")
+        self.order = np.insert(self.order, positions, order + len(self.values))
+        self.values = np.insert(self.values, positions, values)
+
+    def walk(
+        self, query: float, block_size: int
+    ) -> Iterator[tuple[npt.NDArray[np.intp], npt.NDArray[np.float64]]]:
+        """
+        Visit the cases in blocks, moving outward from the query value in both directions.
+        Each block is twice as large as the previous one.
+
+        Args:
+            query: float : Query value to start from
+            block_size: int : Number of cases to visit on each side in the first block
+
+        Returns:
+            Iterator of the case indices of each block and the nearest values not visited yet
+            on the left and right side, NaN once a side is exhausted
+        """
+        left = right = int(np.searchsorted(self.values, query))
+        while left > 0 or right < len(self.values):
+            start, end = max(left - block_size, 0), min(right + block_size, len(self))
+            visited = np.concatenate([self.order[start:left], self.order[right:end]])
+            left, right = start, end
+            frontier = np.array(
+                [
+                    self.values[left - 1] if left > 0 else np.nan,
+                    self.values[right] if right < len(self.values) else np.nan,
+                ]
+            )
+            yield visited, frontier
+            block_size *= 2
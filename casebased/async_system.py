@@ -0,0 +1,148 @@
+from typing import Any, Callable, Optional, TypeVar, Union
+
+import asyncio
+from concurrent.futures import Executor
+
+from casebased.components.vocabulary import Case
+from casebased.system import CaseBasedSystem
+
+T = TypeVar("T")
+
+
+class AsyncCaseBasedSystem:
+    """
+    The async case-based system wraps a CaseBasedSystem for asyncio applications.
+    Blocking calls run in an executor, so scoring never stalls the event loop.
+    Concurrent retrieve calls are collected for a short moment and scored together in a single
+    retrieve_many pass, which keeps latency flat when many requests arrive at once.
+
+    Calls that use the retriever run one after another, so the wrapped system is never used by two threads at once.
+    """
+
+    def __init__(
+        self,
+        system: CaseBasedSystem,
+        executor: Optional[Executor] = None,
+        max_batch_size: int = 256,
+        max_delay: float = 0.001,
+    ):
+        """
+        Wrap a case-based system.
+
+        Args:
+            system: CaseBasedSystem :
+                The system to wrap
+            executor: Optional[Executor] :
+                Executor running the blocking calls, None uses the event loop's default executor
+            max_batch_size: int :
+                A batch is scored as soon as it holds this many queries
+            max_delay: float :
+                Seconds to wait for more queries after the first query of a batch arrived
+        """
+        self.system = system
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self._pending: list[tuple[Case, asyncio.Future[list[tuple[Case, float]]]]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def train(
+        self, jobs: Optional[int] = None, processes: Optional[int] = None
+    ) -> None:
+        """
+        Train the wrapped system, see CaseBasedSystem.train.
+        """
+        await self.__run_locked(self.system.train, jobs, processes)
+
+    async def retrieve(self, case: Case) -> list[tuple[Case, float]]:
+        """
+        Retrieve the k most similar cases to the given case.
+        The query is scored together with all other queries arriving within max_delay.
+
+        Args:
+            case: Case : The query case
+
+        Returns:
+            A list of tuples with one of the k most similar cases and the similarity value.
+        """
+        if self.system.vocabulary.validate_case(case) is False:
+            raise ValueError("Case is not valid.")
+
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[list[tuple[Case, float]]] = loop.create_future()
+        self._pending.append((case, future))
+        if len(self._pending) >= self.max_batch_size:
+            self.__flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_delay, self.__flush)
+        return await future
+
+    async def retrieve_many(self, cases: list[Case]) -> list[list[tuple[Case, float]]]:
+        """
+        Retrieve the k most similar cases for every given case in a single batch, see CaseBasedSystem.retrieve_many.
+        """
+        return await self.__run_locked(self.system.retrieve_many, cases)
+
+    async def reuse(self, case: Case) -> None:
+        """
+        Add the new case to the case base, see CaseBasedSystem.reuse.
+        """
+        await self.__run_locked(self.system.reuse, case)
+
+    async def change_utility(self, case: Case, utility: int) -> None:
+        """
+        Change the utility of a case, see CaseBasedSystem.change_utility.
+        """
+        await self.__run_locked(self.system.change_utility, case, utility)
+
+    async def adapt(
+        self, case: Case, similar_cases: Union[list[Case], list[tuple[Case, float]]]
+    ) -> Case:
+        """
+        Adapt a previous case solution to solve the new case, see CaseBasedSystem.adapt.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, self.system.adapt, case, similar_cases
+        )
+
+    def __flush(self) -> None:
+        """
+        Hand the pending queries to a task that scores them as one batch.
+        The task is referenced until it's done, so it can't be garbage-collected while the queries wait for it.
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self.__score(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def __score(
+        self, batch: list[tuple[Case, asyncio.Future[list[tuple[Case, float]]]]]
+    ) -> None:
+        cases = [case for case, _ in batch]
+        try:
+            if len(cases) == 1:
+                results = [await self.__run_locked(self.system.retrieve, cases[0])]
+            else:
+                results = await self.__run_locked(self.system.retrieve_many, cases)
+        except Exception as error:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def __run_locked(self, function: Callable[..., T], *args: Any) -> T:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            return await loop.run_in_executor(self.executor, function, *args)
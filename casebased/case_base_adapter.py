@@ -1,4 +1,7 @@
-from typing import Optional, Protocol
+from typing import Any, Iterator, Optional, Protocol, Sequence, runtime_checkable
+
+import numpy as np
+import numpy.typing as npt
 
 from casebased.components.vocabulary import Case
 
@@ -8,6 +11,8 @@ class CaseBaseAdapter(Protocol):
     The case base is the storage for all cases in the CBR system. It can be implemented in different ways, e.g. as a list, a database, or a file.
     Since we're not in position to define which technologies you have to use, we provide you an interface to implement your own case base.
     For the library to properly work you have to implement the following functions.
+    The functions marked as optional have default implementations: case bases inheriting from this class get them directly,
+    case bases only matching the protocol structurally get them through the module functions iter_case_batches and get_cases_by_ids.
     """
 
     def get_all_cases(self) -> list[Case]:
@@ -33,3 +38,87 @@ class CaseBaseAdapter(Protocol):
         which gives information about its knowledge value for the CBR system.
         """
         ...
+
+    def iter_case_batches(self, batch_size: int) -> Iterator[list[Case]]:
+        """
+        Optionally this function yields all cases in batches of at most batch_size cases, in the same order as get_all_cases.
+        The retriever trains on these batches, so case bases backed by a database never have to hold all cases at once.
+        By default the batches are sliced from get_all_cases.
+        """
+        cases = self.get_all_cases()
+        for start in range(0, len(cases), batch_size):
+            yield cases[start : start + batch_size]
+
+    def get_cases_by_ids(self, ids: Sequence[int]) -> list[Case]:
+        """
+        Optionally this function returns the cases at the given positions of get_all_cases, in the order of the ids.
+        The retriever uses it to fetch only the retrieved cases after scoring.
+        By default the cases are looked up in get_all_cases.
+        """
+        cases = self.get_all_cases()
+        return [cases[index] for index in ids]
+
+
+@runtime_checkable
+class ColumnarCaseBaseAdapter(Protocol):
+    """
+    Case bases that keep their cases in columns can additionally implement this protocol.
+    The retriever then reads the attribute columns directly instead of materializing every case through get_all_cases.
+    It's checked with isinstance and only requires column and categories,
+    independent of whether the case base implements the optional functions of CaseBaseAdapter.
+    """
+
+    def column(self, name: str) -> npt.NDArray[Any]:
+        """
+        This function returns the values of one attribute for all cases, in the same order as get_all_cases.
+        Columns of dictionary-encoded attributes contain integer codes, which are resolved using categories.
+        """
+        ...
+
+    def categories(self, name: str) -> Optional[list[Any]]:
+        """
+        This function returns the distinct values of a dictionary-encoded attribute indexed by their code,
+        or None if the column of the attribute already contains the values.
+        A code of -1 marks a missing value.
+        """
+        ...
+
+
+def iter_case_batches(
+    case_base: CaseBaseAdapter, batch_size: int
+) -> Iterator[list[Case]]:
+    """
+    Iterate over the cases of any case base in batches.
+    Case bases that don't inherit from CaseBaseAdapter and lack iter_case_batches use the default implementation.
+
+    Args:
+        case_base: CaseBaseAdapter : The case base to read
+        batch_size: int : Maximum number of cases per batch
+
+    Returns:
+        Iterator of case lists
+    """
+    batches = getattr(case_base, "iter_case_batches", None)
+    if batches is None:
+        return CaseBaseAdapter.iter_case_batches(case_base, batch_size)
+    iterator: Iterator[list[Case]] = batches(batch_size)
+    return iterator
+
+
+def get_cases_by_ids(case_base: CaseBaseAdapter, ids: Sequence[int]) -> list[Case]:
+    """
+    Fetch cases by their position from any case base.
+    Case bases that don't inherit from CaseBaseAdapter and lack get_cases_by_ids use the default implementation.
+
+    Args:
+        case_base: CaseBaseAdapter : The case base to read
+        ids: Sequence[int] : Positions of the cases
+
+    Returns:
+        list[Case]
+    """
+    fetch = getattr(case_base, "get_cases_by_ids", None)
+    if fetch is None:
+        return CaseBaseAdapter.get_cases_by_ids(case_base, ids)
+    cases: list[Case] = fetch(ids)
+    return cases
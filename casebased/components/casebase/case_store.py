@@ -0,0 +1,330 @@
+from typing import Any, Iterable, Iterator, Optional, Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+from casebased.components.vocabulary import Attribute, Case, Vocabulary
+
+NUMPY_TYPES = {
+    bool: np.bool_,
+    int: np.int64,
+    float: np.float64,
+}
+"""
+Column dtype per attribute data type. Attributes of any other type are dictionary-encoded.
+"""
+
+MISSING_CODE = -1
+"""
+Code of a missing value (None) in a dictionary-encoded column.
+"""
+
+
+class CaseStore:
+    """
+    The case store is a columnar, in-memory case base that implements the CaseBaseAdapter protocol.
+    Every attribute of the vocabulary is stored in its own typed NumPy array,
+    string attributes are dictionary-encoded into int32 codes and a list of distinct values.
+    The retriever reads the columns as zero-copy views instead of materializing every case.
+    """
+
+    def __init__(self, vocabulary: Vocabulary, capacity: int = 1024):
+        """
+        Create an empty case store with one column per vocabulary attribute.
+
+        Args:
+            vocabulary: Vocabulary :
+                Defines the attributes and their data types
+            capacity: int :
+                Number of cases the columns can hold before they have to grow
+        """
+        self.vocabulary = vocabulary
+        self._feature_names = vocabulary.feature_names
+        self._target_names = vocabulary.target_names
+        self._size = 0
+        self._capacity = max(capacity, 1)
+        self._attributes: dict[str, Attribute] = {
+            attr.name: attr for attr in vocabulary.features + vocabulary.targets
+        }
+        self._columns: dict[str, npt.NDArray[Any]] = {}
+        self._missing: dict[str, npt.NDArray[np.bool_]] = {}
+        self._categories: dict[str, list[Any]] = {}
+        self._category_codes: dict[str, dict[Any, int]] = {}
+        for name, attr in self._attributes.items():
+            if attr.data_type in NUMPY_TYPES:
+                self._columns[name] = np.zeros(
+                    self._capacity, dtype=NUMPY_TYPES[attr.data_type]
+                )
+                self._missing[name] = np.zeros(self._capacity, dtype=np.bool_)
+            else:
+                self._columns[name] = np.full(
+                    self._capacity, MISSING_CODE, dtype=np.int32
+                )
+                self._categories[name] = []
+                self._category_codes[name] = {}
+        self._utilities = np.zeros(self._capacity, dtype=np.int64)
+        self._cases: Optional[list[Case]] = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def get_all_cases(self) -> list[Case]:
+        """
+        Materialize all cases of the store.
+        The list is cached until the store changes.
+
+        Returns:
+            list[Case]
+        """
+        if self._cases is None:
+            features = self.__decode_all(self._feature_names)
+            targets = self.__decode_all(self._target_names)
+            utilities = self.utilities.tolist()
+            self._cases = [
+                Case(
+                    feature_attributes=features[index],
+                    target_attributes=targets[index],
+                    utility=utilities[index],
+                )
+                for index in range(self._size)
+            ]
+        return self._cases
+
+    def get_case(self, index: int) -> Case:
+        """
+        Materialize a single case by its position in the store.
+
+        Args:
+            index: int : Position of the case
+
+        Returns:
+            Case
+        """
+        if not 0 <= index < self._size:
+            raise IndexError(f"Case index {index} is out of range")
+        return Case(
+            feature_attributes={
+                name: self.__decode(name, index) for name in self._feature_names
+            },
+            target_attributes={
+                name: self.__decode(name, index) for name in self._target_names
+            },
+            utility=int(self._utilities[index]),
+        )
+
+    def get_cases_by_ids(self, ids: Sequence[int]) -> list[Case]:
+        """
+        Materialize only the cases at the given positions.
+
+        Args:
+            ids: Sequence[int] : Positions of the cases
+
+        Returns:
+            list[Case]
+        """
+        if self._cases is not None:
+            return [self._cases[index] for index in ids]
+        return [self.get_case(index) for index in ids]
+
+    def iter_case_batches(self, batch_size: int) -> Iterator[list[Case]]:
+        """
+        Materialize the cases of the store batch by batch.
+
+        Args:
+            batch_size: int : Maximum number of cases per batch
+
+        Returns:
+            Iterator of case lists
+        """
+        for start in range(0, self._size, batch_size):
+            yield self.get_cases_by_ids(
+                range(start, min(start + batch_size, self._size))
+            )
+
+    def create_case(self, case: Case) -> Optional[bool]:
+        """
+        Append a case to the store.
+
+        Args:
+            case: Case : The case to add
+
+        Returns:
+            True
+        """
+        self.add_cases([case])
+        return True
+
+    def add_cases(self, cases: Iterable[Case]) -> None:
+        """
+        Append several cases to the store, growing the columns at most once.
+
+        Args:
+            cases: Iterable[Case] : The cases to add
+        """
+        cases = list(cases)
+        start = self._size
+        self.__reserve(start + len(cases))
+        for name in self._attributes:
+            values = [self.__value(case, name) for case in cases]
+            self.__write(name, start, values)
+        self._utilities[start : start + len(cases)] = [case.utility for case in cases]
+        self._size += len(cases)
+        if self._cases is not None:
+            self._cases.extend(cases)
+
+    def change_utility(self, case: Case, utility: int) -> Optional[bool]:
+        """
+        Change the utility of the first stored case with the same attribute values.
+
+        Args:
+            case: Case : The case to update
+            utility: int : New utility value
+
+        Returns:
+            True if the case was found, False otherwise
+        """
+        mask = np.ones(self._size, dtype=np.bool_)
+        for name in self._attributes:
+            mask &= self.__equals(name, self.__value(case, name))
+        matches = np.flatnonzero(mask)
+        if len(matches) == 0:
+            return False
+        self._utilities[matches[0]] = utility
+        self._cases = None
+        return True
+
+    def column(self, name: str) -> npt.NDArray[Any]:
+        """
+        Get a read-only, zero-copy view of an attribute column.
+        Dictionary-encoded attributes return their int32 codes, see categories.
+        Numerical columns with missing values are returned as a float64 copy with NaN for every missing value.
+
+        Args:
+            name: str : Attribute name
+
+        Returns:
+            np.ndarray
+        """
+        view = self._columns[name][: self._size]
+        missing = self._missing.get(name)
+        if missing is not None and missing[: self._size].any():
+            view = view.astype(np.float64)
+            view[missing[: self._size]] = np.nan
+        view.flags.writeable = False
+        return view
+
+    def categories(self, name: str) -> Optional[list[Any]]:
+        """
+        Get the distinct values of a dictionary-encoded attribute, indexed by code.
+
+        Args:
+            name: str : Attribute name
+
+        Returns:
+            list of values or None if the attribute isn't dictionary-encoded
+        """
+        return self._categories.get(name)
+
+    @property
+    def utilities(self) -> npt.NDArray[np.int64]:
+        """
+        Get a read-only view of the utility of every case.
+
+        Returns:
+            np.ndarray of int64
+        """
+        view = self._utilities[: self._size]
+        view.flags.writeable = False
+        return view
+
+    def __value(self, case: Case, name: str) -> Any:
+        if self._attributes[name].is_target:
+            return case.target_attributes.get(name)
+        return case.feature_attributes.get(name)
+
+    def __reserve(self, size: int) -> None:
+        """
+        Grow all columns to at least the given size by doubling their capacity.
+        """
+        if size <= self._capacity:
+            return
+        capacity = self._capacity
+        while capacity < size:
+            capacity *= 2
+        for columns in (self._columns, self._missing):
+            for name, column in columns.items():
+                grown = np.zeros(capacity, dtype=column.dtype)
+                if name in self._categories:
+                    grown.fill(MISSING_CODE)
+                grown[: self._size] = column[: self._size]
+                columns[name] = grown
+        utilities = np.zeros(capacity, dtype=np.int64)
+        utilities[: self._size] = self._utilities[: self._size]
+        self._utilities = utilities
+        self._capacity = capacity
+
+    def __write(self, name: str, start: int, values: list[Any]) -> None:
+        end = start + len(values)
+        if name in self._categories:
+            self._columns[name][start:end] = [self.__encode(name, v) for v in values]
+            return
+        missing = [value is None for value in values]
+        self._missing[name][start:end] = missing
+        self._columns[name][start:end] = [
+            0 if is_missing else value for value, is_missing in zip(values, missing)
+        ]
+
+    def __encode(self, name: str, value: Any) -> int:
+        if value is None:
+            return MISSING_CODE
+        codes = self._category_codes[name]
+        code = codes.get(value)
+        if code is None:
+            code = len(codes)
+            codes[value] = code
+            self._categories[name].append(value)
+        return code
+
+    def __equals(self, name: str, value: Any) -> npt.NDArray[np.bool_]:
+        column = self._columns[name][: self._size]
+        if name in self._categories:
+            code = (
+                MISSING_CODE
+                if value is None
+                else self._category_codes[name].get(value, MISSING_CODE - 1)
+            )
+            matches: npt.NDArray[np.bool_] = column == code
+            return matches
+        missing = self._missing[name][: self._size]
+        if value is None:
+            return missing
+        present: npt.NDArray[np.bool_] = (column == value) & ~missing
+        return present
+
+    def __decode(self, name: str, index: int) -> Any:
+        if name in self._categories:
+            code = int(self._columns[name][index])
+            return None if code == MISSING_CODE else self._categories[name][code]
+        if self._missing[name][index]:
+            return None
+        return self._columns[name][index].item()
+
+    def __decode_all(self, names: Iterable[str]) -> list[dict[str, Any]]:
+        """
+        Decode the given columns into one dictionary of attribute values per case.
+        """
+        decoded: dict[str, list[Any]] = {}
+        for name in names:
+            column = self._columns[name][: self._size]
+            if name in self._categories:
+                lookup = self._categories[name] + [None]
+                decoded[name] = [lookup[code] for code in column.tolist()]
+            else:
+                values = column.tolist()
+                for index in np.flatnonzero(self._missing[name][: self._size]):
+                    values[index] = None
+                decoded[name] = values
+        return [
+            {name: values[index] for name, values in decoded.items()}
+            for index in range(self._size)
+        ]
@@ -1,3 +1,5 @@
+from typing import Any, Iterable, Union
+
 from pathlib import Path
 
 import pandas as pd
@@ -57,23 +59,35 @@ class CaseBase:
         single_case = pd.DataFrame(case, index=[0])
         self.cases = self.cases._append(single_case, ignore_index=True)
 
-    def add_list_of_cases(self, cases: list) -> None:
+    def add_list_of_cases(
+        self, cases: Union[Iterable[dict[str, Any]], pd.DataFrame, Any]
+    ) -> None:
         """
         Public function
-        Adds a list of cases to the case base
+        Adds a batch of cases to the case base.
+        The structure of the whole batch is verified at once and the cases are concatenated in a single step.
 
         Parameters:
-        cases: list - the list of cases to be added to the case base
+        cases: list of dicts, iterable of dicts, DataFrame or any table with a to_pandas method (e.g. pyarrow.Table)
+            - the cases to be added to the case base
         """
-        for case in cases:
-            if "utility" not in case or case["utility"] is None:
-                case["utility"] = 0
+        batch = self._cases_to_frame(cases)
+        if len(batch) == 0:
+            return
 
-            if not self._verify_case_structure(case):
-                raise ValueError("Case structure does not match dataframe structure")
+        if "utility" not in batch.columns:
+            batch["utility"] = 0
+        elif batch["utility"].isna().any():
+            batch["utility"] = batch["utility"].fillna(0).infer_objects()
 
-            single_case = pd.DataFrame(case, index=[0])
-            self.cases = self.cases._append(single_case, ignore_index=True)
+        if not self._verify_case_structure(batch):
+            raise ValueError("Case structure does not match dataframe structure")
+
+        batch = batch[list(self.cases.columns)]
+        if len(self.cases) == 0:
+            self.cases = batch.reset_index(drop=True)
+        else:
+            self.cases = pd.concat([self.cases, batch], ignore_index=True)
 
     def update_case(self, case_index: int, updated_case: dict):
         """
@@ -239,13 +253,36 @@ class CaseBase:
             raise ValueError("Utility must be of type int")
         self.cases.iloc[row]["utility"] = utility
 
-    def _verify_case_structure(self, case: dict) -> bool:
+    def _cases_to_frame(self, cases: Any) -> pd.DataFrame:
+        """
+        Private function
+        Converts a batch of cases into a single dataframe
+
+        Parameters:
+        cases: list of dicts, iterable of dicts, DataFrame or table with a to_pandas method
+
+        Raises:
+        ValueError: If the cases of a list don't share the structure of the case base
+        """
+        if isinstance(cases, pd.DataFrame):
+            return cases.copy()
+        if hasattr(cases, "to_pandas"):
+            return cases.to_pandas()
+
+        records = list(cases)
+        columns = set(self.cases.columns)
+        for keys in {tuple(case.keys()) for case in records}:
+            if set(keys) | {"utility"} != columns:
+                raise ValueError("Case structure does not match dataframe structure")
+        return pd.DataFrame.from_records(records)
+
+    def _verify_case_structure(self, case: Union[dict[str, Any], pd.DataFrame]) -> bool:
         """
         Private function
-        Verifies the structure of a case
+        Verifies the structure of a case or of a dataframe of cases
 
         Parameters:
-        case: dict - the case to be verified
+        case: dict or DataFrame - the case(s) to be verified
         """
 
         if set(case.keys()) == set(self.cases.columns):
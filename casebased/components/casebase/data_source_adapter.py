@@ -1,31 +1,44 @@
-from typing import Callable, Optional
+from typing import Any, Callable, Iterator, Optional
 
 import csv
 import os
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
 from casebased.components.casebase.casebase import CaseBase
+from casebased.components.vocabulary import Attribute, ConditionType, Vocabulary
+
+ARROW_EXTENSIONS = (".arrow", ".feather", ".ipc")
+"""
+Extensions of Arrow IPC files. Feather version 2 files are Arrow IPC files.
+"""
 
 
 class DataSourceAdapter:
 
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, vocabulary: Optional[Vocabulary] = None):
         """
         Initialize the DataSourceAdapter with a CaseBase instance
 
         Parameters:
-        path to the file that needs to be read
+        file_path (str): path to the file that needs to be read
+        vocabulary (Optional[Vocabulary]): If given, Parquet and Arrow files and CSV chunks are read
+        with only the vocabulary attributes and the utility column, typed by the vocabulary.
+        Writing Parquet and Arrow files keeps every column of the case base and casts the vocabulary attributes
         """
 
         self.path = file_path
+        self.vocabulary = vocabulary
 
         self.supported_extensions = {
             ".csv": self._read_csv_file,
             ".json": self._read_json_file,
             ".xlsx": self._read_excel_file,
             ".xls": self._read_excel_file,
+            ".parquet": self._read_parquet_file,
+            **{extension: self._read_arrow_file for extension in ARROW_EXTENSIONS},
         }
 
     def read_file(self) -> Optional[pd.DataFrame]:
@@ -60,10 +73,60 @@ class DataSourceAdapter:
             read_function = self.supported_extensions[file_extension]
             return read_function(self.path)
 
+        except ImportError:
+            raise
         except Exception as e:
             print(f"Error reading file: {str(e)}")
             return None
 
+    def read_file_chunks(self, chunksize: int) -> Iterator[pd.DataFrame]:
+        """
+        Public function to stream a CSV file in chunks instead of reading it into memory at once.
+        With a vocabulary only the columns of the vocabulary attributes and the utility are read,
+        string attributes become categoricals and integer attributes are read as Int64.
+        An integer column is narrowed to the smallest width its conditions allow when all values of the chunk fit,
+        otherwise the chunk keeps Int64, since conditions aren't enforced on the data.
+        The chunks can be added to a case base one after another with CaseBase.add_list_of_cases.
+
+        Parameters:
+        chunksize (int): Maximum number of rows per chunk
+
+        Returns:
+        Iterator[pd.DataFrame]: DataFrames with at most chunksize rows each
+
+        Raises:
+        ValueError: If the file isn't a CSV file
+        """
+        _, file_extension = os.path.splitext(self.path.lower())
+        if file_extension != ".csv":
+            raise ValueError(
+                f"Unsupported file format for reading in chunks: {file_extension}. "
+                "Supported formats are: .csv"
+            )
+
+        if self.vocabulary is None:
+            with pd.read_csv(self.path, chunksize=chunksize) as reader:
+                yield from reader
+            return
+
+        names = self.vocabulary.feature_names + self.vocabulary.target_names
+        narrow = {
+            attribute.name: _integer_dtype(attribute)
+            for attribute in self.vocabulary.features + self.vocabulary.targets
+            if attribute.data_type is int and _integer_dtype(attribute) != "Int64"
+        }
+        with pd.read_csv(
+            self.path,
+            chunksize=chunksize,
+            dtype=_pandas_dtypes(self.vocabulary),
+            usecols={*names, "utility"}.__contains__,
+        ) as reader:
+            for chunk in reader:
+                for name, dtype in narrow.items():
+                    if name in chunk and _fits(chunk[name], dtype):
+                        chunk[name] = chunk[name].astype(dtype)
+                yield chunk
+
     # Private Functions
 
     def _read_csv_file(self, file_path: str) -> Optional[pd.DataFrame]:
@@ -132,6 +195,111 @@ class DataSourceAdapter:
             print(f"Error reading Excel file: {str(e)}")
             return None
 
+    def _read_parquet_file(self, file_path: str) -> pd.DataFrame:
+        """
+        Private function to read a Parquet file.
+        With a vocabulary only the columns of the vocabulary attributes are read from the file.
+
+        Parameters:
+        file_path (str): The path to the Parquet file
+
+        Returns:
+        pd.DataFrame: DataFrame with the Parquet data
+
+        Raises:
+        ImportError: If pyarrow isn't installed
+        """
+        _import_pyarrow()
+        import pyarrow.parquet
+
+        with pyarrow.parquet.ParquetFile(file_path, memory_map=True) as file:
+            table = file.read(columns=self.__projection(file.schema_arrow.names))
+        return self.__cast(table).to_pandas()
+
+    def _read_arrow_file(self, file_path: str) -> pd.DataFrame:
+        """
+        Private function to read an Arrow IPC (Feather) file.
+        The file is memory-mapped, so only the columns of the vocabulary attributes are actually read.
+
+        Parameters:
+        file_path (str): The path to the Arrow file
+
+        Returns:
+        pd.DataFrame: DataFrame with the Arrow data
+
+        Raises:
+        ImportError: If pyarrow isn't installed
+        """
+        _import_pyarrow()
+        import pyarrow.ipc
+
+        with pyarrow.memory_map(file_path) as source:
+            table = pyarrow.ipc.open_file(source).read_all()
+            columns = self.__projection(table.column_names)
+            if columns is not None:
+                table = table.select(columns)
+            return self.__cast(table).to_pandas()
+
+    def _write_parquet_file(self, dataframe: pd.DataFrame) -> None:
+        """
+        Private function to write a DataFrame to the Parquet file of the data source.
+
+        Parameters:
+        dataframe (pd.DataFrame): The data to write
+        """
+        _import_pyarrow()
+        import pyarrow.parquet
+
+        pyarrow.parquet.write_table(self.__to_table(dataframe), self.path)
+
+    def _write_arrow_file(self, dataframe: pd.DataFrame) -> None:
+        """
+        Private function to write a DataFrame to the Arrow IPC file of the data source.
+
+        Parameters:
+        dataframe (pd.DataFrame): The data to write
+        """
+        _import_pyarrow()
+        import pyarrow.ipc
+
+        table = self.__to_table(dataframe)
+        with pyarrow.OSFile(self.path, "wb") as sink:
+            with pyarrow.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+    def __projection(self, names: list[str]) -> Optional[list[str]]:
+        """
+        Get the columns to read: the vocabulary attributes and the utility, in file order.
+        Without a vocabulary all columns are read.
+        """
+        if self.vocabulary is None:
+            return None
+        wanted = set(self.vocabulary.feature_names + self.vocabulary.target_names)
+        wanted.add("utility")
+        return [name for name in names if name in wanted]
+
+    def __cast(self, table):
+        """
+        Cast the columns of the vocabulary attributes to the types of the attributes.
+        """
+        if self.vocabulary is None:
+            return table
+        types = _arrow_types(self.vocabulary)
+        for index, name in enumerate(table.column_names):
+            if name in types and table.schema.field(index).type != types[name]:
+                table = table.set_column(
+                    index, name, table.column(index).cast(types[name])
+                )
+        return table
+
+    def __to_table(self, dataframe: pd.DataFrame) -> Any:
+        """
+        Convert a DataFrame into an Arrow table with all of its columns, the vocabulary attributes cast to their types.
+        """
+        pyarrow = _import_pyarrow()
+        table = pyarrow.Table.from_pandas(dataframe, preserve_index=False)
+        return self.__cast(table)
+
     def add_utility_column(self):
         """
         Public function to add a utility column to the datasource itself (e.g. a csv file)
@@ -164,6 +332,7 @@ class DataSourceAdapter:
     def update_data_source(self, case_base: CaseBase) -> None:
         """
         Updates the original data source file with the current state of the case base.
+        All columns of the case base are written, including columns that aren't part of the vocabulary.
 
         Parameters:
         case_base (CaseBase): The case base instance containing the modified data.
@@ -182,8 +351,103 @@ class DataSourceAdapter:
             updated_cases.to_excel(self.path, index=False)
         elif file_extension == ".json":
             updated_cases.to_json(self.path, orient="records", lines=True)
+        elif file_extension == ".parquet":
+            self._write_parquet_file(updated_cases)
+        elif file_extension in ARROW_EXTENSIONS:
+            self._write_arrow_file(updated_cases)
         else:
             raise ValueError(
                 f"Unsupported file format for writing: {file_extension}. "
-                "Supported formats are: .csv, .json, .xlsx, .xls"
+                "Supported formats are: .csv, .json, .xlsx, .xls, .parquet, "
+                + ", ".join(ARROW_EXTENSIONS)
             )
+
+
+def _import_pyarrow():
+    """
+    Import pyarrow, which is only needed for Parquet and Arrow files.
+
+    Raises:
+    ImportError: If pyarrow isn't installed
+    """
+    try:
+        import pyarrow
+    except ImportError as error:
+        raise ImportError(
+            "Reading and writing Parquet and Arrow files requires pyarrow. "
+            "Install it with `pip install pyarrow`."
+        ) from error
+    return pyarrow
+
+
+def _arrow_types(vocabulary: Vocabulary) -> dict[str, Any]:
+    """
+    Derive the Arrow type of every vocabulary attribute from its data type.
+    Attributes of other data types keep the type they have in the file.
+    """
+    pyarrow = _import_pyarrow()
+    types = {
+        bool: pyarrow.bool_(),
+        int: pyarrow.int64(),
+        float: pyarrow.float64(),
+        str: pyarrow.string(),
+    }
+    return {
+        attribute.name: types[attribute.data_type]
+        for attribute in vocabulary.features + vocabulary.targets
+        if attribute.data_type in types
+    }
+
+
+def _pandas_dtypes(vocabulary: Vocabulary) -> dict[str, str]:
+    """
+    Derive the pandas dtype of every vocabulary attribute from its data type.
+    Missing values are kept as NA, so nullable dtypes are used for integers and booleans.
+    """
+    types = {bool: "boolean", int: "Int64", float: "float64", str: "category"}
+    return {
+        attribute.name: types[attribute.data_type]
+        for attribute in vocabulary.features + vocabulary.targets
+        if attribute.data_type in types
+    }
+
+
+def _integer_dtype(attribute: Attribute) -> str:
+    """
+    Get the smallest nullable integer dtype that holds every value the conditions of the attribute allow.
+    Attributes without a lower and an upper bound use Int64.
+    The conditions are only soft-validated, so the values have to be checked with _fits before narrowing.
+    """
+    lower, upper = None, None
+    for condition in attribute.conditions:
+        value = condition.check_val
+        if condition.con_type in (
+            ConditionType.GREATER_THAN,
+            ConditionType.GREATER_THAN_EQUALS,
+            ConditionType.EQUALS,
+        ):
+            lower = value if lower is None else max(lower, value)
+        if condition.con_type in (
+            ConditionType.LOWER_THAN,
+            ConditionType.LOWER_THAN_EQUALS,
+            ConditionType.EQUALS,
+        ):
+            upper = value if upper is None else min(upper, value)
+    if lower is None or upper is None:
+        return "Int64"
+    prefix = "UInt" if lower >= 0 else "Int"
+    for bits in (8, 16, 32):
+        info = np.iinfo(f"{prefix.lower()}{bits}")
+        if info.min <= lower and upper <= info.max:
+            return f"{prefix}{bits}"
+    return "Int64"
+
+
+def _fits(column: pd.Series, dtype: str) -> bool:
+    """
+    Check whether all values of an integer column can be stored in the given nullable integer dtype.
+    """
+    if column.isna().all():
+        return True
+    info = np.iinfo(dtype.lower())
+    return bool(info.min <= column.min() and column.max() <= info.max)
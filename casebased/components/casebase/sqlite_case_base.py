@@ -0,0 +1,342 @@
+from typing import Any, Iterable, Iterator, Optional, Sequence, Union
+
+import sqlite3
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+
+from casebased.components.vocabulary import Attribute, Case, Vocabulary
+
+from .case_store import MISSING_CODE, NUMPY_TYPES
+
+SQLITE_TYPES = {
+    bool: "INTEGER",
+    int: "INTEGER",
+    float: "REAL",
+    str: "TEXT",
+}
+"""
+Column type per attribute data type. Attributes of any other type are stored as TEXT.
+"""
+
+MAX_VARIABLES = 900
+"""
+Maximum number of ids bound to a single query, below SQLite's default limit of 999 variables.
+"""
+
+
+class SQLiteCaseBase:
+    """
+    The SQLite case base is a persistent case base that implements the CaseBaseAdapter protocol on top of the standard library's sqlite3.
+    Every attribute of the vocabulary gets its own typed column and the case id serves as primary key.
+    Cases are ordered by id, and the position of a case in that order is what the retriever knows it by.
+    Ids don't have to be contiguous: every column read also reads the ids, so retrieved positions are mapped
+    back to ids and fetched by primary key. Training reads the attribute columns directly,
+    string attributes are dictionary-encoded on the way.
+
+    The database runs in WAL mode, so other processes can read while cases are added.
+    """
+
+    def __init__(
+        self, path: Union[str, Path], vocabulary: Vocabulary, table: str = "cases"
+    ):
+        """
+        Open or create a case base. An existing table has to contain a column for every vocabulary attribute.
+
+        Args:
+            path: Union[str, Path] :
+                Path of the database file or ":memory:"
+            vocabulary: Vocabulary :
+                Defines the attributes and their data types
+            table: str :
+                Name of the table holding the cases
+        """
+        self.vocabulary = vocabulary
+        self.table = table
+        self._attributes: list[Attribute] = vocabulary.features + vocabulary.targets
+        self._names = [attr.name for attr in self._attributes]
+        self._encoded: dict[str, tuple[npt.NDArray[np.int32], list[Any]]] = {}
+        self._ids: Optional[npt.NDArray[np.int64]] = None
+        self._connection = sqlite3.connect(str(path), check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self.__create_table()
+
+    def __len__(self) -> int:
+        count: int = self._connection.execute(
+            f"SELECT COUNT(*) FROM {_quote(self.table)}"
+        ).fetchone()[0]
+        return count
+
+    def __enter__(self) -> "SQLiteCaseBase":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close the database connection.
+        """
+        self._connection.close()
+
+    def get_all_cases(self) -> list[Case]:
+        """
+        Read all cases ordered by their id.
+
+        Returns:
+            list[Case]
+        """
+        return [self.__to_case(row) for row in self.__select("ORDER BY case_id")]
+
+    def iter_case_batches(self, batch_size: int) -> Iterator[list[Case]]:
+        """
+        Read all cases ordered by their id, batch_size cases per query.
+
+        Args:
+            batch_size: int : Maximum number of cases per batch
+
+        Returns:
+            Iterator of case lists
+        """
+        last = -1
+        while True:
+            rows = self.__select(
+                "WHERE case_id > ? ORDER BY case_id LIMIT ?", (last, batch_size)
+            )
+            if not rows:
+                return
+            last = rows[-1][0]
+            yield [self.__to_case(row) for row in rows]
+
+    def get_cases_by_ids(self, ids: Sequence[int]) -> list[Case]:
+        """
+        Read the cases at the given positions of get_all_cases using the primary key.
+        Positions are mapped to case ids with the ids read together with the columns.
+
+        Args:
+            ids: Sequence[int] : Positions of the cases
+
+        Returns:
+            list[Case] in the order of the positions
+        """
+        case_ids = self._ids if self._ids is not None else self.__read_ids()
+        ids = case_ids[np.asarray(ids, dtype=np.int64)].tolist()
+        cases: dict[int, Case] = {}
+        for start in range(0, len(ids), MAX_VARIABLES):
+            chunk = ids[start : start + MAX_VARIABLES]
+            placeholders = ", ".join("?" * len(chunk))
+            for row in self.__select(f"WHERE case_id IN ({placeholders})", chunk):
+                cases[row[0]] = self.__to_case(row)
+        return [cases[case_id] for case_id in ids]
+
+    def create_case(self, case: Case) -> Optional[bool]:
+        """
+        Insert a case with the next id.
+
+        Args:
+            case: Case : The case to add
+
+        Returns:
+            True
+        """
+        self.add_cases([case])
+        return True
+
+    def add_cases(self, cases: Iterable[Case]) -> None:
+        """
+        Insert several cases with consecutive ids after the highest id in a single transaction.
+
+        Args:
+            cases: Iterable[Case] : The cases to add
+        """
+        cases = list(cases)
+        columns = ", ".join(
+            _quote(name) for name in ["case_id", *self._names, "utility"]
+        )
+        placeholders = ", ".join("?" * (len(self._names) + 2))
+        with self._connection:
+            start = self._connection.execute(
+                f"SELECT COALESCE(MAX(case_id) + 1, 0) FROM {_quote(self.table)}"
+            ).fetchone()[0]
+            self._connection.executemany(
+                f"INSERT INTO {_quote(self.table)} ({columns}) VALUES ({placeholders})",
+                (
+                    (start + offset, *self.__values(case), case.utility)
+                    for offset, case in enumerate(cases)
+                ),
+            )
+        self._encoded.clear()
+        if self._ids is not None:
+            added = np.arange(start, start + len(cases), dtype=np.int64)
+            self._ids = np.concatenate([self._ids, added])
+
+    def change_utility(self, case: Case, utility: int) -> Optional[bool]:
+        """
+        Change the utility of the first stored case with the same attribute values.
+
+        Args:
+            case: Case : The case to update
+            utility: int : New utility value
+
+        Returns:
+            True if the case was found, False otherwise
+        """
+        conditions = " AND ".join(f"{_quote(name)} IS ?" for name in self._names)
+        with self._connection:
+            cursor = self._connection.execute(
+                f"UPDATE {_quote(self.table)} SET utility = ? WHERE case_id = "
+                f"(SELECT case_id FROM {_quote(self.table)} WHERE {conditions} ORDER BY case_id LIMIT 1)",
+                (utility, *self.__values(case)),
+            )
+        return cursor.rowcount > 0
+
+    def column(self, name: str) -> npt.NDArray[Any]:
+        """
+        Read one attribute for all cases, ordered by id.
+        Numerical attributes are returned in their NumPy dtype, or as float64 with NaN if values are missing.
+        String attributes are returned as int32 codes, see categories.
+
+        Args:
+            name: str : Attribute name
+
+        Returns:
+            np.ndarray
+        """
+        attribute = self._attributes[self._names.index(name)]
+        if attribute.data_type not in NUMPY_TYPES:
+            return self.__encode(name)[0]
+        values = self.__read_column(name)
+        if attribute.data_type is float or None in values:
+            return np.array(
+                [np.nan if value is None else value for value in values],
+                dtype=np.float64,
+            )
+        return np.array(values, dtype=NUMPY_TYPES[attribute.data_type])
+
+    def categories(self, name: str) -> Optional[list[Any]]:
+        """
+        Get the distinct values of a string attribute indexed by their code in column.
+
+        Args:
+            name: str : Attribute name
+
+        Returns:
+            list of values or None for numerical attributes
+        """
+        attribute = self._attributes[self._names.index(name)]
+        if attribute.data_type in NUMPY_TYPES:
+            return None
+        return self.__encode(name)[1]
+
+    def __create_table(self) -> None:
+        definitions = ["case_id INTEGER PRIMARY KEY"]
+        for attribute in self._attributes:
+            definitions.append(
+                f"{_quote(attribute.name)} {SQLITE_TYPES.get(attribute.data_type, 'TEXT')}"
+            )
+        definitions.append("utility INTEGER NOT NULL DEFAULT 0")
+        with self._connection:
+            self._connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {_quote(self.table)} ({', '.join(definitions)})"
+            )
+        existing = {
+            row[1]
+            for row in self._connection.execute(
+                f"PRAGMA table_info({_quote(self.table)})"
+            )
+        }
+        missing = [name for name in self._names if name not in existing]
+        if missing:
+            raise ValueError(
+                f"Table {self.table} has no column for the attributes {missing}"
+            )
+
+    def __read_column(self, name: str) -> list[Any]:
+        """
+        Read the values of one attribute ordered by id, updating the ids of all positions in the same pass.
+        """
+        rows = self._connection.execute(
+            f"SELECT case_id, {_quote(name)} FROM {_quote(self.table)} ORDER BY case_id"
+        ).fetchall()
+        self._ids = np.fromiter(
+            (row[0] for row in rows), dtype=np.int64, count=len(rows)
+        )
+        return [row[1] for row in rows]
+
+    def __read_ids(self) -> npt.NDArray[np.int64]:
+        self._ids = np.fromiter(
+            (
+                row[0]
+                for row in self._connection.execute(
+                    f"SELECT case_id FROM {_quote(self.table)} ORDER BY case_id"
+                )
+            ),
+            dtype=np.int64,
+        )
+        return self._ids
+
+    def __select(
+        self, clause: str, parameters: Sequence[Any] = ()
+    ) -> list[tuple[Any, ...]]:
+        columns = ", ".join(
+            _quote(name) for name in ["case_id", *self._names, "utility"]
+        )
+        return self._connection.execute(
+            f"SELECT {columns} FROM {_quote(self.table)} {clause}", parameters
+        ).fetchall()
+
+    def __values(self, case: Case) -> list[Any]:
+        return [
+            (
+                case.target_attributes.get(attribute.name)
+                if attribute.is_target
+                else case.feature_attributes.get(attribute.name)
+            )
+            for attribute in self._attributes
+        ]
+
+    def __to_case(self, row: tuple[Any, ...]) -> Case:
+        features = {}
+        targets = {}
+        for attribute, value in zip(self._attributes, row[1:-1]):
+            if attribute.data_type is bool and value is not None:
+                value = bool(value)
+            if attribute.is_target:
+                targets[attribute.name] = value
+            else:
+                features[attribute.name] = value
+        return Case(
+            feature_attributes=features, target_attributes=targets, utility=row[-1]
+        )
+
+    def __encode(self, name: str) -> tuple[npt.NDArray[np.int32], list[Any]]:
+        """
+        Dictionary-encode a string attribute, assigning codes in order of first appearance.
+        The result is cached until cases are added.
+        """
+        encoded = self._encoded.get(name)
+        if encoded is None:
+            codes: dict[Any, int] = {}
+            categories: list[Any] = []
+            column = []
+            for value in self.__read_column(name):
+                if value is None:
+                    column.append(MISSING_CODE)
+                    continue
+                code = codes.get(value)
+                if code is None:
+                    code = codes[value] = len(categories)
+                    categories.append(value)
+                column.append(code)
+            encoded = (np.array(column, dtype=np.int32), categories)
+            self._encoded[name] = encoded
+        return encoded
+
+
+def _quote(identifier: str) -> str:
+    """
+    Quote a table or column name for use in SQL.
+    """
+    return '"' + identifier.replace('"', '""') + '"'
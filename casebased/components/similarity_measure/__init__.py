@@ -1,5 +1,5 @@
-from .schema import SimilaritySchema
+from .schema import CompiledSchema, SimilaritySchema
 from .types import SimilarityFunction
 from .weight import WeightProvider
 
-__all__ = ["SimilaritySchema", "SimilarityFunction", "WeightProvider"]
+__all__ = ["SimilaritySchema", "CompiledSchema", "SimilarityFunction", "WeightProvider"]
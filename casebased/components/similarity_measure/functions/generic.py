@@ -1,4 +1,7 @@
-from typing import TypeVar
+from typing import Any, TypeVar
+
+import numpy as np
+import numpy.typing as npt
 
 from ..types import SimilarityFunction
 
@@ -10,6 +13,9 @@ class Equality(SimilarityFunction):
     def calculate(self, x: T, y: T) -> float:
         return 1.0 if x == y else 0.0
 
+    def calculate_batch(self, x: T, ys: npt.NDArray[Any]) -> npt.NDArray[np.float64]:
+        return np.asarray(np.asarray(ys) == x, dtype=np.float64)
+
 
 class Static(SimilarityFunction):
     def __init__(self, value: float) -> None:
@@ -18,6 +24,9 @@ class Static(SimilarityFunction):
     def calculate(self, x: T, y: T) -> float:
         return self.__value
 
+    def calculate_batch(self, x: Any, ys: npt.NDArray[Any]) -> npt.NDArray[np.float64]:
+        return np.full(np.broadcast(x, ys).shape, self.__value, dtype=np.float64)
+
 
 class VectorDifference(SimilarityFunction):
     def calculate(self, x: list[V], y: list[V]) -> float:
@@ -30,3 +39,10 @@ class VectorDifference(SimilarityFunction):
         for i, item in enumerate(x):
             result += abs(item - (y[i] if len(y) >= i + 1 else 0))
         return result
+
+    def calculate_batch(
+        self, x: list[V], ys: npt.NDArray[Any]
+    ) -> npt.NDArray[np.float64]:
+        return np.fromiter(
+            (self.calculate(x, y) for y in ys), dtype=np.float64, count=len(ys)
+        )
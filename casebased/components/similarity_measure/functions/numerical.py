@@ -1,30 +1,53 @@
-from typing import Optional, TypeVar
+from typing import Any, Optional, TypeVar
 
 from math import exp
 
+import numpy as np
+import numpy.typing as npt
+
 from ..types import SimilarityFunction
 
 N = TypeVar("N", float, int)
 
 
+def _distance(x: N, ys: npt.NDArray[Any]) -> npt.NDArray[np.float64]:
+    """
+    Absolute difference between the query value and every value as float64 array.
+    """
+    return np.abs(np.asarray(x, dtype=np.float64) - np.asarray(ys, dtype=np.float64))
+
+
 class SquaredDistance(SimilarityFunction):
     def calculate(self, x: N, y: N) -> float:
         return (x - y) ** 2
 
+    def calculate_batch(self, x: N, ys: npt.NDArray[Any]) -> npt.NDArray[np.float64]:
+        return np.square(
+            np.asarray(x, dtype=np.float64) - np.asarray(ys, dtype=np.float64)
+        )
+
 
 class AbsoluteDistance(SimilarityFunction):
     def calculate(self, x: N, y: N) -> float:
         return abs(x - y)
 
+    def calculate_batch(self, x: N, ys: npt.NDArray[Any]) -> npt.NDArray[np.float64]:
+        return _distance(x, ys)
+
 
 class LinearInterval(SimilarityFunction):
+    monotone = True
+    """
+    The similarity never increases while the distance between both values grows, see Retriever.sorted_index.
+    """
+
     def __init__(self, lower_bound: N, upper_bound: N) -> None:
         if lower_bound >= upper_bound:
             raise Exception(
                 "Lower bound cannot be higher or equal to the upper bound in the linear interval similarity measure"
             )
-        self.__lower_bound = lower_bound
-        self.__upper_bound = upper_bound
+        self.__lower_bound: float = lower_bound
+        self.__upper_bound: float = upper_bound
 
     def calculate(self, x: N, y: N) -> float:
         if (
@@ -36,15 +59,34 @@ class LinearInterval(SimilarityFunction):
             return 0.0
         return 1.0 - abs(x - y) / (self.__upper_bound - self.__lower_bound)
 
+    def calculate_batch(self, x: N, ys: npt.NDArray[Any]) -> npt.NDArray[np.float64]:
+        query = np.asarray(x, dtype=np.float64)
+        values = np.asarray(ys, dtype=np.float64)
+        inside = (
+            (query >= self.__lower_bound)
+            & (query <= self.__upper_bound)
+            & (values >= self.__lower_bound)
+            & (values <= self.__upper_bound)
+        )
+        similarity = 1.0 - np.abs(query - values) / (
+            self.__upper_bound - self.__lower_bound
+        )
+        return np.where(inside, similarity, 0.0)
+
 
 class Linear(SimilarityFunction):
+    monotone = True
+    """
+    The similarity never increases while the distance between both values grows, see Retriever.sorted_index.
+    """
+
     def __init__(self, lower_bound: Optional[N], upper_bound: N) -> None:
         if (lower_bound or 0.0) >= upper_bound:
             raise Exception(
                 "Lower bound cannot be higher or equal to the upper bound in the linear similarity measure"
             )
-        self.__lower_bound = lower_bound or 0.0
-        self.__upper_bound = upper_bound
+        self.__lower_bound: float = lower_bound or 0.0
+        self.__upper_bound: float = upper_bound
 
     def calculate(self, x: N, y: N) -> float:
         distance = abs(x - y)
@@ -56,27 +98,69 @@ class Linear(SimilarityFunction):
             self.__upper_bound - self.__lower_bound
         )
 
+    def calculate_batch(self, x: N, ys: npt.NDArray[Any]) -> npt.NDArray[np.float64]:
+        distance = _distance(x, ys)
+        similarity = (self.__upper_bound - distance) / (
+            self.__upper_bound - self.__lower_bound
+        )
+        return np.where(
+            distance < self.__lower_bound,
+            1.0,
+            np.where(distance > self.__upper_bound, 0.0, similarity),
+        )
+
 
 class Threshold(SimilarityFunction):
+    monotone = True
+    """
+    The similarity never increases while the distance between both values grows, see Retriever.sorted_index.
+    """
+
     def __init__(self, threshold: N) -> None:
-        self.__threshold = threshold
+        self.__threshold: float = threshold
 
     def calculate(self, x: N, y: N) -> float:
         return 1.0 if abs(x - y) <= self.__threshold else 0.0
 
+    def calculate_batch(self, x: N, ys: npt.NDArray[Any]) -> npt.NDArray[np.float64]:
+        return np.asarray(_distance(x, ys) <= self.__threshold, dtype=np.float64)
+
 
 class Exponential(SimilarityFunction):
     def __init__(self, growth_value: N) -> None:
-        self.__growth = growth_value
+        self.__growth: float = growth_value
+
+    @property
+    def monotone(self) -> bool:
+        """
+        The similarity never increases with the distance unless the growth value is negative.
+        """
+        return self.__growth >= 0
 
     def calculate(self, x: N, y: N) -> float:
         return exp(-self.__growth * abs(x - y))
 
+    def calculate_batch(self, x: N, ys: npt.NDArray[Any]) -> npt.NDArray[np.float64]:
+        return np.exp(-self.__growth * _distance(x, ys))
+
 
 class Sigmoid(SimilarityFunction):
     def __init__(self, growth_value: N, middle_value: N) -> None:
-        self.__growth = growth_value
-        self.__middle = middle_value
+        self.__growth: float = growth_value
+        self.__middle: float = middle_value
+
+    @property
+    def monotone(self) -> bool:
+        """
+        The similarity never increases with the distance as long as the growth value is positive.
+        """
+        return self.__growth > 0
 
     def calculate(self, x: N, y: N) -> float:
         return 1.0 / (1.0 + exp((abs(x - y) - self.__middle) / self.__growth))
+
+    def calculate_batch(self, x: N, ys: npt.NDArray[Any]) -> npt.NDArray[np.float64]:
+        with np.errstate(over="ignore"):
+            return 1.0 / (
+                1.0 + np.exp((_distance(x, ys) - self.__middle) / self.__growth)
+            )
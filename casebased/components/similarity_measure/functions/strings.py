@@ -1,7 +1,133 @@
+from typing import Any, Callable, Optional
+
+from functools import lru_cache
+
+import numpy as np
+import numpy.typing as npt
+
 from ..types import SimilarityFunction
 
+MAX_BIT_PARALLEL_LENGTH = 64
+"""
+Longest pattern handled by the bit-parallel edit distance, longer strings use the banded dynamic program.
+"""
+
+
+def _pattern_masks(pattern: str) -> dict[str, int]:
+    """
+    Bit mask of the positions of every character in the pattern.
+    """
+    masks: dict[str, int] = {}
+    for position, char in enumerate(pattern):
+        masks[char] = masks.get(char, 0) | (1 << position)
+    return masks
+
+
+def _bit_parallel_distance(
+    pattern: str, masks: dict[str, int], text: str, max_distance: Optional[int]
+) -> int:
+    """
+    Edit distance using Myers' bit-vector algorithm in Hyyrö's formulation.
+    Stops as soon as the distance can't get below max_distance + 1 anymore.
+    """
+    length = len(pattern)
+    if length == 0 or len(text) == 0:
+        distance = max(length, len(text))
+        if max_distance is not None and distance > max_distance:
+            return max_distance + 1
+        return distance
+    full = (1 << length) - 1
+    last = 1 << (length - 1)
+    positive, negative, distance = full, 0, length
+    remaining = len(text)
+    for char in text:
+        equal = masks.get(char, 0)
+        vertical = equal | negative
+        horizontal = (((equal & positive) + positive) ^ positive) | equal
+        horizontal_positive = negative | (~(horizontal | positive) & full)
+        horizontal_negative = positive & horizontal
+        if horizontal_positive & last:
+            distance += 1
+        elif horizontal_negative & last:
+            distance -= 1
+        remaining -= 1
+        if max_distance is not None and distance - remaining > max_distance:
+            return max_distance + 1
+        horizontal_positive = ((horizontal_positive << 1) | 1) & full
+        horizontal_negative = (horizontal_negative << 1) & full
+        positive = horizontal_negative | (~(vertical | horizontal_positive) & full)
+        negative = horizontal_positive & vertical
+    return distance
+
+
+def _banded_distance(x: str, y: str, max_distance: Optional[int]) -> int:
+    """
+    Edit distance using a dynamic program restricted to a diagonal band of width max_distance.
+    Stops as soon as every cell of a row exceeds max_distance.
+    """
+    if len(x) < len(y):
+        x, y = y, x
+    if max_distance is None:
+        band = len(x)
+    elif len(x) - len(y) > max_distance:
+        return max_distance + 1
+    else:
+        band = max_distance
+    limit = len(x) + 1
+    previous_row = list(range(len(y) + 1))
+    for i, c1 in enumerate(x, start=1):
+        start = max(1, i - band)
+        end = min(len(y), i + band)
+        current_row = [limit] * (len(y) + 1)
+        current_row[0] = i if i <= band else limit
+        for j in range(start, end + 1):
+            current_row[j] = min(
+                previous_row[j] + 1,
+                current_row[j - 1] + 1,
+                previous_row[j - 1] + (c1 != y[j - 1]),
+            )
+        if (
+            max_distance is not None
+            and min(current_row[start - 1 : end + 1]) > max_distance
+        ):
+            return max_distance + 1
+        previous_row = current_row
+    distance = previous_row[-1]
+    if max_distance is not None and distance > max_distance:
+        return max_distance + 1
+    return distance
+
 
 class Levenshtein(SimilarityFunction):
+    qgram_size = 2
+    """
+    Length of the q-grams used to bound the normalized similarity, see qgram_upper_bound.
+    """
+
+    def __init__(
+        self, max_distance: Optional[int] = None, normalized: bool = False
+    ) -> None:
+        """
+        Edit distance between two strings.
+        Strings up to MAX_BIT_PARALLEL_LENGTH characters are compared with a bit-parallel algorithm,
+        longer strings with a banded dynamic program.
+
+        Args:
+            max_distance: Optional[int] :
+                Stop early once the distance exceeds this value and use max_distance + 1 instead
+            normalized: bool :
+                Return the similarity 1 - distance / length of the longer string instead of the distance
+        """
+        self.__max_distance = max_distance
+        self.__normalized = normalized
+
+    @property
+    def qgram_bounded(self) -> bool:
+        """
+        Only the normalized similarity has a q-gram upper bound, see qgram_upper_bound.
+        """
+        return self.__normalized
+
     def calculate(self, x: str, y: str) -> float:
         if len(x) < len(y):
             temp = x
@@ -9,70 +135,206 @@ class Levenshtein(SimilarityFunction):
             y = temp
 
         if len(y) == 0:
-            return len(x)
+            return self.__result(self.__cut_off(len(x)), len(x))
 
-        previous_row = range(len(y) + 1)
-        for i, c1 in enumerate(x):
-            current_row = [i + 1]
-            for j, c2 in enumerate(y):
-                insertions = previous_row[j + 1] + 1
-                deletions = current_row[j] + 1
-                substitutions = previous_row[j] + (c1 != c2)
-                current_row.append(min(insertions, deletions, substitutions))
-            previous_row = current_row
+        if len(y) <= MAX_BIT_PARALLEL_LENGTH:
+            distance = _bit_parallel_distance(
+                y, _pattern_masks(y), x, self.__max_distance
+            )
+        else:
+            distance = _banded_distance(x, y, self.__max_distance)
+        return self.__result(distance, len(x))
 
-        return previous_row[-1]
+    def calculate_batch(self, x: str, ys: npt.NDArray[Any]) -> npt.NDArray[np.float64]:
+        if np.ndim(x) > 0 or len(x) > MAX_BIT_PARALLEL_LENGTH:
+            return super().calculate_batch(x, ys)
+        masks = _pattern_masks(x)
+        return np.fromiter(
+            (
+                self.__result(
+                    _bit_parallel_distance(x, masks, y, self.__max_distance),
+                    max(len(x), len(y)),
+                )
+                for y in np.ravel(ys)
+            ),
+            dtype=np.float64,
+            count=np.size(ys),
+        ).reshape(np.shape(ys))
 
+    def qgram_upper_bound(
+        self, x: str, lengths: npt.NDArray[np.int64], common: npt.NDArray[np.int64]
+    ) -> Optional[npt.NDArray[np.float64]]:
+        """
+        Upper bound of the normalized similarity between x and strings of the given lengths
+        that share the given number of q-grams with x (q-gram count filter).
+        Raw distances grow with dissimilarity and can't be bounded this way, so None is returned for them.
 
-class JaroDistance(SimilarityFunction):
-    def calculate(self, x: str, y: str) -> float:
-        if x == y:
-            return 1.0
+        Args:
+            x: str : Query string
+            lengths: np.ndarray : Length of every candidate string
+            common: np.ndarray : Number of q-grams every candidate shares with x
+
+        Returns:
+            np.ndarray of float64 or None
+        """
+        if not self.__normalized:
+            return None
+        longest = np.maximum(lengths, len(x))
+        lower = np.maximum(
+            np.abs(lengths - len(x)),
+            np.ceil((longest - self.qgram_size + 1 - common) / self.qgram_size),
+        )
+        lower = np.maximum(lower, 0)
+        if self.__max_distance is not None:
+            lower = np.minimum(lower, self.__max_distance + 1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(longest == 0, 1.0, 1.0 - lower / longest)
+
+    def __cut_off(self, distance: int) -> int:
+        if self.__max_distance is not None and distance > self.__max_distance:
+            return self.__max_distance + 1
+        return distance
+
+    def __result(self, distance: int, longest: int) -> float:
+        if not self.__normalized:
+            return distance
+        return 1.0 if longest == 0 else 1.0 - distance / longest
 
-        len_x = len(x)
-        len_y = len(y)
 
-        match_distance = (max(len_x, len_y) // 2) - 1
+JARO_CACHE_SIZE = 1 << 16
+"""
+Number of string pairs whose Jaro similarity is memoized.
+"""
 
-        matches, transpositions = 0
 
-        x_matches = [False] * len_x
-        y_matches = [False] * len_y
+@lru_cache(maxsize=JARO_CACHE_SIZE)
+def _jaro(x: str, y: str) -> float:
+    """
+    Jaro similarity of two strings, memoized for repeated pairs.
+    Matches are tracked in two preallocated flag buffers and searched with str.find inside the match window.
+    """
+    if x == y:
+        return 1.0
 
-        for i in range(len_x):
-            start = max(0, i - match_distance)
-            end = min(i + match_distance + 1, len_y)
+    len_x = len(x)
+    len_y = len(y)
+    if len_x == 0 or len_y == 0:
+        return 0.0
 
-            for j in range(start, end):
-                if not y_matches[j] or x[i] == y[j]:
-                    x_matches[i] = y_matches[j] = True
-                    matches += 1
-                    break
+    match_distance = max(max(len_x, len_y) // 2 - 1, 0)
+    x_matches = bytearray(len_x)
+    y_matches = bytearray(len_y)
 
-            k = 0
-            for i in range(len_x):
-                if x_matches[i]:
-                    while not y_matches[k]:
-                        k += 1
-                    if x[i] != y[k]:
-                        transpositions += 1
-                    k += 1
+    matches = 0
+    for i, char in enumerate(x):
+        end = min(i + match_distance + 1, len_y)
+        j = y.find(char, max(0, i - match_distance), end)
+        while j != -1 and y_matches[j]:
+            j = y.find(char, j + 1, end)
+        if j != -1:
+            x_matches[i] = y_matches[j] = 1
+            matches += 1
 
-            if matches == 0:
-                return 0.0
+    if matches == 0:
+        return 0.0
 
-            transpositions = transpositions // 2
-            return (
-                matches / len_x + matches / len_y + (matches - transpositions) / matches
-            ) / 3.0
+    transpositions = 0
+    k = 0
+    for i in range(len_x):
+        if x_matches[i]:
+            while not y_matches[k]:
+                k += 1
+            if x[i] != y[k]:
+                transpositions += 1
+            k += 1
+
+    transpositions = transpositions // 2
+    return (
+        matches / len_x + matches / len_y + (matches - transpositions) / matches
+    ) / 3.0
+
+
+def _unique_batch(
+    function: Callable[[str], float], ys: npt.NDArray[Any]
+) -> npt.NDArray[np.float64]:
+    """
+    Evaluate a function once per distinct value of ys and spread the results to all positions.
+    """
+    values = np.ravel(ys)
+    if len(values) == 0:
+        return np.zeros(np.shape(ys), dtype=np.float64)
+    unique, inverse = np.unique(values, return_inverse=True)
+    results = np.fromiter(
+        (function(value) for value in unique), dtype=np.float64, count=len(unique)
+    )
+    return results[inverse].reshape(np.shape(ys))
+
+
+def _jaro_upper_bound(
+    x: str, lengths: npt.NDArray[np.int64], common: npt.NDArray[np.int64]
+) -> npt.NDArray[np.float64]:
+    """
+    Upper bound of the Jaro similarity given the number of characters every candidate shares with x.
+    Shared characters limit the number of matches, transpositions are assumed to be zero.
+    """
+    matches = np.minimum(common, np.minimum(lengths, len(x))).astype(np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bound = (matches / max(len(x), 1) + matches / lengths + 1.0) / 3.0
+    bound = np.where(matches == 0, 0.0, bound)
+    return np.where((lengths == 0) & (len(x) == 0), 1.0, bound)
+
+
+class JaroDistance(SimilarityFunction):
+    qgram_size = 1
+    """
+    Jaro similarity is bounded using shared characters, i.e. q-grams of length 1.
+    """
+    qgram_bounded = True
+    """
+    The similarity always has a q-gram upper bound, see qgram_upper_bound.
+    """
+
+    def calculate(self, x: str, y: str) -> float:
+        return _jaro(x, y)
+
+    def qgram_upper_bound(
+        self, x: str, lengths: npt.NDArray[np.int64], common: npt.NDArray[np.int64]
+    ) -> npt.NDArray[np.float64]:
+        """
+        Upper bound of the similarity between x and strings of the given lengths
+        that share the given number of characters with x.
+
+        Args:
+            x: str : Query string
+            lengths: np.ndarray : Length of every candidate string
+            common: np.ndarray : Number of characters every candidate shares with x
+
+        Returns:
+            np.ndarray of float64
+        """
+        return _jaro_upper_bound(x, lengths, common)
+
+    def calculate_batch(self, x: str, ys: npt.NDArray[Any]) -> npt.NDArray[np.float64]:
+        if np.ndim(x) > 0:
+            return super().calculate_batch(x, ys)
+        return _unique_batch(lambda y: _jaro(x, y), ys)
 
 
 class JaroWinkler(SimilarityFunction):
+    qgram_size = 1
+    """
+    Jaro-Winkler similarity is bounded using shared characters, i.e. q-grams of length 1.
+    """
+    qgram_bounded = True
+    """
+    The similarity always has a q-gram upper bound, see qgram_upper_bound.
+    """
+
     def __init__(self, prefix_weight: float) -> None:
         self.__prefix_weight = prefix_weight
 
     def calculate(self, x: str, y: str) -> float:
-        jaro_dist = JaroDistance().calculate(x, y)
+        jaro_dist = _jaro(x, y)
 
         prefix = 0
         for i in range(min(len(x), len(y), 4)):
@@ -85,3 +347,28 @@ class JaroWinkler(SimilarityFunction):
         )
 
         return min(jaro_winkler_dist, 1.0)
+
+    def calculate_batch(self, x: str, ys: npt.NDArray[Any]) -> npt.NDArray[np.float64]:
+        if np.ndim(x) > 0:
+            return super().calculate_batch(x, ys)
+        return _unique_batch(lambda y: self.calculate(x, y), ys)
+
+    def qgram_upper_bound(
+        self, x: str, lengths: npt.NDArray[np.int64], common: npt.NDArray[np.int64]
+    ) -> npt.NDArray[np.float64]:
+        """
+        Upper bound of the similarity between x and strings of the given lengths
+        that share the given number of characters with x, assuming the longest possible common prefix.
+
+        Args:
+            x: str : Query string
+            lengths: np.ndarray : Length of every candidate string
+            common: np.ndarray : Number of characters every candidate shares with x
+
+        Returns:
+            np.ndarray of float64
+        """
+        jaro_bound = _jaro_upper_bound(x, lengths, common)
+        boost = np.minimum(np.minimum(lengths, len(x)), 4) * self.__prefix_weight
+        bound = np.maximum(jaro_bound + boost * (1.0 - jaro_bound), boost)
+        return np.where(jaro_bound == 0, 0.0, np.minimum(bound, 1.0))
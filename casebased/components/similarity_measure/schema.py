@@ -1,6 +1,9 @@
-from typing import Mapping
+from typing import Mapping, Optional, Sequence
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+import numpy as np
+import numpy.typing as npt
 
 from casebased.components.vocabulary import Case, Vocabulary
 
@@ -8,26 +11,66 @@ from .types import SimilarityFunction
 from .weight import WeightProvider
 
 
+@dataclass(frozen=True)
+class CompiledSchema:
+    """
+    Flat form of a similarity schema for a fixed attribute order.
+    Weights and similarity functions are resolved once, so scoring doesn't need any vocabulary lookups.
+    """
+
+    keys: tuple[str, ...]
+    functions: tuple[SimilarityFunction, ...]
+    weights: npt.NDArray[np.float64]
+    vocabulary_version: int
+    positions: Mapping[str, int]
+
+
 @dataclass(frozen=True)
 class SimilaritySchema:
     attributes: Mapping[str, SimilarityFunction]
     vocabulary: Vocabulary
+    _compiled: dict[tuple[str, ...], CompiledSchema] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+
+    def compile(self, keys: Optional[Sequence[str]] = None) -> CompiledSchema:
+        """
+        Resolve attribute order, weights and similarity functions into a compiled schema.
+        The result is cached and compiled again automatically once the vocabulary changes.
+
+        Args:
+            keys: Optional[Sequence[str]] : Attribute order, by default all attributes of the schema
+
+        Returns:
+            CompiledSchema
+        """
+        keys = tuple(self.attributes.keys() if keys is None else keys)
+        compiled = self._compiled.get(keys)
+        if compiled is None or compiled.vocabulary_version != self.vocabulary.version:
+            compiled = CompiledSchema(
+                keys=keys,
+                functions=tuple(self.attributes[key] for key in keys),
+                weights=np.array(
+                    [WeightProvider.get_weight(self.vocabulary, key) for key in keys],
+                    dtype=np.float64,
+                ),
+                vocabulary_version=self.vocabulary.version,
+                positions={key: position for position, key in enumerate(keys)},
+            )
+            self._compiled[keys] = compiled
+        return compiled
 
     def calculate(self, x: Case, y: Case) -> float:
+        compiled = self.compile()
         result = 0.0
-        similarities = {}
 
         for feature_key in x.get_feature_keys():
             y_feature = y.get_feature_value_by_key(feature_key)
             x_feature = x.get_feature_value_by_key(feature_key)
 
-            similarity = self.attributes[feature_key].calculate(x_feature, y_feature)
-
-            similarities[feature_key] = (
-                WeightProvider.get_weight(self.vocabulary, feature_key) * similarity
-            )
+            position = compiled.positions[feature_key]
+            similarity = compiled.functions[position].calculate(x_feature, y_feature)
 
-        for val in similarities.values():
-            result += val
+            result += compiled.weights[position] * similarity
 
-        return result
+        return float(result)
@@ -1,7 +1,54 @@
-from typing import Protocol, TypeVar
+from typing import Any, Protocol, TypeVar
+
+import numpy as np
+import numpy.typing as npt
 
 T = TypeVar("T")
 
 
 class SimilarityFunction(Protocol):
     def calculate(self, x: T, y: T) -> float: ...
+
+    def calculate_batch(self, x: Any, ys: npt.NDArray[Any]) -> npt.NDArray[np.float64]:
+        """
+        Calculate the similarity between one value and an array of values.
+        The query value can also be an array that broadcasts against ys, e.g. a column of query values
+        to get a similarity matrix of shape (queries, values).
+
+        Built-in functions implement this with NumPy ufuncs. Custom functions inherit this fallback,
+        which calls calculate for every pair of values.
+
+        Args:
+            x: Any : Query value or array of query values
+            ys: np.ndarray : Values to compare the query value with
+
+        Returns:
+            np.ndarray of float64
+        """
+        similarities: npt.NDArray[np.float64] = np.vectorize(
+            self.calculate, otypes=[np.float64]
+        )(x, ys)
+        return similarities
+
+
+def calculate_batch(
+    function: Any, x: Any, ys: npt.NDArray[Any]
+) -> npt.NDArray[np.float64]:
+    """
+    Calculate the similarity between one value and an array of values with any similarity function.
+    Functions that don't inherit from SimilarityFunction and therefore lack calculate_batch
+    are evaluated pair by pair.
+
+    Args:
+        function: SimilarityFunction : Similarity function to use
+        x: Any : Query value or array of query values
+        ys: np.ndarray : Values to compare the query value with
+
+    Returns:
+        np.ndarray of float64
+    """
+    batch_function = getattr(function, "calculate_batch", None)
+    if batch_function is None:
+        return SimilarityFunction.calculate_batch(function, x, ys)
+    similarities: npt.NDArray[np.float64] = batch_function(x, ys)
+    return similarities
@@ -26,6 +26,8 @@ class Vocabulary:
         """
         self.__features = features
         self.__targets = targets
+        self.__version = 0
+        self.__reindex()
 
     def add_attribute(self, attr: Union[FeatureAttribute, TargetAttribute]):
         """
@@ -35,7 +37,7 @@ class Vocabulary:
             attr: FeatureAttribute or TargetAttribute :
                 Attribute to add to the vocabulary
         """
-        if self.find_attribute(key=attr.name) is None:
+        if self.find_attribute(key=attr.name) is not None:
             raise AttributeAlreadyExists(
                 f"Attribute with name {attr.name} already exists in vocabulary"
             )
@@ -44,6 +46,8 @@ class Vocabulary:
             if isinstance(attr, FeatureAttribute)
             else self.__targets.append(attr)
         )
+        self.__version += 1
+        self.__reindex()
 
     def remove_attribute(self, key: str):
         """
@@ -61,6 +65,17 @@ class Vocabulary:
             self.__features = [item for item in self.__features if item.name != key]
         else:
             self.__targets = [item for item in self.__targets if item.name != key]
+        self.__version += 1
+        self.__reindex()
+
+    def __reindex(self):
+        """
+        Rebuild the name index and the cached attribute names after the attribute lists changed.
+        Targets take precedence over features with the same name.
+        """
+        self.__index = {attr.name: attr for attr in self.__features + self.__targets}
+        self.__feature_names = tuple(attr.name for attr in self.__features)
+        self.__target_names = tuple(attr.name for attr in self.__targets)
 
     def to_dict(self):
         """
@@ -74,7 +89,7 @@ class Vocabulary:
     def find_attribute(self, key: str):
         """
         Find an attribute using the attribute's unique key/name.
-        This function will search in the target and feature attribute list.
+        This function will search in the target and feature attributes using a name index.
         If the function couldn't find an attribute, it returns None.
 
         Args:
@@ -83,10 +98,7 @@ class Vocabulary:
         Returns:
             FeatureAttribute or TargetAttribute or None
         """
-        for attr in self.__targets + self.__features:
-            if attr.name == key:
-                return attr
-        return None
+        return self.__index.get(key)
 
     def validate_case(self, case: Case) -> bool:
         """
@@ -117,11 +129,11 @@ class Vocabulary:
         Returns:
             bool
         """
-        for feature in self.__features:
-            if feature.name not in case.feature_attributes.keys():
+        for name in self.__feature_names:
+            if name not in case.feature_attributes:
                 return False
-        for target in self.__targets:
-            if target.name not in case.target_attributes.keys():
+        for name in self.__target_names:
+            if name not in case.target_attributes:
                 return False
         return True
 
@@ -172,3 +184,34 @@ class Vocabulary:
             list of TargetAttributes
         """
         return self.__targets
+
+    @property
+    def feature_names(self):
+        """
+        Get the names of all feature attributes in definition order.
+
+        Returns:
+            tuple of str
+        """
+        return self.__feature_names
+
+    @property
+    def target_names(self):
+        """
+        Get the names of all target attributes in definition order.
+
+        Returns:
+            tuple of str
+        """
+        return self.__target_names
+
+    @property
+    def version(self):
+        """
+        Get the version of the vocabulary, which is increased whenever an attribute is added or removed.
+        Components that derive data from the vocabulary use it to detect when they have to refresh.
+
+        Returns:
+            int
+        """
+        return self.__version
@@ -2,9 +2,11 @@ from typing import Mapping, Optional, Union
 
 from dataclasses import dataclass
 
-from casebased import CaseBaseAdapter
 from casebased.actors.adapter import Adapter
+from casebased.actors.cache import RetrievalCache
+from casebased.actors.progress import ProgressListener
 from casebased.actors.retriever import Retriever
+from casebased.case_base_adapter import CaseBaseAdapter
 from casebased.components.similarity_measure import SimilaritySchema
 from casebased.components.vocabulary import Case, Vocabulary
 
@@ -30,7 +32,8 @@ class CaseBasedSystem:
     """
     threshold: Optional[float]
     """
-    Using the threshold you can define your quality standard. If the similarity is above this theshold the case is cut out because it's not similar enough.
+    Using the threshold you can define your quality standard. Cases with a similarity below this threshold are cut out because they're not similar enough,
+    so retrieval returns at most k cases. Set it to None to always retrieve the k most similar cases.
     """
     adapter: Adapter
     """
@@ -40,17 +43,42 @@ class CaseBasedSystem:
     """
     Define how many cases you want to retrieve. For now this is only a static variable you can define.
     """
+    listener: Optional[ProgressListener] = None
+    """
+    Optionally receives progress events while training and retrieving, e.g. a MetricsListener.
+    """
+    cache: Optional[RetrievalCache] = None
+    """
+    Optionally caches the results of repeated queries. Reusing cases, changing utilities and training invalidate it.
+    """
     # case_base_maintainer: Optional[CaseBaseMaintainer] = None
 
-    def train(self, jobs: Optional[int] = None):
-        feature_attribute_keys = [feature.name for feature in self.vocabulary.features]
+    def train(
+        self, jobs: Optional[int] = None, processes: Optional[int] = None
+    ) -> None:
+        """
+        Train the retriever on the current case base.
+
+        Args:
+            jobs: Optional[int] : Number of threads scoring the case base, -1 uses all cores
+            processes: Optional[int] : Score the case base in this many worker processes, see Retriever.processes
+        """
+        feature_attribute_keys = list(self.vocabulary.feature_names)
+        if hasattr(self, "_retriever"):
+            self._retriever.close()
 
-        self._retriever = Retriever(
-            similarity_schema=self.similarity_schema, case_base=self.case_base, k=self.k
+        self._retriever: Retriever = Retriever(
+            similarity_schema=self.similarity_schema,
+            case_base=self.case_base,
+            k=self.k,
+            threshold=self.threshold,
+            listener=self.listener,
+            processes=processes,
+            cache=self.cache,
         )
         self._retriever.train(feature_attribute_keys=feature_attribute_keys, jobs=jobs)
 
-    def retrieve(self, case: Case):
+    def retrieve(self, case: Case) -> list[tuple[Case, float]]:
         """
         Using the retriever function you can retrieve the k most similar cases to the given case.
         """
@@ -59,6 +87,17 @@ class CaseBasedSystem:
 
         return self._retriever.retrieve(case)
 
+    def retrieve_many(self, cases: list[Case]) -> list[list[tuple[Case, float]]]:
+        """
+        Retrieve the k most similar cases for every given case in a single batch.
+        The result contains one list of (case, similarity) tuples per given case, in the same order.
+        """
+        for case in cases:
+            if self.vocabulary.validate_case(case) is False:
+                raise ValueError("Case is not valid.")
+
+        return self._retriever.retrieve_many(cases)
+
     def adapt(
         self, case: Case, similar_cases: Union[list[Case], list[tuple[Case, float]]]
     ) -> Case:
@@ -70,7 +109,21 @@ class CaseBasedSystem:
     def reuse(self, case: Case) -> None:
         """
         This function will add the new case to the case base.
+        When the system is already trained, the case is also added to the retrieval index,
+        which expects the case base to append new cases at the end.
         """
         result = self.case_base.create_case(case)
         if not result is None and result is False:
             raise RuntimeError("Case creation task faile")
+        if hasattr(self, "_retriever"):
+            self._retriever.add_case(case)
+
+    def change_utility(self, case: Case, utility: int) -> None:
+        """
+        Change the utility of a case in the case base and invalidate cached retrieval results.
+        """
+        result = self.case_base.change_utility(case, utility)
+        if not result is None and result is False:
+            raise RuntimeError("Changing the case utility failed")
+        if hasattr(self, "_retriever"):
+            self._retriever.invalidate()
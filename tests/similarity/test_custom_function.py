@@ -2,7 +2,10 @@ from typing import TypeVar
 
 import unittest
 
+import numpy as np
+
 from casebased.components.similarity_measure import SimilarityFunction
+from casebased.components.similarity_measure.types import calculate_batch
 
 T = TypeVar("T")
 
@@ -15,6 +18,11 @@ class CustomFunction(SimilarityFunction):
         return x * y * self.__growth
 
 
+class PlainFunction:
+    def calculate(self, x: T, y: T) -> float:
+        return abs(x - y)
+
+
 TEST_CASES = [
     {
         "x": 20,
@@ -32,3 +40,12 @@ class TestCustomSimilarityFunction(unittest.TestCase):
                 case.get("x"), case.get("y")
             )
             self.assertEqual(dist, case.get("result"))
+
+    def test_custom_function_batch_fallback(self):
+        ys = np.array([1.0, 2.5, 12.134])
+        result = CustomFunction(2.0).calculate_batch(20, ys)
+        np.testing.assert_allclose(result, [40.0, 100.0, 485.36])
+
+    def test_plain_function_batch_fallback(self):
+        result = calculate_batch(PlainFunction(), 3, np.array([1, 3, 7]))
+        np.testing.assert_array_equal(result, [2.0, 0.0, 4.0])
@@ -1,5 +1,7 @@
 import unittest
 
+import numpy as np
+
 from casebased.components.similarity_measure.functions import (
     Equality,
     Static,
@@ -47,3 +49,16 @@ class TestGenericSimilarityFunctions(unittest.TestCase):
         for case in TEST_CASES_VECTOR_DISTANCE:
             dist = VectorDifference().calculate(case.get("x"), case.get("y"))
             self.assertEqual(dist, case.get("result"))
+
+    def test_equality_batch(self):
+        ys = np.array(["red", "blue", "red"], dtype=object)
+        np.testing.assert_array_equal(
+            Equality().calculate_batch("red", ys), [1.0, 0.0, 1.0]
+        )
+        np.testing.assert_array_equal(
+            Equality().calculate_batch(5, np.array([5.0, 4.0])), [1.0, 0.0]
+        )
+
+    def test_static_batch(self):
+        result = Static(0.5).calculate_batch(10, np.arange(4))
+        np.testing.assert_array_equal(result, [0.5, 0.5, 0.5, 0.5])
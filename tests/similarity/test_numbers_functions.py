@@ -1,5 +1,7 @@
 import unittest
 
+import numpy as np
+
 from casebased.components.similarity_measure.functions.numerical import (
     AbsoluteDistance,
     Exponential,
@@ -157,3 +159,26 @@ class TestNumberFunctions(unittest.TestCase):
                 item.get("growth_value"), item.get("middle_value")
             ).calculate(item.get("x"), item.get("y"))
             self.assertAlmostEqual(dist, item.get("result"), places=7)
+
+    def test_calculate_batch_matches_calculate(self):
+        functions = [
+            SquaredDistance(),
+            AbsoluteDistance(),
+            LinearInterval(lower_bound=0, upper_bound=100),
+            Linear(lower_bound=5, upper_bound=10),
+            Threshold(5),
+            Exponential(0.4),
+            Sigmoid(2.1, 3.5),
+        ]
+        ys = np.array([-2, 0, 1, 5, 13, 32, 50, 101], dtype=np.float64)
+        for function in functions:
+            batch = function.calculate_batch(10, ys)
+            self.assertEqual(batch.dtype, np.float64)
+            for y, value in zip(ys, batch):
+                self.assertAlmostEqual(value, function.calculate(10, y), places=9)
+
+    def test_calculate_batch_broadcasts_queries(self):
+        xs = np.array([[0.0], [10.0]])
+        ys = np.array([[0.0, 5.0, 10.0]])
+        result = Linear(lower_bound=None, upper_bound=10).calculate_batch(xs, ys)
+        np.testing.assert_allclose(result, [[1.0, 0.5, 0.0], [0.0, 0.5, 1.0]])
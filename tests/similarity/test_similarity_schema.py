@@ -6,6 +6,7 @@ from casebased.components.similarity_measure.functions import (
 )
 from casebased.components.similarity_measure.schema import SimilaritySchema
 from casebased.components.vocabulary import (
+    Case,
     Condition,
     ConditionType,
     FeatureAttribute,
@@ -51,3 +52,45 @@ class TestSimilaritySchema(unittest.TestCase):
         )
 
         self.assertEqual(len(similarity_schema.attributes), 2)
+
+    def test_compile_resolves_weights(self):
+        vocabulary = Vocabulary(
+            features=[
+                FeatureAttribute(
+                    name="size", data_type=float, conditions=[], weight=2.0
+                ),
+                FeatureAttribute(name="age", data_type=int, conditions=[], weight=0.5),
+            ],
+            targets=[],
+        )
+        schema = SimilaritySchema(
+            vocabulary=vocabulary,
+            attributes={"size": SquaredDistance(), "age": SquaredDistance()},
+        )
+
+        compiled = schema.compile(["age", "size"])
+        self.assertEqual(compiled.keys, ("age", "size"))
+        self.assertEqual(list(compiled.weights), [0.5, 2.0])
+        self.assertIs(schema.compile(["age", "size"]), compiled)
+
+        vocabulary.remove_attribute("age")
+        recompiled = schema.compile(["age", "size"])
+        self.assertIsNot(recompiled, compiled)
+        self.assertEqual(list(recompiled.weights), [1.0, 2.0])
+
+    def test_calculate_uses_compiled_weights(self):
+        vocabulary = Vocabulary(
+            features=[
+                FeatureAttribute(
+                    name="size", data_type=float, conditions=[], weight=2.0
+                ),
+            ],
+            targets=[],
+        )
+        schema = SimilaritySchema(
+            vocabulary=vocabulary,
+            attributes={"size": LinearInterval(0, 10)},
+        )
+        x = Case(feature_attributes={"size": 2.0}, target_attributes={})
+        y = Case(feature_attributes={"size": 7.0}, target_attributes={})
+        self.assertAlmostEqual(schema.calculate(x, y), 1.0)
@@ -0,0 +1,62 @@
+import asyncio
+import unittest
+
+from casebased import AsyncCaseBasedSystem
+from tests.test_case_base_system import build_case, build_system
+
+
+class TestAsyncCaseBasedSystem(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.system = build_system()
+        self.system.train()
+        self.batches = []
+        retrieve_many = self.system.retrieve_many
+
+        def recording_retrieve_many(cases):
+            self.batches.append(len(cases))
+            return retrieve_many(cases)
+
+        self.system.retrieve_many = recording_retrieve_many
+        self.async_system = AsyncCaseBasedSystem(self.system, max_delay=0.01)
+
+    async def test_concurrent_retrieves_are_batched(self):
+        queries = [build_case(size, "red") for size in (1.0, 4.5, 8.5, 9.0, 2.0)]
+        results = await asyncio.gather(
+            *(self.async_system.retrieve(query) for query in queries)
+        )
+        self.assertEqual(self.batches, [5])
+        for query, result in zip(queries, results):
+            self.assertEqual(result, self.system.retrieve(query))
+
+    async def test_scoring_tasks_are_referenced(self):
+        self.async_system.max_batch_size = 2
+        pending = [
+            asyncio.ensure_future(self.async_system.retrieve(build_case(size, "red")))
+            for size in (1.0, 8.0)
+        ]
+        await asyncio.sleep(0)
+        self.assertEqual(len(self.async_system._tasks), 1)
+        await asyncio.gather(*pending)
+        await asyncio.sleep(0)
+        self.assertEqual(len(self.async_system._tasks), 0)
+
+    async def test_max_batch_size(self):
+        self.async_system.max_batch_size = 2
+        queries = [build_case(float(size), "blue") for size in range(5)]
+        await asyncio.gather(*(self.async_system.retrieve(query) for query in queries))
+        self.assertEqual(self.batches, [2, 2])
+
+    async def test_invalid_case_is_rejected(self):
+        with self.assertRaises(ValueError):
+            await self.async_system.retrieve(build_case(1.0, 3))
+
+    async def test_reuse_then_retrieve(self):
+        await self.async_system.reuse(build_case(5.0, "yellow", 50.0))
+        result = await self.async_system.retrieve(build_case(5.0, "yellow"))
+        self.assertEqual(result[0][0].target_attributes["price"], 50.0)
+
+    async def test_adapt(self):
+        query = build_case(8.5, "red")
+        similar = await self.async_system.retrieve(query)
+        adapted = await self.async_system.adapt(query, similar)
+        self.assertEqual(adapted.target_attributes["price"], 80.0)
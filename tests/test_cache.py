@@ -0,0 +1,76 @@
+import unittest
+from unittest import mock
+
+from casebased import RetrievalCache
+from tests.test_case_base_system import build_case, build_system
+
+
+class TestRetrievalCache(unittest.TestCase):
+    def test_evicts_least_recently_used(self):
+        cache = RetrievalCache(max_size=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(len(cache), 2)
+
+    def test_entries_expire(self):
+        cache = RetrievalCache(ttl=10.0)
+        with mock.patch("casebased.actors.cache.time.monotonic", return_value=100.0):
+            cache.put("a", 1)
+        with mock.patch("casebased.actors.cache.time.monotonic", return_value=105.0):
+            self.assertEqual(cache.get("a"), 1)
+        with mock.patch("casebased.actors.cache.time.monotonic", return_value=111.0):
+            self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 0)
+
+    def test_statistics(self):
+        cache = RetrievalCache()
+        cache.put("a", [])
+        self.assertEqual(cache.get("a"), [])
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual((cache.hits, cache.misses, cache.hit_rate), (1, 1, 0.5))
+        cache.clear()
+        self.assertEqual((len(cache), cache.hits, cache.misses), (0, 0, 0))
+
+
+class TestSystemCache(unittest.TestCase):
+    def setUp(self):
+        self.system = build_system()
+        self.system.cache = RetrievalCache()
+        self.system.train()
+        self.query = build_case(8.5, "red")
+
+    def test_repeated_query_hits(self):
+        first = self.system.retrieve(self.query)
+        self.assertEqual(self.system.retrieve(build_case(8.5, "red")), first)
+        self.assertEqual((self.system.cache.hits, self.system.cache.misses), (1, 1))
+
+    def test_retrieve_many_uses_cache(self):
+        first = self.system.retrieve(self.query)
+        results = self.system.retrieve_many([build_case(1.0, "blue"), self.query])
+        self.assertEqual(results[1], first)
+        self.assertEqual(results[0], self.system.retrieve(build_case(1.0, "blue")))
+        self.assertEqual((self.system.cache.hits, self.system.cache.misses), (2, 2))
+
+    def test_k_and_threshold_are_part_of_the_key(self):
+        self.system.retrieve(self.query)
+        self.system._retriever.k = 1
+        self.assertEqual(len(self.system.retrieve(self.query)), 1)
+        self.system._retriever.threshold = 1.9
+        self.system.retrieve(self.query)
+        self.assertEqual(self.system.cache.hits, 0)
+
+    def test_changes_invalidate(self):
+        self.system.retrieve(self.query)
+        self.system.reuse(build_case(8.5, "red", 85.0))
+        result = self.system.retrieve(self.query)
+        self.assertEqual(result[0][0].target_attributes["price"], 85.0)
+
+        self.system.change_utility(result[0][0], 3)
+        self.system.retrieve(self.query)
+        self.system.train()
+        self.system.retrieve(self.query)
+        self.assertEqual((self.system.cache.hits, self.system.cache.misses), (0, 4))
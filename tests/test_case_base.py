@@ -170,6 +170,70 @@ class TestCaseBase(unittest.TestCase):
 
         pd.testing.assert_frame_equal(case_base_instance.cases, expected_case_base_df)
 
+    def test_add_list_of_cases_from_dataframe(self):
+
+        case_base_instance = CaseBase(cases=self.regen_cases_dataframe)
+
+        new_cases = pd.DataFrame(
+            {
+                "Fallnummer": [5, 6],
+                "Temperatur": [20.0, 21.0],
+                "Luftfeuchtigkeit": [1, 2],
+                "Luftdruck": [1, 2],
+                "Windgeschwindigkeit": [1, 2],
+                "Laengengrad": [1.0, 2.0],
+                "Breitengrad": [1.0, 2.0],
+                "Regen?": [1, 0],
+            }
+        )
+
+        case_base_instance.add_list_of_cases(new_cases)
+
+        self.assertEqual(len(case_base_instance.cases), 6)
+        self.assertEqual(
+            list(case_base_instance.cases.columns),
+            list(self.regen_cases_dataframe.columns) + ["utility"],
+        )
+        self.assertEqual(
+            list(case_base_instance.cases["Fallnummer"]), [1, 2, 3, 4, 5, 6]
+        )
+        self.assertEqual(list(case_base_instance.cases["utility"]), [0] * 6)
+
+    def test_add_list_of_cases_from_iterator(self):
+
+        case_base_instance = CaseBase(cases=self.regen_cases_dataframe)
+
+        new_cases = (
+            {
+                "Fallnummer": number,
+                "Temperatur": 20.0,
+                "Luftfeuchtigkeit": 1,
+                "Luftdruck": 1,
+                "Windgeschwindigkeit": 1,
+                "Laengengrad": 1.0,
+                "Breitengrad": 1.0,
+                "Regen?": 1,
+                "utility": 3,
+            }
+            for number in range(5, 1005)
+        )
+
+        case_base_instance.add_list_of_cases(new_cases)
+
+        self.assertEqual(len(case_base_instance.cases), 1004)
+        self.assertEqual(case_base_instance.cases["Fallnummer"].iloc[-1], 1004)
+        self.assertEqual(case_base_instance.cases["utility"].iloc[-1], 3)
+
+    def test_add_list_of_cases_invalid_structure(self):
+
+        case_base_instance = CaseBase(cases=self.regen_cases_dataframe)
+
+        with self.assertRaises(ValueError):
+            case_base_instance.add_list_of_cases(
+                [{"Fallnummer": 5, "Temperatur": 20.0}]
+            )
+        self.assertEqual(len(case_base_instance.cases), 4)
+
     def test_update_case(self):
 
         case_base_instance = CaseBase(cases=self.regen_cases_dataframe)
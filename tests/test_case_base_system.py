@@ -1,6 +1,117 @@
+from typing import Optional
+
 import unittest
 
+from casebased import CaseBasedSystem
+from casebased.components.similarity_measure import SimilaritySchema
+from casebased.components.similarity_measure.functions import Equality, Linear
+from casebased.components.vocabulary import (
+    Case,
+    FeatureAttribute,
+    TargetAttribute,
+    Vocabulary,
+)
+
+
+class ListCaseBase:
+    def __init__(self, cases: list[Case]):
+        self.cases = cases
+
+    def get_all_cases(self) -> list[Case]:
+        return self.cases
+
+    def create_case(self, case: Case) -> Optional[bool]:
+        self.cases.append(case)
+        return True
+
+    def change_utility(self, case: Case, utility: int) -> Optional[bool]:
+        return None
+
+
+class FirstCaseAdapter:
+    def adapt(self, case: Case, similar_cases) -> Case:
+        return similar_cases[0][0]
+
+
+def build_case(size: float, color: str, price: Optional[float] = None) -> Case:
+    return Case(
+        feature_attributes={"size": size, "color": color},
+        target_attributes={"price": price},
+    )
+
+
+def build_system() -> CaseBasedSystem:
+    vocabulary = Vocabulary(
+        features=[
+            FeatureAttribute(name="size", data_type=float, conditions=[]),
+            FeatureAttribute(name="color", data_type=str, conditions=[]),
+        ],
+        targets=[TargetAttribute(name="price", data_type=float, conditions=[])],
+    )
+    return CaseBasedSystem(
+        similarity_schema=SimilaritySchema(
+            vocabulary=vocabulary,
+            attributes={
+                "size": Linear(lower_bound=None, upper_bound=10.0),
+                "color": Equality(),
+            },
+        ),
+        vocabulary=vocabulary,
+        case_base=ListCaseBase(
+            [
+                build_case(1.0, "red", 10.0),
+                build_case(4.0, "blue", 40.0),
+                build_case(8.0, "red", 80.0),
+                build_case(9.0, "green", 90.0),
+            ]
+        ),
+        threshold=None,
+        adapter=FirstCaseAdapter(),
+        k=2,
+    )
+
 
 class TestCaseBaseSystem(unittest.TestCase):
+    def setUp(self):
+        self.system = build_system()
+
     def test__system_init(self):
-        pass
+        self.system.train()
+        result = self.system.retrieve(build_case(8.5, "red"))
+        self.assertEqual(
+            [case.target_attributes["price"] for case, _ in result], [80.0, 10.0]
+        )
+
+    def test__threshold_limits_retrieved_cases(self):
+        self.system.threshold = 1.5
+        self.system.train()
+        query = build_case(8.5, "red")
+        result = self.system.retrieve(query)
+        self.assertEqual(
+            [case.target_attributes["price"] for case, _ in result], [80.0]
+        )
+        self.assertEqual(self.system.retrieve_many([query]), [result])
+
+    def test__retrieve_many(self):
+        self.system.train()
+        queries = [build_case(1.5, "red"), build_case(4.0, "blue")]
+        results = self.system.retrieve_many(queries)
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0][0][0].target_attributes["price"], 10.0)
+        self.assertEqual(results[1][0][0].target_attributes["price"], 40.0)
+        self.assertAlmostEqual(results[1][0][1], 2.0)
+
+    def test__retrieve_many_rejects_invalid_case(self):
+        self.system.train()
+        with self.assertRaises(ValueError):
+            self.system.retrieve_many([build_case(1.0, "red"), build_case(2.0, 3)])
+
+    def test__reuse_updates_index(self):
+        self.system.train()
+        self.system.reuse(build_case(5.0, "yellow", 50.0))
+        self.system.reuse(build_case(6.0, "yellow", 60.0))
+        result = self.system.retrieve(build_case(5.0, "yellow"))
+        self.assertEqual(
+            [case.target_attributes["price"] for case, _ in result], [50.0, 60.0]
+        )
+        self.assertAlmostEqual(result[0][1], 2.0)
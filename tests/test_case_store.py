@@ -0,0 +1,217 @@
+import unittest
+
+import numpy as np
+
+from casebased import ColumnarCaseBaseAdapter
+from casebased.actors.retriever import Retriever
+from casebased.components.casebase.case_store import CaseStore
+from casebased.components.similarity_measure import SimilaritySchema
+from casebased.components.similarity_measure.functions import (
+    Equality,
+    Levenshtein,
+    Linear,
+)
+from casebased.components.vocabulary import (
+    Case,
+    FeatureAttribute,
+    TargetAttribute,
+    Vocabulary,
+)
+from casebased.system import CaseBasedSystem
+from tests.test_case_base_system import FirstCaseAdapter
+from tests.test_retriever import ListCaseBase
+
+VOCABULARY = Vocabulary(
+    features=[
+        FeatureAttribute(name="size", data_type=float, conditions=[]),
+        FeatureAttribute(name="rooms", data_type=int, conditions=[]),
+        FeatureAttribute(name="city", data_type=str, conditions=[]),
+    ],
+    targets=[TargetAttribute(name="price", data_type=float, conditions=[])],
+)
+
+CASES = [
+    Case(
+        feature_attributes={"size": 50.0, "rooms": 2, "city": "Berlin"},
+        target_attributes={"price": 1000.0},
+    ),
+    Case(
+        feature_attributes={"size": 80.5, "rooms": 3, "city": "Hamburg"},
+        target_attributes={"price": None},
+    ),
+    Case(
+        feature_attributes={"size": 120.0, "rooms": 4, "city": "Berlin"},
+        target_attributes={"price": 2500.0},
+        utility=3,
+    ),
+]
+
+
+class TestCaseStore(unittest.TestCase):
+    def test_round_trip(self):
+        store = CaseStore(VOCABULARY, capacity=1)
+        for case in CASES:
+            store.create_case(case)
+
+        self.assertIsInstance(store, ColumnarCaseBaseAdapter)
+        self.assertEqual(len(store), 3)
+        self.assertEqual(store.get_all_cases(), CASES)
+        self.assertEqual(store.get_case(1), CASES[1])
+
+        fresh = CaseStore(VOCABULARY)
+        fresh.add_cases(CASES)
+        self.assertEqual(fresh.get_all_cases(), CASES)
+
+    def test_batches_and_ids(self):
+        store = CaseStore(VOCABULARY)
+        store.add_cases(CASES)
+
+        self.assertEqual(store.get_cases_by_ids([2, 0]), [CASES[2], CASES[0]])
+        self.assertEqual(
+            list(store.iter_case_batches(2)), [[CASES[0], CASES[1]], [CASES[2]]]
+        )
+        store.get_all_cases()
+        self.assertEqual(store.get_cases_by_ids([1]), [CASES[1]])
+
+    def test_columns(self):
+        store = CaseStore(VOCABULARY)
+        store.add_cases(CASES)
+
+        sizes = store.column("size")
+        self.assertEqual(sizes.dtype, np.float64)
+        np.testing.assert_array_equal(sizes, [50.0, 80.5, 120.0])
+        self.assertFalse(sizes.flags.writeable)
+        self.assertEqual(store.column("rooms").dtype, np.int64)
+        np.testing.assert_array_equal(store.column("city"), [0, 1, 0])
+        self.assertEqual(store.categories("city"), ["Berlin", "Hamburg"])
+        self.assertIsNone(store.categories("size"))
+
+    def test_missing_numerical_values(self):
+        missing = Case(
+            feature_attributes={"size": 50.0, "rooms": None, "city": "Berlin"},
+            target_attributes={"price": None},
+        )
+        store = CaseStore(VOCABULARY)
+        store.add_cases([missing, *CASES])
+
+        rooms = store.column("rooms")
+        self.assertEqual(rooms.dtype, np.float64)
+        self.assertTrue(np.isnan(rooms[0]))
+        np.testing.assert_array_equal(rooms[1:], [2, 3, 4])
+        self.assertFalse(rooms.flags.writeable)
+
+        schema = SimilaritySchema(
+            vocabulary=VOCABULARY,
+            attributes={
+                "size": Linear(lower_bound=None, upper_bound=100.0),
+                "rooms": Linear(lower_bound=None, upper_bound=4),
+                "city": Equality(),
+            },
+        )
+        query = Case(
+            feature_attributes={"size": 50.0, "rooms": 0, "city": "Berlin"},
+            target_attributes={"price": None},
+        )
+        results = []
+        for case_base in (store, ListCaseBase([missing, *CASES])):
+            retriever = Retriever(similarity_schema=schema, case_base=case_base, k=4)
+            retriever.train(feature_attribute_keys=["size", "rooms", "city"])
+            results.append(retriever.retrieve(query))
+
+        self.assertEqual(
+            [case for case, _ in results[0]], [case for case, _ in results[1]]
+        )
+        np.testing.assert_array_equal(
+            [similarity for _, similarity in results[0]],
+            [similarity for _, similarity in results[1]],
+        )
+        scores = [similarity for case, similarity in results[0] if case == missing]
+        self.assertEqual(scores, [2.0])
+        self.assertFalse(np.isnan([similarity for _, similarity in results[0]]).any())
+
+        retriever = Retriever(
+            similarity_schema=schema, case_base=store, k=4, threshold=1.5
+        )
+        retriever.train(feature_attribute_keys=["size", "rooms", "city"])
+        self.assertIn(missing, [case for case, _ in retriever.retrieve(query)])
+
+    def test_change_utility(self):
+        store = CaseStore(VOCABULARY)
+        store.add_cases(CASES)
+
+        self.assertTrue(store.change_utility(CASES[1], 7))
+        np.testing.assert_array_equal(store.utilities, [0, 7, 3])
+        self.assertEqual(store.get_all_cases()[1].utility, 7)
+
+        unknown = Case(
+            feature_attributes={"size": 1.0, "rooms": 1, "city": "Munich"},
+            target_attributes={"price": None},
+        )
+        self.assertFalse(store.change_utility(unknown, 1))
+
+    def test_retriever_reads_columns(self):
+        store = CaseStore(VOCABULARY)
+        store.add_cases(CASES)
+        schema = SimilaritySchema(
+            vocabulary=VOCABULARY,
+            attributes={
+                "size": Linear(lower_bound=None, upper_bound=100.0),
+                "rooms": Linear(lower_bound=None, upper_bound=4),
+                "city": Equality(),
+            },
+        )
+        retriever = Retriever(similarity_schema=schema, case_base=store, k=2)
+        retriever.train(feature_attribute_keys=["size", "rooms", "city"])
+
+        query = Case(
+            feature_attributes={"size": 110.0, "rooms": 4, "city": "Berlin"},
+            target_attributes={"price": None},
+        )
+        result = retriever.retrieve(query)
+        self.assertEqual(result[0][0], CASES[2])
+        self.assertAlmostEqual(result[0][1], schema.calculate(query, CASES[2]))
+        self.assertAlmostEqual(result[1][1], schema.calculate(query, CASES[0]))
+        new_case = Case(
+            feature_attributes={"size": 110.0, "rooms": 4, "city": "Munich"},
+            target_attributes={"price": 3000.0},
+        )
+        store.create_case(new_case)
+        retriever.add_case(new_case)
+        self.assertEqual(retriever.retrieve(new_case)[0][0], new_case)
+        np.testing.assert_array_equal(store.column("size"), [50.0, 80.5, 120.0, 110.0])
+
+    def test_reuse_missing_string(self):
+        store = CaseStore(VOCABULARY)
+        store.add_cases(CASES)
+        system = CaseBasedSystem(
+            similarity_schema=SimilaritySchema(
+                vocabulary=VOCABULARY,
+                attributes={
+                    "size": Linear(lower_bound=None, upper_bound=100.0),
+                    "rooms": Linear(lower_bound=None, upper_bound=4),
+                    "city": Levenshtein(),
+                },
+            ),
+            vocabulary=VOCABULARY,
+            case_base=store,
+            threshold=None,
+            adapter=FirstCaseAdapter(),
+            k=4,
+        )
+        system.train()
+
+        missing = Case(
+            feature_attributes={"size": 60.0, "rooms": 2, "city": None},
+            target_attributes={"price": None},
+        )
+        system.reuse(missing)
+        query = Case(
+            feature_attributes={"size": 60.0, "rooms": 2, "city": "Berlin"},
+            target_attributes={"price": None},
+        )
+        result = system.retrieve(query)
+
+        self.assertEqual(len(result), 4)
+        reused = [value for case, value in result if case == missing]
+        self.assertEqual(len(reused), 1)
+        self.assertAlmostEqual(reused[0], 2.0)
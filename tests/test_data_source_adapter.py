@@ -1,9 +1,28 @@
 import os
+import sys
+import tempfile
+from unittest import mock
 
 import pandas as pd
+import pytest
 
 from casebased.components.casebase.casebase import CaseBase
 from casebased.components.casebase.data_source_adapter import DataSourceAdapter
+from casebased.components.vocabulary import (
+    Condition,
+    ConditionType,
+    FeatureAttribute,
+    TargetAttribute,
+    Vocabulary,
+)
+
+REGEN_VOCABULARY = Vocabulary(
+    features=[
+        FeatureAttribute(name="Temperatur", data_type=float, conditions=[]),
+        FeatureAttribute(name="Luftfeuchtigkeit", data_type=int, conditions=[]),
+    ],
+    targets=[TargetAttribute(name="Regen?", data_type=bool, conditions=[])],
+)
 
 
 class TestDataSourceAdapter:
@@ -259,3 +278,136 @@ class TestDataSourceAdapter:
 
         # Cleanup: Remove the test CSV file
         os.remove(path_to_update_csv)
+
+    @pytest.mark.parametrize("extension", [".parquet", ".arrow", ".feather"])
+    def test_columnar_files(self, extension):
+        pytest.importorskip("pyarrow")
+        regen = DataSourceAdapter("test_data/regen.csv").read_file()
+        regen["utility"] = [30, 55, 70, 40]
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "regen" + extension)
+            data_source_adapter = DataSourceAdapter(path)
+            case_base = CaseBase(cases=regen)
+            case_base.prune(threshold=50)
+            data_source_adapter.update_data_source(case_base)
+
+            pd.testing.assert_frame_equal(
+                data_source_adapter.read_file(),
+                regen[regen["utility"] >= 50].reset_index(drop=True),
+            )
+
+            projected = DataSourceAdapter(path, REGEN_VOCABULARY).read_file()
+            assert list(projected.columns) == [
+                "Temperatur",
+                "Luftfeuchtigkeit",
+                "Regen?",
+                "utility",
+            ]
+            assert projected["Regen?"].tolist() == [False, True]
+            assert projected["Temperatur"].dtype == "float64"
+
+            typed_adapter = DataSourceAdapter(path, REGEN_VOCABULARY)
+            typed_adapter.update_data_source(case_base)
+            written = data_source_adapter.read_file()
+            assert list(written.columns) == list(regen.columns)
+            assert written["Fallnummer"].tolist() == [2, 3]
+            assert written["Regen?"].tolist() == [False, True]
+
+    def test_columnar_files_without_pyarrow(self):
+        case_base = CaseBase(cases=DataSourceAdapter("test_data/regen.csv").read_file())
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "regen.parquet")
+            open(path, "wb").close()
+            data_source_adapter = DataSourceAdapter(path)
+            with mock.patch.dict(sys.modules, {"pyarrow": None}):
+                with pytest.raises(ImportError, match="pip install pyarrow"):
+                    data_source_adapter.read_file()
+                with pytest.raises(ImportError, match="pip install pyarrow"):
+                    data_source_adapter.update_data_source(case_base)
+
+    def test_read_file_chunks(self):
+        vocabulary = Vocabulary(
+            features=[
+                FeatureAttribute(name="Temperatur", data_type=float, conditions=[]),
+                FeatureAttribute(
+                    name="Luftfeuchtigkeit",
+                    data_type=int,
+                    conditions=[
+                        Condition(ConditionType.GREATER_THAN_EQUALS, 0),
+                        Condition(ConditionType.LOWER_THAN_EQUALS, 100),
+                    ],
+                ),
+                FeatureAttribute(
+                    name="Luftdruck",
+                    data_type=int,
+                    conditions=[
+                        Condition(ConditionType.GREATER_THAN, -1000),
+                        Condition(ConditionType.LOWER_THAN, 2000),
+                    ],
+                ),
+                FeatureAttribute(
+                    name="Windgeschwindigkeit", data_type=int, conditions=[]
+                ),
+                FeatureAttribute(name="Stadt", data_type=str, conditions=[]),
+            ],
+            targets=[TargetAttribute(name="Regen?", data_type=bool, conditions=[])],
+        )
+        regen = DataSourceAdapter("test_data/regen.csv").read_file()
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "regen.csv")
+            regen.assign(Stadt=["Berlin", None, "Hamburg", "Muenchen"]).to_csv(
+                path, index=False
+            )
+            chunks = list(DataSourceAdapter(path, vocabulary).read_file_chunks(3))
+
+        assert [len(chunk) for chunk in chunks] == [3, 1]
+        dtypes = chunks[0].dtypes.astype(str).to_dict()
+        assert dtypes == {
+            "Temperatur": "float64",
+            "Luftfeuchtigkeit": "UInt8",
+            "Luftdruck": "Int16",
+            "Windgeschwindigkeit": "Int64",
+            "Regen?": "boolean",
+            "Stadt": "category",
+        }
+        assert chunks[0]["Stadt"].isna().tolist() == [False, True, False]
+
+        case_base = CaseBase(cases=chunks[0])
+        for chunk in chunks[1:]:
+            case_base.add_list_of_cases(chunk)
+        assert case_base.cases["Luftfeuchtigkeit"].tolist() == [85, 60, 90, 50]
+
+    def test_read_file_chunks_out_of_range(self):
+        vocabulary = Vocabulary(
+            features=[
+                FeatureAttribute(
+                    name="Luftfeuchtigkeit",
+                    data_type=int,
+                    conditions=[
+                        Condition(ConditionType.GREATER_THAN_EQUALS, 0),
+                        Condition(ConditionType.LOWER_THAN_EQUALS, 100),
+                    ],
+                ),
+            ],
+            targets=[],
+        )
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "humidity.csv")
+            pd.DataFrame({"Luftfeuchtigkeit": [85, 60, 300, -4]}).to_csv(
+                path, index=False
+            )
+            chunks = list(DataSourceAdapter(path, vocabulary).read_file_chunks(2))
+
+        assert [str(chunk["Luftfeuchtigkeit"].dtype) for chunk in chunks] == [
+            "UInt8",
+            "Int64",
+        ]
+        assert chunks[1]["Luftfeuchtigkeit"].tolist() == [300, -4]
+
+    def test_read_file_chunks_unsupported(self):
+        with pytest.raises(ValueError):
+            next(DataSourceAdapter("test_data/regen.parquet").read_file_chunks(2))
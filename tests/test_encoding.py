@@ -0,0 +1,35 @@
+import unittest
+
+import numpy as np
+
+from casebased.actors.encoding import CategoricalEncoder
+
+
+class TestCategoricalEncoder(unittest.TestCase):
+    def test_codes_follow_first_appearance(self):
+        encoder = CategoricalEncoder()
+        codes = encoder.encode(["red", "blue", "red", "green"])
+        np.testing.assert_array_equal(codes, [0, 1, 0, 2])
+        self.assertEqual(codes.dtype, np.int32)
+        self.assertEqual(list(encoder.categories), ["red", "blue", "green"])
+        self.assertEqual(encoder.code("blue"), 1)
+        self.assertIsNone(encoder.code("yellow"))
+
+    def test_encoding_is_reproducible(self):
+        values = ["b", "a", "c", "a"]
+        first = CategoricalEncoder().encode(values)
+        second = CategoricalEncoder().encode(values)
+        np.testing.assert_array_equal(first, second)
+
+    def test_decode(self):
+        encoder = CategoricalEncoder(["x", "y"])
+        codes = encoder.encode(["y", "z"])
+        np.testing.assert_array_equal(codes, [1, 2])
+        self.assertEqual(list(encoder.decode(np.array([2, 0, 1]))), ["z", "x", "y"])
+
+    def test_missing_values(self):
+        encoder = CategoricalEncoder()
+        codes = encoder.encode(["x", None, "y"])
+        np.testing.assert_array_equal(codes, [0, -1, 1])
+        self.assertEqual(list(encoder.categories), ["x", "y"])
+        self.assertEqual(list(encoder.decode(codes)), ["x", None, "y"])
@@ -0,0 +1,130 @@
+import random
+import string
+import unittest
+
+import numpy as np
+
+from casebased.actors.qgram import QGramIndex, qgrams
+from casebased.actors.retriever import Retriever
+from casebased.components.similarity_measure import SimilaritySchema
+from casebased.components.similarity_measure.functions import (
+    JaroWinkler,
+    Levenshtein,
+    Linear,
+)
+from casebased.components.vocabulary import (
+    Case,
+    FeatureAttribute,
+    TargetAttribute,
+    Vocabulary,
+)
+from tests.test_retriever import ListCaseBase
+
+
+def random_word(rng: random.Random) -> str:
+    return "".join(
+        rng.choice(string.ascii_lowercase[:8]) for _ in range(rng.randint(3, 12))
+    )
+
+
+class TestQGramIndex(unittest.TestCase):
+    def test_common_counts_multisets(self):
+        index = QGramIndex(2)
+        index.update(["banana", "band", "", None])
+        np.testing.assert_array_equal(index.lengths, [6, 4, 0, 0])
+        np.testing.assert_array_equal(index.common("anana"), [4, 1, 0, 0])
+
+    def test_update_is_incremental(self):
+        rng = random.Random(1)
+        words = [random_word(rng) for _ in range(50)]
+        incremental = QGramIndex(2)
+        incremental.update(words[:20])
+        incremental.common(words[0])
+        incremental.update(words)
+        for query in words[:5]:
+            expected = [
+                sum((qgrams(query, 2) & qgrams(word, 2)).values()) for word in words
+            ]
+            np.testing.assert_array_equal(incremental.common(query), expected)
+
+
+class TestQGramRetrieval(unittest.TestCase):
+    def setUp(self):
+        self.vocabulary = Vocabulary(
+            features=[
+                FeatureAttribute(name="name", data_type=str, conditions=[], weight=0.7),
+                FeatureAttribute(
+                    name="size", data_type=float, conditions=[], weight=0.3
+                ),
+            ],
+            targets=[TargetAttribute(name="price", data_type=float, conditions=[])],
+        )
+        rng = random.Random(3)
+        self.cases = [
+            Case(
+                feature_attributes={
+                    "name": random_word(rng),
+                    "size": rng.uniform(0.0, 100.0),
+                },
+                target_attributes={"price": rng.uniform(0.0, 1.0)},
+            )
+            for _ in range(1500)
+        ]
+        self.queries = self.cases[:5] + [
+            Case(
+                feature_attributes={"name": random_word(rng), "size": 50.0},
+                target_attributes={},
+            )
+            for _ in range(5)
+        ]
+
+    def assert_pruned_matches_brute_force(self, function, threshold=None):
+        schema = SimilaritySchema(
+            vocabulary=self.vocabulary,
+            attributes={"name": function, "size": Linear(None, 100.0)},
+        )
+        case_base = ListCaseBase(list(self.cases))
+        brute = Retriever(
+            similarity_schema=schema, case_base=case_base, k=10, threshold=threshold
+        )
+        pruned = Retriever(
+            similarity_schema=schema,
+            case_base=case_base,
+            k=10,
+            threshold=threshold,
+            qgram_index=True,
+        )
+        brute.train(feature_attribute_keys=["name", "size"])
+        pruned.train(feature_attribute_keys=["name", "size"])
+        self.assertEqual(list(pruned._engine._qgram_indexes), ["name"])
+        for query in self.queries:
+            expected = [sim for _, sim in brute.retrieve(query)]
+            actual = [sim for _, sim in pruned.retrieve(query)]
+            np.testing.assert_allclose(actual, expected, rtol=0, atol=1e-12)
+
+    def test_normalized_levenshtein(self):
+        self.assert_pruned_matches_brute_force(Levenshtein(normalized=True))
+
+    def test_jaro_winkler(self):
+        self.assert_pruned_matches_brute_force(JaroWinkler(0.1))
+
+    def test_threshold(self):
+        self.assert_pruned_matches_brute_force(JaroWinkler(0.1), threshold=0.75)
+        self.assert_pruned_matches_brute_force(
+            Levenshtein(normalized=True), threshold=2.0
+        )
+
+    def test_unbounded_function_is_not_indexed(self):
+        schema = SimilaritySchema(
+            vocabulary=self.vocabulary,
+            attributes={"name": Levenshtein(), "size": Linear(None, 100.0)},
+        )
+        retriever = Retriever(
+            similarity_schema=schema,
+            case_base=ListCaseBase(list(self.cases)),
+            k=3,
+            qgram_index=True,
+        )
+        retriever.train(feature_attribute_keys=["name", "size"])
+        self.assertEqual(retriever._engine._qgram_indexes, {})
+        self.assertEqual(len(retriever.retrieve(self.queries[0])), 3)
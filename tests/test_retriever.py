@@ -0,0 +1,496 @@
+from typing import Optional
+
+import json
+import random
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+from casebased.actors import engine
+from casebased.actors import retriever as retriever_module
+from casebased.actors.cache import RetrievalCache
+from casebased.actors.progress import MetricsListener, ProgressEvent
+from casebased.actors.retriever import Retriever
+from casebased.actors.sharding import ShardedEngine
+from casebased.case_base_adapter import ColumnarCaseBaseAdapter
+from casebased.components.similarity_measure import SimilarityFunction, SimilaritySchema
+from casebased.components.similarity_measure.functions import (
+    Equality,
+    Exponential,
+    Linear,
+)
+from casebased.components.vocabulary import (
+    Case,
+    FeatureAttribute,
+    TargetAttribute,
+    Vocabulary,
+)
+
+
+class ListCaseBase:
+    def __init__(self, cases: list[Case]):
+        self.cases = cases
+
+    def get_all_cases(self) -> list[Case]:
+        return self.cases
+
+    def create_case(self, case: Case) -> Optional[bool]:
+        self.cases.append(case)
+        return True
+
+    def change_utility(self, case: Case, utility: int) -> Optional[bool]:
+        return None
+
+
+class BatchCaseBase(ListCaseBase):
+    def __init__(self, cases: list[Case]):
+        super().__init__(cases)
+        self.fetched: list[list[int]] = []
+
+    def get_all_cases(self) -> list[Case]:
+        raise AssertionError("the retriever should only read batches and ids")
+
+    def iter_case_batches(self, batch_size: int):
+        for start in range(0, len(self.cases), batch_size):
+            yield self.cases[start : start + batch_size]
+
+    def get_cases_by_ids(self, ids: list[int]) -> list[Case]:
+        self.fetched.append(list(ids))
+        return [self.cases[index] for index in ids]
+
+
+class ColumnCaseBase(ListCaseBase):
+    def column(self, name: str) -> np.ndarray:
+        return np.array([case.feature_attributes[name] for case in self.cases])
+
+    def categories(self, name: str) -> Optional[list]:
+        return None
+
+
+def build_vocabulary() -> Vocabulary:
+    return Vocabulary(
+        features=[
+            FeatureAttribute(name="size", data_type=float, conditions=[], weight=0.5),
+            FeatureAttribute(name="rooms", data_type=int, conditions=[], weight=0.3),
+            FeatureAttribute(name="city", data_type=str, conditions=[], weight=0.2),
+        ],
+        targets=[TargetAttribute(name="price", data_type=float, conditions=[])],
+    )
+
+
+def build_schema(vocabulary: Vocabulary) -> SimilaritySchema:
+    return SimilaritySchema(
+        vocabulary=vocabulary,
+        attributes={
+            "size": Linear(lower_bound=None, upper_bound=100.0),
+            "rooms": Exponential(0.5),
+            "city": Equality(),
+        },
+    )
+
+
+def build_cases(count: int, seed: int = 7) -> list[Case]:
+    rng = random.Random(seed)
+    return [
+        Case(
+            feature_attributes={
+                "size": rng.uniform(20.0, 200.0),
+                "rooms": rng.randint(1, 6),
+                "city": rng.choice(["Berlin", "Hamburg", "Munich", "Cologne"]),
+            },
+            target_attributes={"price": rng.uniform(1e5, 1e6)},
+        )
+        for _ in range(count)
+    ]
+
+
+class TestRetriever(unittest.TestCase):
+    def setUp(self):
+        self.vocabulary = build_vocabulary()
+        self.schema = build_schema(self.vocabulary)
+        self.cases = build_cases(300)
+        self.case_base = ListCaseBase(self.cases)
+        self.retriever = Retriever(
+            similarity_schema=self.schema, case_base=self.case_base, k=5
+        )
+        self.retriever.train(
+            feature_attribute_keys=[f.name for f in self.vocabulary.features]
+        )
+
+    def expected(self, query: Case, k: int) -> list[float]:
+        scores = [self.schema.calculate(query, case) for case in self.cases]
+        return sorted(scores, reverse=True)[:k]
+
+    def test_retrieve_matches_schema(self):
+        for query in build_cases(10, seed=11):
+            result = self.retriever.retrieve(query)
+            self.assertEqual(len(result), 5)
+            for (case, sim), expected in zip(result, self.expected(query, 5)):
+                self.assertAlmostEqual(sim, expected, places=9)
+                self.assertAlmostEqual(
+                    self.schema.calculate(query, case), expected, places=9
+                )
+
+    def test_retrieve_more_than_case_base(self):
+        self.retriever.k = 500
+        result = self.retriever.retrieve(self.cases[0])
+        self.assertEqual(len(result), 300)
+        self.assertIs(result[0][0], self.cases[0])
+
+    def test_retrieve_many_matches_retrieve(self):
+        queries = build_cases(25, seed=3)
+        batch = self.retriever.retrieve_many(queries)
+        self.assertEqual(len(batch), len(queries))
+        for query, result in zip(queries, batch):
+            single = self.retriever.retrieve(query)
+            self.assertEqual([case for case, _ in result], [case for case, _ in single])
+            for (_, batch_sim), (_, single_sim) in zip(result, single):
+                self.assertAlmostEqual(batch_sim, single_sim, places=9)
+
+    def test_threshold_filters_cases(self):
+        query = build_cases(1, seed=19)[0]
+        scores = sorted(self.expected(query, 300), reverse=True)
+        self.retriever.threshold = (scores[2] + scores[3]) / 2
+        result = self.retriever.retrieve(query)
+        self.assertEqual(len(result), 3)
+        self.assertEqual(
+            [case for case, _ in self.retriever.retrieve_many([query])[0]],
+            [case for case, _ in result],
+        )
+        self.retriever.threshold = scores[0] + 1.0
+        self.assertEqual(self.retriever.retrieve(query), [])
+
+    def test_add_case_matches_training(self):
+        new_cases = build_cases(40, seed=5)
+        for case in new_cases:
+            self.case_base.create_case(case)
+            self.retriever.add_case(case)
+
+        trained = Retriever(
+            similarity_schema=self.schema, case_base=self.case_base, k=5
+        )
+        trained.train(feature_attribute_keys=[f.name for f in self.vocabulary.features])
+        for query in build_cases(5, seed=13):
+            incremental = self.retriever.retrieve(query)
+            self.assertEqual(
+                [case for case, _ in incremental],
+                [case for case, _ in trained.retrieve(query)],
+            )
+
+    def test_string_functions_receive_values(self):
+        received = set()
+
+        class RecordingEquality(Equality):
+            def calculate(self, x, y):
+                received.add(type(y))
+                return super().calculate(x, y)
+
+            calculate_batch = SimilarityFunction.calculate_batch
+
+        schema = SimilaritySchema(
+            vocabulary=self.vocabulary,
+            attributes={**self.schema.attributes, "city": RecordingEquality()},
+        )
+        retriever = Retriever(similarity_schema=schema, case_base=self.case_base, k=3)
+        retriever.train(feature_attribute_keys=["size", "rooms", "city"])
+        retriever.retrieve(self.cases[4])
+
+        self.assertEqual(received, {str})
+        encoder = retriever._engine.encoder("city")
+        self.assertEqual(len(encoder), 4)
+        self.assertEqual(encoder.code(self.cases[0].feature_attributes["city"]), 0)
+
+
+class TestRetrieverPersistence(unittest.TestCase):
+    def setUp(self):
+        self.vocabulary = build_vocabulary()
+        self.schema = build_schema(self.vocabulary)
+        self.case_base = ListCaseBase(build_cases(500))
+        self.keys = [f.name for f in self.vocabulary.features]
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.directory.name) / "index"
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_load_matches_trained(self):
+        trained = Retriever(
+            similarity_schema=self.schema,
+            case_base=self.case_base,
+            k=7,
+            threshold=0.5,
+            sorted_index=True,
+        )
+        trained.train(feature_attribute_keys=self.keys)
+        trained.save(self.path)
+
+        loaded = Retriever.load(self.path, self.schema, self.case_base)
+        self.assertEqual(
+            (loaded.k, loaded.threshold, loaded.sorted_index), (7, 0.5, True)
+        )
+        self.assertIsInstance(loaded._engine.column("size"), np.memmap)
+        for query in build_cases(10, seed=31):
+            self.assertEqual(loaded.retrieve(query), trained.retrieve(query))
+
+    def test_add_case_after_load(self):
+        trained = Retriever(
+            similarity_schema=self.schema, case_base=self.case_base, k=3
+        )
+        trained.train(feature_attribute_keys=self.keys)
+        trained.save(self.path)
+        loaded = Retriever.load(self.path, self.schema, self.case_base)
+
+        case = build_cases(1, seed=37)[0]
+        self.case_base.create_case(case)
+        loaded.add_case(case)
+        self.assertIs(loaded.retrieve(case)[0][0], case)
+
+    def test_save_into_loaded_directory(self):
+        trained = Retriever(
+            similarity_schema=self.schema,
+            case_base=self.case_base,
+            k=5,
+            sorted_index=True,
+        )
+        trained.train(feature_attribute_keys=self.keys)
+        trained.save(self.path)
+        loaded = Retriever.load(self.path, self.schema, self.case_base)
+        reader = Retriever.load(self.path, self.schema, self.case_base)
+        queries = build_cases(5, seed=41)
+        before = [reader.retrieve(query) for query in queries]
+
+        for case in build_cases(20, seed=43):
+            self.case_base.create_case(case)
+            loaded.add_case(case)
+        loaded.save(self.path)
+
+        saved = Retriever.load(self.path, self.schema, self.case_base)
+        self.assertEqual(len(saved._engine), 520)
+        self.assertEqual(sorted(p.name for p in self.path.glob("*.tmp")), [])
+        for query in queries:
+            self.assertEqual(saved.retrieve(query), loaded.retrieve(query))
+        reader.invalidate()
+        self.assertEqual([reader.retrieve(query) for query in queries], before)
+
+    def test_load_with_options(self):
+        trained = Retriever(
+            similarity_schema=self.schema, case_base=self.case_base, k=5
+        )
+        trained.train(feature_attribute_keys=self.keys)
+        trained.save(self.path)
+
+        cache = RetrievalCache()
+        listener = RecordingListener()
+        loaded = Retriever.load(
+            self.path,
+            self.schema,
+            self.case_base,
+            listener=listener,
+            processes=2,
+            cache=cache,
+            jobs=2,
+        )
+        self.addCleanup(loaded.close)
+        self.assertNotIn(loaded.version, (0, trained.version))
+        self.assertIs(loaded.cache, cache)
+        self.assertEqual(loaded.processes, 2)
+        self.assertIsInstance(loaded._engine, ShardedEngine)
+        self.assertEqual(loaded._engine.engine.jobs, 2)
+
+        query = build_cases(1, seed=47)[0]
+        self.assertEqual(loaded.retrieve(query), trained.retrieve(query))
+        self.assertEqual(loaded.retrieve(query), trained.retrieve(query))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual([event.stage for event in listener.events], ["retrieve"])
+
+    def test_load_rejects_other_weights(self):
+        trained = Retriever(
+            similarity_schema=self.schema, case_base=self.case_base, k=3
+        )
+        trained.train(feature_attribute_keys=self.keys)
+        trained.save(self.path)
+
+        vocabulary = Vocabulary(
+            features=[
+                FeatureAttribute(
+                    name="size", data_type=float, conditions=[], weight=0.9
+                )
+            ]
+            + self.vocabulary.features[1:],
+            targets=self.vocabulary.targets,
+        )
+        with self.assertRaises(ValueError):
+            Retriever.load(self.path, build_schema(vocabulary), self.case_base)
+
+    def test_load_rejects_other_format_version(self):
+        trained = Retriever(
+            similarity_schema=self.schema, case_base=self.case_base, k=3
+        )
+        trained.train(feature_attribute_keys=self.keys)
+        trained.save(self.path)
+
+        manifest = json.loads((self.path / "manifest.json").read_text())
+        manifest["format_version"] = 0
+        (self.path / "manifest.json").write_text(json.dumps(manifest))
+        with self.assertRaises(ValueError):
+            Retriever.load(self.path, self.schema, self.case_base)
+
+
+class RecordingListener:
+    def __init__(self):
+        self.events: list[ProgressEvent] = []
+
+    def on_progress(self, event: ProgressEvent) -> None:
+        self.events.append(event)
+
+
+class TestRetrieverProgress(unittest.TestCase):
+    def setUp(self):
+        self.vocabulary = build_vocabulary()
+        self.case_base = ListCaseBase(build_cases(200))
+        self.listener = RecordingListener()
+        self.retriever = Retriever(
+            similarity_schema=build_schema(self.vocabulary),
+            case_base=self.case_base,
+            k=3,
+            listener=self.listener,
+        )
+        self.retriever.train(
+            feature_attribute_keys=[f.name for f in self.vocabulary.features]
+        )
+
+    def test_train_reports_cases(self):
+        (event,) = self.listener.events
+        self.assertEqual(event.stage, "train")
+        self.assertEqual((event.batch, event.completed, event.total), (200, 200, 200))
+        self.assertEqual(event.cases, 200)
+
+    def test_retrieve_many_reports_blocks(self):
+        self.listener.events.clear()
+        original = engine.MAX_BLOCK_ELEMENTS
+        engine.MAX_BLOCK_ELEMENTS = 200 * 4
+        try:
+            self.retriever.retrieve_many(build_cases(10, seed=41))
+        finally:
+            engine.MAX_BLOCK_ELEMENTS = original
+        self.assertEqual([e.batch for e in self.listener.events], [4, 4, 2])
+        self.assertEqual([e.completed for e in self.listener.events], [4, 8, 10])
+        self.assertTrue(all(e.total == 10 for e in self.listener.events))
+
+    def test_metrics_listener_sums_work(self):
+        metrics = MetricsListener()
+        self.retriever.listener = metrics
+        self.retriever.train(
+            feature_attribute_keys=[f.name for f in self.vocabulary.features]
+        )
+        self.retriever.retrieve(self.case_base.cases[0])
+        self.retriever.retrieve_many(build_cases(5, seed=43))
+        self.assertEqual(metrics.trained_cases, 200)
+        self.assertEqual(metrics.queries, 6)
+        self.assertEqual(metrics.compared_cases, 6 * 200)
+        self.assertGreater(metrics.retrieve_seconds, 0.0)
+
+
+class TestThreadedRetrieval(unittest.TestCase):
+    def setUp(self):
+        original = engine.CHUNK_SIZE
+        engine.CHUNK_SIZE = 64
+        self.addCleanup(setattr, engine, "CHUNK_SIZE", original)
+        vocabulary = build_vocabulary()
+        case_base = ListCaseBase(build_cases(1000))
+        keys = [f.name for f in vocabulary.features]
+        self.brute = Retriever(
+            similarity_schema=build_schema(vocabulary), case_base=case_base, k=6
+        )
+        self.threaded = Retriever(
+            similarity_schema=build_schema(vocabulary), case_base=case_base, k=6
+        )
+        self.brute.train(feature_attribute_keys=keys)
+        self.threaded.train(feature_attribute_keys=keys, jobs=4)
+        self.addCleanup(self.threaded.close)
+
+    def assert_same_results(self):
+        queries = build_cases(15, seed=59)
+        batches = self.threaded.retrieve_many(queries)
+        for query, batch in zip(queries, batches):
+            expected = self.brute.retrieve(query)
+            for result in (self.threaded.retrieve(query), batch):
+                np.testing.assert_allclose(
+                    [sim for _, sim in result],
+                    [sim for _, sim in expected],
+                    rtol=0,
+                    atol=1e-12,
+                )
+
+    def test_matches_single_thread(self):
+        self.assertEqual(self.threaded._engine.jobs, 4)
+        self.assert_same_results()
+
+    def test_threshold(self):
+        self.brute.threshold = self.threaded.threshold = 0.9
+        self.assert_same_results()
+
+
+class TestBatchCaseBase(unittest.TestCase):
+    def setUp(self):
+        original = retriever_module.TRAIN_BATCH_SIZE
+        retriever_module.TRAIN_BATCH_SIZE = 64
+        self.addCleanup(setattr, retriever_module, "TRAIN_BATCH_SIZE", original)
+        self.vocabulary = build_vocabulary()
+        self.schema = build_schema(self.vocabulary)
+        self.cases = build_cases(300)
+        self.keys = [f.name for f in self.vocabulary.features]
+
+    def test_retrieves_without_get_all_cases(self):
+        case_base = BatchCaseBase(self.cases)
+        listener = RecordingListener()
+        streamed = Retriever(
+            similarity_schema=self.schema, case_base=case_base, k=4, listener=listener
+        )
+        streamed.train(feature_attribute_keys=self.keys)
+        self.assertEqual([e.batch for e in listener.events], [64, 64, 64, 64, 44])
+        self.assertEqual([e.total for e in listener.events], [None] * 4 + [300])
+
+        listed = Retriever(
+            similarity_schema=self.schema, case_base=ListCaseBase(self.cases), k=4
+        )
+        listed.train(feature_attribute_keys=self.keys)
+        queries = build_cases(5, seed=61)
+        for query, batch in zip(queries, streamed.retrieve_many(queries)):
+            expected = listed.retrieve(query)
+            self.assertEqual(streamed.retrieve(query), expected)
+            self.assertEqual(batch, expected)
+        self.assertTrue(all(len(ids) <= 4 * len(queries) for ids in case_base.fetched))
+
+    def test_columns_without_batches(self):
+        case_base = ColumnCaseBase(self.cases)
+        self.assertIsInstance(case_base, ColumnarCaseBaseAdapter)
+        self.assertFalse(hasattr(case_base, "iter_case_batches"))
+        columnar = Retriever(similarity_schema=self.schema, case_base=case_base, k=4)
+        with mock.patch.object(
+            retriever_module, "iter_case_batches", side_effect=AssertionError
+        ):
+            columnar.train(feature_attribute_keys=self.keys)
+
+        listed = Retriever(
+            similarity_schema=self.schema, case_base=ListCaseBase(self.cases), k=4
+        )
+        listed.train(feature_attribute_keys=self.keys)
+        for query in build_cases(5, seed=61):
+            self.assertEqual(columnar.retrieve(query), listed.retrieve(query))
+
+    def test_indexes_are_built_once(self):
+        sorted_engine = engine.BruteForceEngine(
+            similarity_schema=self.schema, feature_keys=self.keys, sorted_index=True
+        )
+        with mock.patch.object(
+            engine, "SortedIndex", wraps=engine.SortedIndex
+        ) as sorted_index:
+            sorted_engine.fit_batches(
+                self.cases[start : start + 64] for start in range(0, 300, 64)
+            )
+        self.assertEqual(sorted_index.call_count, 2)
+        self.assertEqual(len(sorted_engine.column("size")), 300)
@@ -0,0 +1,83 @@
+import unittest
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from casebased.actors.retriever import Retriever
+from casebased.actors.sharding import ShardedEngine, merge_top_k
+from tests.test_retriever import (
+    ListCaseBase,
+    build_cases,
+    build_schema,
+    build_vocabulary,
+)
+
+
+class TestMergeTopK(unittest.TestCase):
+    def test_merges_shards(self):
+        indices, similarities = merge_top_k(
+            [
+                (np.array([3, 1]), np.array([0.9, 0.4])),
+                (np.array([12, 10]), np.array([0.8, 0.7])),
+                (np.array([20]), np.array([0.95])),
+            ],
+            3,
+        )
+        np.testing.assert_array_equal(indices, [20, 3, 12])
+        np.testing.assert_array_equal(similarities, [0.95, 0.9, 0.8])
+
+
+class TestShardedRetrieval(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.vocabulary = build_vocabulary()
+        cls.schema = build_schema(cls.vocabulary)
+        cls.keys = [f.name for f in cls.vocabulary.features]
+
+    def setUp(self):
+        self.case_base = ListCaseBase(build_cases(1000))
+        self.brute = Retriever(
+            similarity_schema=self.schema, case_base=self.case_base, k=8
+        )
+        self.sharded = Retriever(
+            similarity_schema=self.schema, case_base=self.case_base, k=8, processes=3
+        )
+        self.brute.train(feature_attribute_keys=self.keys)
+        self.sharded.train(feature_attribute_keys=self.keys)
+        self.addCleanup(self.sharded.close)
+
+    def assert_same_results(self):
+        queries = build_cases(12, seed=47)
+        for query, batch in zip(queries, self.sharded.retrieve_many(queries)):
+            expected = self.brute.retrieve(query)
+            for result in (self.sharded.retrieve(query), batch):
+                np.testing.assert_allclose(
+                    [sim for _, sim in result],
+                    [sim for _, sim in expected],
+                    rtol=0,
+                    atol=1e-12,
+                )
+
+    def test_matches_single_process(self):
+        self.assertIsInstance(self.sharded._engine, ShardedEngine)
+        self.assert_same_results()
+
+    def test_threshold(self):
+        self.brute.threshold = self.sharded.threshold = 0.8
+        self.assert_same_results()
+
+    def test_add_case_is_scored_in_tail(self):
+        new_cases = build_cases(50, seed=53)
+        for case in new_cases:
+            self.case_base.create_case(case)
+            self.brute.add_case(case)
+            self.sharded.add_case(case)
+        self.assertIs(self.sharded.retrieve(new_cases[7])[0][0], new_cases[7])
+        self.assert_same_results()
+
+    def test_close_releases_shared_memory(self):
+        names = [memory.name for memory in self.sharded._engine._memory]
+        self.sharded.close()
+        for name in names:
+            with self.assertRaises(FileNotFoundError):
+                SharedMemory(name=name)
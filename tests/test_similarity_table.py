@@ -0,0 +1,77 @@
+import unittest
+
+import numpy as np
+
+from casebased.actors.encoding import CategoricalEncoder
+from casebased.actors.similarity_table import SimilarityTable
+from casebased.components.similarity_measure import SimilarityFunction
+
+
+class CountingEquality(SimilarityFunction):
+    def __init__(self):
+        self.calls = 0
+
+    def calculate(self, x, y) -> float:
+        self.calls += 1
+        return 1.0 if x == y else 0.0
+
+
+class TestSimilarityTable(unittest.TestCase):
+    def test_rows_are_cached(self):
+        function = CountingEquality()
+        encoder = CategoricalEncoder(["a", "b", "c"])
+        table = SimilarityTable(function, encoder)
+
+        np.testing.assert_array_equal(table.row("b"), [0.0, 1.0, 0.0])
+        self.assertEqual(function.calls, 3)
+        table.row("b")
+        self.assertEqual(function.calls, 3)
+        np.testing.assert_array_equal(
+            table.rows(["a", "b"]), [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]]
+        )
+        self.assertEqual(function.calls, 6)
+
+    def test_rows_follow_new_categories(self):
+        function = CountingEquality()
+        encoder = CategoricalEncoder(["a", "b"])
+        table = SimilarityTable(function, encoder)
+        table.row("c")
+
+        encoder.encode(["c"])
+        np.testing.assert_array_equal(table.row("c"), [0.0, 0.0, 1.0])
+        self.assertEqual(function.calls, 3)
+
+    def test_high_cardinality_evicts_rows(self):
+        encoder = CategoricalEncoder([str(value) for value in range(10)])
+        table = SimilarityTable(
+            CountingEquality(), encoder, max_dense=5, max_elements=25
+        )
+        for value in ["1", "2", "3"]:
+            table.row(value)
+        self.assertEqual(list(table._rows.keys()), ["2", "3"])
+
+        dense = SimilarityTable(
+            CountingEquality(), encoder, max_dense=10, max_elements=25
+        )
+        for value in ["1", "2", "3"]:
+            dense.row(value)
+        self.assertEqual(len(dense._rows), 3)
+
+    def test_cache_is_bounded_by_elements(self):
+        encoder = CategoricalEncoder([str(value) for value in range(10)])
+        table = SimilarityTable(
+            CountingEquality(), encoder, max_dense=5, max_elements=35
+        )
+        for value in ["1", "2", "3", "4", "5"]:
+            table.row(value)
+        self.assertEqual(table.max_rows, 3)
+        self.assertEqual(list(table._rows.keys()), ["3", "4", "5"])
+
+        encoder.encode([str(value) for value in range(10, 20)])
+        table.row("6")
+        self.assertEqual(table.max_rows, 1)
+        self.assertEqual(list(table._rows.keys()), ["6"])
+
+        tiny = SimilarityTable(CountingEquality(), encoder, max_dense=5, max_elements=1)
+        tiny.row("1")
+        self.assertEqual(len(tiny._rows), 1)
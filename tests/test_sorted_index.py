@@ -0,0 +1,95 @@
+import unittest
+
+import numpy as np
+
+from casebased.actors.retriever import Retriever
+from casebased.actors.sorted_index import SortedIndex
+from casebased.components.similarity_measure import SimilaritySchema
+from casebased.components.similarity_measure.functions import Equality, SquaredDistance
+from tests.test_retriever import (
+    ListCaseBase,
+    build_cases,
+    build_schema,
+    build_vocabulary,
+)
+
+
+class TestSortedIndex(unittest.TestCase):
+    def test_insert_keeps_order(self):
+        rng = np.random.default_rng(0)
+        values = rng.integers(0, 50, 100).astype(np.float64)
+        index = SortedIndex(values[:60])
+        index.insert(values[60:])
+        np.testing.assert_array_equal(index.values, np.sort(values))
+        np.testing.assert_array_equal(values[index.order], index.values)
+
+    def test_walk_visits_every_case_by_distance(self):
+        values = np.array([5.0, 1.0, 9.0, 3.0, 7.0, 4.0])
+        index = SortedIndex(values)
+        blocks = list(index.walk(4.5, 1))
+        visited = np.concatenate([rows for rows, _ in blocks])
+        self.assertEqual(sorted(visited.tolist()), list(range(len(values))))
+        np.testing.assert_array_equal(blocks[0][0], [5, 0])
+        np.testing.assert_array_equal(blocks[0][1], [3.0, 7.0])
+        self.assertTrue(np.isnan(blocks[-1][1]).all())
+
+
+class TestSortedRetrieval(unittest.TestCase):
+    def setUp(self):
+        self.vocabulary = build_vocabulary()
+        self.schema = build_schema(self.vocabulary)
+        self.case_base = ListCaseBase(build_cases(2000))
+        self.keys = [f.name for f in self.vocabulary.features]
+
+    def retrievers(
+        self, schema: SimilaritySchema, k: int
+    ) -> tuple[Retriever, Retriever]:
+        brute = Retriever(similarity_schema=schema, case_base=self.case_base, k=k)
+        indexed = Retriever(
+            similarity_schema=schema, case_base=self.case_base, k=k, sorted_index=True
+        )
+        brute.train(feature_attribute_keys=self.keys)
+        indexed.train(feature_attribute_keys=self.keys)
+        return brute, indexed
+
+    def assert_same_similarities(self, brute: Retriever, indexed: Retriever):
+        for query in build_cases(20, seed=17):
+            np.testing.assert_allclose(
+                [sim for _, sim in indexed.retrieve(query)],
+                [sim for _, sim in brute.retrieve(query)],
+                rtol=0,
+                atol=1e-12,
+            )
+
+    def test_matches_brute_force(self):
+        for k in (1, 10, 2000):
+            self.assert_same_similarities(*self.retrievers(self.schema, k))
+
+    def test_threshold_matches_brute_force(self):
+        brute, indexed = self.retrievers(self.schema, 50)
+        for threshold in (0.5, 0.8, 0.95, 2.0):
+            brute.threshold = indexed.threshold = threshold
+            self.assert_same_similarities(brute, indexed)
+            for query in build_cases(5, seed=29):
+                self.assertTrue(
+                    all(sim >= threshold for _, sim in indexed.retrieve(query))
+                )
+
+    def test_add_case_updates_index(self):
+        brute, indexed = self.retrievers(self.schema, 5)
+        for case in build_cases(300, seed=23):
+            self.case_base.create_case(case)
+            brute.add_case(case)
+            indexed.add_case(case)
+        self.assert_same_similarities(brute, indexed)
+
+    def test_falls_back_for_non_monotone_function(self):
+        schema = SimilaritySchema(
+            vocabulary=self.vocabulary,
+            attributes={
+                **self.schema.attributes,
+                "rooms": SquaredDistance(),
+                "city": Equality(),
+            },
+        )
+        self.assert_same_similarities(*self.retrievers(schema, 5))
@@ -0,0 +1,212 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from casebased import ColumnarCaseBaseAdapter
+from casebased.actors.retriever import Retriever
+from casebased.components.casebase.sqlite_case_base import SQLiteCaseBase
+from casebased.components.similarity_measure import SimilaritySchema
+from casebased.components.similarity_measure.functions import Equality, Linear
+from casebased.components.vocabulary import (
+    Case,
+    FeatureAttribute,
+    TargetAttribute,
+    Vocabulary,
+)
+
+VOCABULARY = Vocabulary(
+    features=[
+        FeatureAttribute(name="size", data_type=float, conditions=[]),
+        FeatureAttribute(name="rooms", data_type=int, conditions=[]),
+        FeatureAttribute(name="city", data_type=str, conditions=[]),
+        FeatureAttribute(name="garden", data_type=bool, conditions=[]),
+    ],
+    targets=[TargetAttribute(name="price", data_type=float, conditions=[])],
+)
+
+CASES = [
+    Case(
+        feature_attributes={
+            "size": 50.0,
+            "rooms": 2,
+            "city": "Berlin",
+            "garden": False,
+        },
+        target_attributes={"price": 1000.0},
+    ),
+    Case(
+        feature_attributes={"size": 80.5, "rooms": 3, "city": None, "garden": True},
+        target_attributes={"price": None},
+    ),
+    Case(
+        feature_attributes={
+            "size": 120.0,
+            "rooms": 4,
+            "city": "Berlin",
+            "garden": True,
+        },
+        target_attributes={"price": 2500.0},
+        utility=3,
+    ),
+]
+
+
+class TestSQLiteCaseBase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "cases.db")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        with SQLiteCaseBase(self.path, VOCABULARY) as case_base:
+            self.assertTrue(case_base.create_case(CASES[0]))
+            case_base.add_cases(CASES[1:])
+            self.assertIsInstance(case_base, ColumnarCaseBaseAdapter)
+            self.assertEqual(case_base.get_all_cases(), CASES)
+            mode = case_base._connection.execute("PRAGMA journal_mode").fetchone()
+            self.assertEqual(mode[0], "wal")
+
+        with SQLiteCaseBase(self.path, VOCABULARY) as case_base:
+            self.assertEqual(len(case_base), 3)
+            self.assertEqual(case_base.get_all_cases(), CASES)
+
+    def test_missing_columns(self):
+        SQLiteCaseBase(self.path, VOCABULARY).close()
+        vocabulary = Vocabulary(
+            features=[FeatureAttribute(name="floor", data_type=int, conditions=[])],
+            targets=[],
+        )
+        with self.assertRaises(ValueError):
+            SQLiteCaseBase(self.path, vocabulary)
+
+    def test_batches_and_ids(self):
+        with SQLiteCaseBase(self.path, VOCABULARY) as case_base:
+            case_base.add_cases(CASES)
+
+            self.assertEqual(
+                case_base.get_cases_by_ids([2, 0, 2]), [CASES[2], CASES[0], CASES[2]]
+            )
+            self.assertEqual(
+                list(case_base.iter_case_batches(2)),
+                [[CASES[0], CASES[1]], [CASES[2]]],
+            )
+
+    def test_columns(self):
+        with SQLiteCaseBase(self.path, VOCABULARY) as case_base:
+            case_base.add_cases(CASES)
+
+            sizes = case_base.column("size")
+            self.assertEqual(sizes.dtype, np.float64)
+            np.testing.assert_array_equal(sizes, [50.0, 80.5, 120.0])
+            self.assertEqual(case_base.column("rooms").dtype, np.int64)
+            np.testing.assert_array_equal(
+                case_base.column("garden"), [False, True, True]
+            )
+            np.testing.assert_array_equal(
+                case_base.column("price")[[0, 2]], [1000.0, 2500.0]
+            )
+            self.assertTrue(np.isnan(case_base.column("price")[1]))
+            np.testing.assert_array_equal(case_base.column("city"), [0, -1, 0])
+            self.assertEqual(case_base.categories("city"), ["Berlin"])
+            self.assertIsNone(case_base.categories("size"))
+
+            case_base.create_case(
+                Case(
+                    feature_attributes={
+                        "size": 1.0,
+                        "rooms": 1,
+                        "city": "Munich",
+                        "garden": False,
+                    },
+                    target_attributes={"price": None},
+                )
+            )
+            self.assertEqual(case_base.categories("city"), ["Berlin", "Munich"])
+
+    def test_change_utility(self):
+        with SQLiteCaseBase(self.path, VOCABULARY) as case_base:
+            case_base.add_cases(CASES)
+
+            self.assertTrue(case_base.change_utility(CASES[1], 7))
+            self.assertEqual(
+                [case.utility for case in case_base.get_all_cases()], [0, 7, 3]
+            )
+            unknown = Case(
+                feature_attributes={
+                    "size": 1.0,
+                    "rooms": 1,
+                    "city": "Munich",
+                    "garden": False,
+                },
+                target_attributes={"price": None},
+            )
+            self.assertFalse(case_base.change_utility(unknown, 1))
+
+    def test_retriever_reads_columns(self):
+        schema = SimilaritySchema(
+            vocabulary=VOCABULARY,
+            attributes={
+                "size": Linear(lower_bound=None, upper_bound=100.0),
+                "rooms": Linear(lower_bound=None, upper_bound=4),
+                "city": Equality(),
+                "garden": Equality(),
+            },
+        )
+        query = Case(
+            feature_attributes={
+                "size": 110.0,
+                "rooms": 4,
+                "city": "Berlin",
+                "garden": True,
+            },
+            target_attributes={"price": None},
+        )
+        with SQLiteCaseBase(self.path, VOCABULARY) as case_base:
+            case_base.add_cases(CASES)
+            retriever = Retriever(similarity_schema=schema, case_base=case_base, k=2)
+            retriever.train(feature_attribute_keys=["size", "rooms", "city", "garden"])
+
+            result = retriever.retrieve(query)
+            self.assertEqual(result[0][0], CASES[2])
+            self.assertAlmostEqual(result[0][1], schema.calculate(query, CASES[2]))
+            self.assertEqual(result[1][0], CASES[1])
+            self.assertAlmostEqual(result[1][1], schema.calculate(query, CASES[1]))
+
+    def test_ids_with_gaps(self):
+        schema = SimilaritySchema(
+            vocabulary=VOCABULARY,
+            attributes={
+                "size": Linear(lower_bound=None, upper_bound=100.0),
+                "rooms": Linear(lower_bound=None, upper_bound=4),
+                "city": Equality(),
+                "garden": Equality(),
+            },
+        )
+        with SQLiteCaseBase(self.path, VOCABULARY) as case_base:
+            case_base.add_cases(CASES)
+            case_base.add_cases(CASES)
+            with case_base._connection:
+                case_base._connection.execute(
+                    "DELETE FROM cases WHERE case_id IN (0, 3)"
+                )
+            stored = case_base.get_all_cases()
+            self.assertEqual(stored, [CASES[1], CASES[2], CASES[1], CASES[2]])
+
+            retriever = Retriever(similarity_schema=schema, case_base=case_base, k=4)
+            retriever.train(feature_attribute_keys=["size", "rooms", "city", "garden"])
+            self.assertEqual(case_base.get_cases_by_ids([3, 0]), [CASES[2], CASES[1]])
+            result = retriever.retrieve(CASES[2])
+            self.assertEqual(sorted(result, key=lambda item: -item[1])[0][0], CASES[2])
+            self.assertEqual(len(result), 4)
+
+            case_base.create_case(CASES[0])
+            retriever.add_case(CASES[0])
+            self.assertEqual(retriever.retrieve(CASES[0])[0][0], CASES[0])
+            self.assertEqual(case_base.get_cases_by_ids([4]), [CASES[0]])
+
+        with SQLiteCaseBase(self.path, VOCABULARY) as reopened:
+            self.assertEqual(reopened.get_cases_by_ids([0, 4]), [CASES[1], CASES[0]])
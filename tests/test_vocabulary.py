@@ -6,6 +6,7 @@ from casebased.components.vocabulary import (
     TargetAttribute,
     Vocabulary,
 )
+from casebased.utils.errors import AttributeAlreadyExists
 
 TEST_DATA = {
     "features": [
@@ -28,3 +29,30 @@ class TestVocabulary(unittest.TestCase):
         vocab = Vocabulary(features=TEST_DATA["features"], targets=TEST_DATA["targets"])
         is_valid = vocab.validate_case(TEST_DATA["case"])
         self.assertTrue(is_valid)
+
+    def test__find_attribute(self):
+        vocab = Vocabulary(
+            features=list(TEST_DATA["features"]), targets=list(TEST_DATA["targets"])
+        )
+        self.assertIs(vocab.find_attribute("feature2"), TEST_DATA["features"][1])
+        self.assertIs(vocab.find_attribute("target1"), TEST_DATA["targets"][0])
+        self.assertIsNone(vocab.find_attribute("missing"))
+
+    def test__index_follows_changes(self):
+        vocab = Vocabulary(
+            features=list(TEST_DATA["features"]), targets=list(TEST_DATA["targets"])
+        )
+        added = FeatureAttribute(name="feature4", data_type=int, conditions=[])
+        vocab.add_attribute(added)
+        self.assertIs(vocab.find_attribute("feature4"), added)
+        self.assertEqual(
+            vocab.feature_names, ("feature1", "feature2", "feature3", "feature4")
+        )
+        with self.assertRaises(AttributeAlreadyExists):
+            vocab.add_attribute(added)
+
+        vocab.remove_attribute("feature1")
+        self.assertIsNone(vocab.find_attribute("feature1"))
+        self.assertEqual(vocab.feature_names, ("feature2", "feature3", "feature4"))
+        self.assertEqual(vocab.target_names, ("target1",))
+        self.assertEqual(vocab.version, 2)